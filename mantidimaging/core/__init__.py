@@ -1,5 +1,8 @@
 # Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
+"""
+The operations and io packages are not imported here, because they pull in the
+gui package and PyQt. The parallel worker processes import from core, and only
+need the modules for the tasks they are given.
+"""
 from __future__ import annotations
-
-from . import operations, io, parallel, utility  # noqa: F401
@@ -8,6 +8,7 @@ import numpy as np
 
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.data.reconlist import ReconList
+from mantidimaging.core.parallel.accountant import accountant
 from mantidimaging.core.utility.data_containers import FILE_TYPES
 
 
@@ -61,6 +62,13 @@ class BaseDataset:
     def all_image_ids(self) -> list[uuid.UUID]:
         return [image_stack.id for image_stack in self.all if image_stack is not None]
 
+    @property
+    def shared_memory_usage(self) -> int:
+        """
+        Bytes of shared memory allocated for the stacks in the dataset
+        """
+        return accountant.usage_of(self.all)
+
     def add_recon(self, recon: ImageStack):
         self.recons.append(recon)
 
@@ -14,28 +14,36 @@ import numpy as np
 from mantidimaging.core.data.utility import mark_cropped
 from mantidimaging.core.operation_history import const
 from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.parallel.accountant import accountant
 from mantidimaging.core.utility.data_containers import ProjectionAngles, Counts, Indices
 from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.core.utility.leak_tracker import leak_tracker
 
 if TYPE_CHECKING:
     from mantidimaging.core.io.instrument_log import InstrumentLog
+    from mantidimaging.core.io.loader.nexus_loader import LazyNexusImages
+    from mantidimaging.core.utility.progress_reporting import Progress
     import numpy.typing as npt
 
+# Dtypes that images can be stored with to save memory: raw 16 bit detector counts, or reduced precision floats for
+# browsing. Operations that need more precision promote the stack to float32 first.
+COMPACT_DTYPES = (np.dtype(np.uint16), np.dtype(np.float16))
+
 
 class ImageStack:
     name: str
     _shared_array: pu.SharedArray
 
     def __init__(self,
-                 data: np.ndarray | pu.SharedArray,
+                 data: np.ndarray | pu.SharedArray | LazyNexusImages,
                  filenames: list[str] | None = None,
                  indices: list[int] | Indices | None = None,
                  metadata: dict[str, Any] | None = None,
                  sinograms: bool = False,
                  name: str | None = None):
         """
-        :param data: a numpy array or SharedArray object containing the images of the Sample/Projection data
+        :param data: a numpy array or SharedArray object containing the images of the Sample/Projection data, or a
+                     lazy view of images in a file that is loaded into a SharedArray when the whole stack is needed
         :param filenames: All filenames that were matched for loading
         :param indices: Indices that were actually loaded
         :param metadata: Properties to copy when creating a new stack from an existing one
@@ -43,10 +51,13 @@ class ImageStack:
         :param name: A name for the stack
         """
 
+        self._lazy_data: LazyNexusImages | None = None
         if isinstance(data, pu.SharedArray):
             self._shared_array = data
-        else:
+        elif isinstance(data, np.ndarray):
             self._shared_array = pu.SharedArray(data, None)
+        else:
+            self._lazy_data = data
 
         self.indices = indices
         self._id = uuid.uuid4()
@@ -68,6 +79,11 @@ class ImageStack:
         else:
             self.name = name
 
+        if self._lazy_data is None:
+            self._track_shared_array()
+
+    def _track_shared_array(self) -> None:
+        accountant.set_owner(self._shared_array, self)
         tracker_msg: str = f"ImageStack {self.name}"
         leak_tracker.add(self._shared_array.array, msg=tracker_msg)
         leak_tracker.add(self._shared_array, msg=tracker_msg)
@@ -87,7 +103,7 @@ class ImageStack:
         return not self == other
 
     def __str__(self) -> str:
-        return f'Image Stack: data={self.data.shape} | properties|={len(self.metadata)}'
+        return f'Image Stack: data={self.display_data.shape} | properties|={len(self.metadata)}'
 
     def count(self) -> int:
         return len(self._filenames) if self._filenames else 0
@@ -98,7 +114,7 @@ class ImageStack:
 
     @filenames.setter
     def filenames(self, new_ones: list[str]) -> None:
-        assert len(new_ones) == self.data.shape[0], "Number of filenames and number of images must match."
+        assert len(new_ones) == self.num_images, "Number of filenames and number of images must match."
         self._filenames = new_ones
 
     @property
@@ -187,18 +203,18 @@ class ImageStack:
         return ImageStack(np.asarray([self.sino(index)]).swapaxes(0, 1), metadata=deepcopy(self.metadata))
 
     def slice_as_array(self, index: int) -> np.ndarray:
-        return np.asarray([self.data[index]])
+        return np.asarray([self.display_data[index]])
 
     @property
     def height(self) -> int:
         if not self._is_sinograms:
-            return self.data.shape[1]
+            return self.display_data.shape[1]
         else:
-            return self.data.shape[0]
+            return self.display_data.shape[0]
 
     @property
     def width(self) -> int:
-        return self.data.shape[2]
+        return self.display_data.shape[2]
 
     @property
     def h_middle(self) -> float:
@@ -209,14 +225,14 @@ class ImageStack:
 
     @property
     def num_images(self) -> int:
-        return self.data.shape[0]
+        return self.display_data.shape[0]
 
     @property
     def num_projections(self) -> int:
         if not self._is_sinograms:
-            return self.data.shape[0]
+            return self.display_data.shape[0]
         else:
-            return self.data.shape[1]
+            return self.display_data.shape[1]
 
     @property
     def num_sinograms(self) -> int:
@@ -224,15 +240,15 @@ class ImageStack:
 
     def sino(self, slice_idx: int) -> np.ndarray:
         if not self._is_sinograms:
-            return np.swapaxes(self.data, 0, 1)[slice_idx]
+            return self.display_data[:, slice_idx]
         else:
-            return self.data[slice_idx]
+            return self.display_data[slice_idx]
 
     def projection(self, projection_idx: int) -> np.ndarray:
         if self._is_sinograms:
-            return np.swapaxes(self.data, 0, 1)[projection_idx]
+            return self.display_data[:, projection_idx]
         else:
-            return self.data[projection_idx]
+            return self.display_data[projection_idx]
 
     def has_proj180deg(self) -> bool:
         return self._proj180deg is not None
@@ -256,27 +272,71 @@ class ImageStack:
 
     @property
     def data(self) -> np.ndarray:
+        self.load_lazy_data()
         return self._shared_array.array
 
     @data.setter
     def data(self, other: np.ndarray) -> None:
+        self.load_lazy_data()
         self._shared_array.array = other
 
+    @property
+    def display_data(self) -> np.ndarray | LazyNexusImages:
+        """
+        The images for viewing, which are read from the file as they are indexed if the stack has not been loaded
+        """
+        return self._lazy_data if self._lazy_data is not None else self._shared_array.array
+
+    @property
+    def is_lazy(self) -> bool:
+        return self._lazy_data is not None
+
+    def load_lazy_data(self, progress: Progress | None = None) -> None:
+        """
+        Reads all the images of a lazy stack into shared memory, for operations that need the whole stack
+        """
+        if self._lazy_data is not None:
+            self._shared_array = self._lazy_data.load(progress)
+            self._lazy_data = None
+            self._track_shared_array()
+
     @property
     def shared_array(self) -> pu.SharedArray:
+        self.load_lazy_data()
         return self._shared_array
 
     @shared_array.setter
     def shared_array(self, shared_array: pu.SharedArray) -> None:
+        self._lazy_data = None
         self._shared_array = shared_array
+        accountant.set_owner(shared_array, self)
 
     @property
     def uses_shared_memory(self) -> bool:
-        return self._shared_array.has_shared_memory
+        return self.shared_array.has_shared_memory
 
     @property
     def dtype(self) -> np.dtype:
-        return self.data.dtype
+        return self.display_data.dtype
+
+    @property
+    def is_compact(self) -> bool:
+        """
+        :return: True if the images are stored with one of the COMPACT_DTYPES
+        """
+        return self.dtype in COMPACT_DTYPES
+
+    def promote(self, dtype: npt.DTypeLike = np.float32) -> None:
+        """
+        Converts the images to a wider dtype, e.g. raw uint16 counts to float32 before the first operation that needs
+        floats. The stack is converted into a new shared array, which replaces the current one.
+        """
+        dtype = np.dtype(dtype)
+        if self.dtype == dtype:
+            return
+        promoted = pu.create_array(self.data.shape, dtype)
+        promoted.array[:] = self.data
+        self.shared_array = promoted
 
     @staticmethod
     def create_empty_image_stack(shape: tuple[int, ...], dtype: npt.DTypeLike, metadata: dict[str, Any]) -> ImageStack:
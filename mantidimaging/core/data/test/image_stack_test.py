@@ -99,6 +99,24 @@ class ImageStackTest(unittest.TestCase):
         self.assertEqual(images.metadata, copy.metadata)
         self.assertNotEqual(images, copy)
 
+    def test_promote_compact_stack(self):
+        images = ImageStack(np.arange(24, dtype=np.uint16).reshape(2, 3, 4))
+        self.assertTrue(images.is_compact)
+
+        images.promote()
+
+        self.assertFalse(images.is_compact)
+        self.assertEqual(images.dtype, np.float32)
+        np.testing.assert_array_equal(images.data, np.arange(24).reshape(2, 3, 4))
+
+    def test_promote_to_same_dtype_keeps_array(self):
+        images = generate_images()
+        shared_array = images.shared_array
+
+        images.promote(np.float32)
+
+        self.assertIs(images.shared_array, shared_array)
+
     def test_copy_flip_axes(self):
         images = generate_images()
         images.record_operation("Test", "Display", 123)
@@ -174,6 +192,26 @@ class ImageStackTest(unittest.TestCase):
         self.assertEqual(images.projection(0).shape, (10, 350))
         self.assertEqual(images.sino(0).shape, (100, 350))
 
+    def test_lazy_data_loaded_when_data_needed(self):
+        loaded = generate_images((10, 100, 350))
+        lazy_data = mock.MagicMock(shape=(10, 100, 350), dtype=np.dtype(np.float32), ndim=3)
+        lazy_data.load.return_value = loaded.shared_array
+        images = ImageStack(lazy_data)
+
+        self.assertEqual((images.num_images, images.height, images.width), (10, 100, 350))
+        self.assertEqual(images.dtype, np.float32)
+        images.projection(3)
+        lazy_data.__getitem__.assert_called_once_with(3)
+        images.sino(5)
+        lazy_data.__getitem__.assert_called_with((slice(None), 5))
+        self.assertTrue(images.is_lazy)
+        lazy_data.load.assert_not_called()
+
+        self.assertIs(images.data, loaded.data)
+        self.assertFalse(images.is_lazy)
+        self.assertIs(images.display_data, loaded.data)
+        lazy_data.load.assert_called_once()
+
     def test_clear_proj180deg(self):
         images = generate_images((10, 100, 350))
         # expected without having a specific 180 deg projection
@@ -2,10 +2,13 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import re
 from typing import Final
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from logging import getLogger
 
 from mantidimaging.core.utility.data_containers import FILE_TYPES
@@ -13,6 +16,8 @@ from mantidimaging.core.utility.data_containers import FILE_TYPES
 LOG = getLogger(__name__)
 
 IMAGE_FORMAT_EXTENSIONS: Final = ['fits', 'fit', 'tif', 'tiff']
+# Number of directories whose index is kept, see DirectoryIndex.of
+DIRECTORY_INDEX_CACHE_SIZE = 64
 
 
 class FilenamePattern:
@@ -39,6 +44,7 @@ class FilenamePattern:
                                          re.escape(suffix) + "$")
 
         self.re_pattern_metadata = re.compile("^" + re.escape(prefix.rstrip("_ ")) + ".json$")
+        self.metadata_name = prefix.rstrip("_ ") + ".json"
         self.template = prefix + "{:0" + str(digit_count) + "d}" + suffix
 
     @classmethod
@@ -76,6 +82,18 @@ class FilenamePattern:
     def match_metadata(self, filename: str) -> bool:
         return self.re_pattern_metadata.match(filename) is not None
 
+    def matching_names(self, index: DirectoryIndex) -> Iterator[str]:
+        """
+        The names in a directory that match the pattern. Only the names in the pattern's family are checked.
+        """
+        if self.digit_count == 0:
+            name = index.entry_name(self.prefix + self.suffix)
+            candidates: Iterable[str] = [name] if name is not None else []
+        else:
+            family = DirectoryIndex.family_key(self.generate(0))
+            candidates = index.families.get(family, []) if family is not None else index.names
+        return (name for name in candidates if self.match(name))
+
 
 class FilenamePatternGolden(FilenamePattern):
     """
@@ -99,6 +117,7 @@ class FilenamePatternGolden(FilenamePattern):
                                      str(digit_count) + "})" + re.escape(suffix) + "$")
 
         self.re_pattern_metadata = re.compile("^" + re.escape(prefix.rstrip("_ ")) + ".json$")
+        self.metadata_name = prefix.rstrip("_ ") + ".json"
 
     @classmethod
     def from_name(cls, filename: str) -> FilenamePattern:
@@ -122,6 +141,92 @@ class FilenamePatternGolden(FilenamePattern):
     def generate(self, index: int) -> str:
         return self.name_store[index]
 
+    def matching_names(self, index: DirectoryIndex) -> Iterator[str]:
+        # Each angle is a different family, so all of the names are checked
+        return (name for name in index.names if self.match(name))
+
+
+class DirectoryIndex:
+    """
+    The entries of a directory, read with a single os.scandir pass, with the names grouped into families of
+    numbered files by their FilenamePattern prefix and suffix.
+
+    Indexes are cached by :meth:`of` until the directory is modified, so finding the files of a group and its related
+    groups, logs and metadata does not list the directory again or check each name against every pattern.
+    """
+    _cache: OrderedDict[str, DirectoryIndex] = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, directory: Path, version: tuple[int, ...] = ()):
+        """
+        :param directory: The directory to index
+        :param version: Identifies the state of the directory that was indexed
+        """
+        self.directory = directory
+        self.version = version
+        self.names: list[str] = []
+        self.directories: set[str] = set()
+        self.families: dict[tuple[str, str], list[str]] = {}
+        # Names as compared by the platform, e.g. case insensitively on Windows
+        self._entries: dict[str, str] = {}
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                self.names.append(name)
+                self._entries[os.path.normcase(name)] = name
+                if entry.is_dir():
+                    self.directories.add(name)
+                family = self.family_key(name)
+                if family is not None:
+                    self.families.setdefault(family, []).append(name)
+
+    @classmethod
+    def of(cls, directory: Path) -> DirectoryIndex:
+        """
+        The index of a directory, which is only read again when its modification time changes.
+        """
+        key = os.path.abspath(directory)
+        stat = os.stat(key)
+        version = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        with cls._cache_lock:
+            index = cls._cache.get(key)
+            if index is not None and index.version == version:
+                cls._cache.move_to_end(key)
+                return index
+
+        index = cls(Path(directory), version)
+        with cls._cache_lock:
+            cls._cache[key] = index
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > DIRECTORY_INDEX_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return index
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @staticmethod
+    def family_key(filename: str) -> tuple[str, str] | None:
+        """
+        The prefix and suffix around the index of a numbered filename, or None if the name is not numbered.
+        """
+        result = FilenamePattern.PATTERN.search(filename)
+        if result is None:
+            return None
+        return result.group(1), result.group(3)
+
+    def entry_name(self, name: str) -> str | None:
+        """
+        The name of the entry that a name refers to on this platform, or None if there is no such entry.
+        """
+        return self._entries.get(os.path.normcase(name))
+
+    def image_names(self) -> Iterator[str]:
+        return (name for name in self.names if FilenameGroup.valid_image_filename(Path(name)))
+
 
 class FilenameGroup:
 
@@ -155,13 +260,10 @@ class FilenameGroup:
         if not path.is_dir():
             raise ValueError(f"path is a file: {path}")
 
-        files = (f for f in path.iterdir() if cls.valid_image_filename(f))
-
-        try:
-            first_file = min(files)
-        except ValueError:
+        first_name = min(DirectoryIndex.of(path).image_names(), default=None)
+        if first_name is None:
             return None
-        return cls.from_file(first_file)
+        return cls.from_file(path / first_name)
 
     @staticmethod
     def valid_image_filename(f: Path) -> bool:
@@ -185,26 +287,30 @@ class FilenameGroup:
         return next(self.all_files())
 
     def find_all_files(self) -> None:
-        self.all_indexes = []
-        for filename in self.directory.iterdir():
-            if self.pattern.match(filename.name):
-                self.all_indexes.append(self.pattern.get_index(filename.name))
+        index = DirectoryIndex.of(self.directory)
+        self.all_indexes = sorted(self.pattern.get_index(name) for name in self.pattern.matching_names(index))
 
-            if self.pattern.match_metadata(filename.name):
-                if self.metadata_path is not None:
-                    LOG.warning(f"Multiple metadata files found: {filename}")
-                self.metadata_path = filename
-        self.all_indexes.sort()
+        metadata_name = index.entry_name(self.pattern.metadata_name)
+        if metadata_name is not None:
+            self.metadata_path = self.directory / metadata_name
 
     def find_log_file(self) -> None:
         parent_directory = self.directory.parent
-        log_pattern = self.directory.name + "*" + ".txt"
-        log_paths = list(parent_directory.glob(log_pattern))
-
-        if log_paths:
+        directory_name = self.directory.name
+        log_suffix = ".txt"
+        try:
+            index = DirectoryIndex.of(parent_directory)
+        except OSError:
+            return
+        log_names = [
+            name for name in index.names
+            if name.startswith(directory_name) and name.endswith(log_suffix) and len(name) >= len(directory_name) +
+            len(log_suffix)
+        ]
+
+        if log_names:
             # choose shortest match
-            shortest = min(log_paths, key=lambda p: len(p.name))
-            self.log_path = self.directory / shortest
+            self.log_path = parent_directory / min(log_names, key=len)
 
     def find_related(self, file_type: FILE_TYPES) -> FilenameGroup | None:
         if self.directory.name not in ["Tomo", "tomo"]:
@@ -218,10 +324,11 @@ class FilenameGroup:
             test_names.append(file_type.tname)
         test_names.extend([s.lower() for s in test_names])
 
+        parent_index = DirectoryIndex.of(self.directory.parent)
         for test_name in test_names:
-            new_dir = self.directory.parent / test_name
-            if new_dir.exists():
-                fg = self.from_directory(new_dir)
+            dir_name = parent_index.entry_name(test_name)
+            if dir_name in parent_index.directories:
+                fg = self.from_directory(self.directory.parent / dir_name)
                 if fg is not None:
                     return fg
 
@@ -232,16 +339,19 @@ class FilenameGroup:
 
         test_name = "180deg"
 
-        new_dir = self.directory.parent / test_name
-        if new_dir.exists():
+        parent_index = DirectoryIndex.of(self.directory.parent)
+        dir_name = parent_index.entry_name(test_name)
+        if dir_name in parent_index.directories:
+            new_dir = self.directory.parent / dir_name
+            new_index = DirectoryIndex.of(new_dir)
             for trim_numbers in [True, False]:
                 if trim_numbers:
                     new_name = re.sub(r'_([0-9]+)', "", sample_first_name)
                 else:
                     new_name = sample_first_name
                 new_name = new_name.replace("Tomo", test_name).replace("tomo", test_name)
-                new_path = new_dir / new_name
-                if new_path.exists():
-                    return self.from_file(new_path)
+                found_name = new_index.entry_name(new_name)
+                if found_name is not None:
+                    return self.from_file(new_dir / found_name)
 
         return None
@@ -2,7 +2,10 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from enum import Enum, auto
 from pathlib import Path
 from typing import ClassVar
@@ -11,6 +14,9 @@ import numpy as np
 
 from mantidimaging.core.utility.data_containers import ProjectionAngles, Counts
 
+# Number of parsed log files that are kept, see InstrumentLog.from_file
+LOG_CACHE_SIZE = 8
+
 
 class LogColumn(Enum):
     TIMESTAMP = auto()
@@ -23,7 +29,7 @@ class LogColumn(Enum):
     SPECTRUM_COUNTS = auto()
 
 
-LogDataType = dict[LogColumn, list[float | int]]
+LogDataType = dict[LogColumn, list[float | int] | np.ndarray]
 
 
 class NoParserFound(RuntimeError):
@@ -67,6 +73,9 @@ class InstrumentLog:
     New parsers can be implemented by subclassing InstrumentLogParser
     """
     parsers: ClassVar[list[type[InstrumentLogParser]]] = []
+    # Parsed logs by path, with the version of the file that was parsed
+    _cache: ClassVar[OrderedDict[str, tuple[tuple[int, ...], InstrumentLog]]] = OrderedDict()
+    _cache_lock = threading.Lock()
 
     parser: type[InstrumentLogParser]
     data: LogDataType
@@ -93,12 +102,45 @@ class InstrumentLog:
         if len(set(lengths)) != 1:
             raise InvalidLog(f"Mismatch in column lengths: {lengths}")
         self.length = lengths[0]
+        # Columns are shared by every stack that uses the log, see from_file
+        for column in self.data.values():
+            if isinstance(column, np.ndarray):
+                column.flags.writeable = False
+
+    @classmethod
+    def from_file(cls, log_file: Path) -> InstrumentLog:
+        """
+        Read and parse a log file. Parsed logs are cached until the file is modified, so a log that is attached to
+        several stacks, or loaded again, is only parsed once.
+        """
+        key = os.path.abspath(log_file)
+        stat = os.stat(key)
+        version = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with cls._cache_lock:
+            cached = cls._cache.get(key)
+            if cached is not None and cached[0] == version:
+                cls._cache.move_to_end(key)
+                return cached[1]
+
+        with open(log_file) as f:
+            log = cls(f.readlines(), log_file)
+        with cls._cache_lock:
+            cls._cache[key] = (version, log)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > LOG_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return log
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._cache_lock:
+            cls._cache.clear()
 
     @classmethod
     def register_parser(cls, parser: type[InstrumentLogParser]) -> None:
         cls.parsers.append(parser)
 
-    def get_column(self, key: LogColumn) -> list[float]:
+    def get_column(self, key: LogColumn) -> list[float | int] | np.ndarray:
         return self.data[key]
 
     def projection_numbers(self) -> np.ndarray:
@@ -2,11 +2,12 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
-import csv
 import locale
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
 from mantidimaging.core.io.instrument_log import (InstrumentLogParser, LogColumn, LogDataType)
 from mantidimaging.core.utility.imat_log_file_parser import IMATLogFile, IMATLogColumn
 
@@ -17,6 +18,8 @@ class LegacySpectraLogParser(InstrumentLogParser):
 
     Tab separated columns of Time of flight [s], Counts
 
+    These logs have a row for each time of flight bin, so they are parsed into column arrays by NumPy's text reader
+    rather than a row at a time.
     """
     delimiter = '\t'
 
@@ -30,11 +33,13 @@ class LegacySpectraLogParser(InstrumentLogParser):
         return True
 
     def parse(self) -> LogDataType:
-        data: LogDataType = {LogColumn.TIME_OF_FLIGHT: [], LogColumn.SPECTRUM_COUNTS: []}
-        for row in csv.reader(self.cleaned_lines(), delimiter=self.delimiter):
-            data[LogColumn.TIME_OF_FLIGHT].append(float(row[0]))
-            data[LogColumn.SPECTRUM_COUNTS].append(int(row[1]))
-        return data
+        # Blank lines are skipped by loadtxt
+        time_of_flight, counts = np.loadtxt(self.lines,
+                                            dtype=[("time_of_flight", np.float64), ("counts", np.int64)],
+                                            delimiter=self.delimiter,
+                                            ndmin=1,
+                                            unpack=True)
+        return {LogColumn.TIME_OF_FLIGHT: time_of_flight, LogColumn.SPECTRUM_COUNTS: counts}
 
 
 class LegacyIMATLogFile(InstrumentLogParser):
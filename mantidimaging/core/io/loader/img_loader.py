@@ -4,17 +4,33 @@
 This module handles the loading of FIT, FITS, TIF, TIFF
 """
 from __future__ import annotations
+
+import math
+from contextlib import contextmanager
+from functools import partial
+from itertools import groupby
 from typing import TYPE_CHECKING
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.io.utility import run_io_tasks
 from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.utility.progress_reporting import Progress
 
 if TYPE_CHECKING:
+    from contextlib import AbstractContextManager
+    from collections.abc import Sequence
+
     import numpy as np
     import numpy.typing as npt
     from ...utility.data_containers import Indices
+    from ...operations.base_filter import ImageStage
+
+    # Opens a multi-page file, giving a function that reads the given pages of it into an array
+    OpenPagesFunc = Callable[[str], AbstractContextManager[Callable[[Sequence[int], np.ndarray], None]]]
+
+# Pages of a multi-page file that are read by each IO task
+PAGES_PER_TASK = 8
 
 
 def execute(load_func: Callable[[str], np.ndarray],
@@ -22,11 +38,27 @@ def execute(load_func: Callable[[str], np.ndarray],
             img_format: str,
             dtype: npt.DTypeLike,
             indices: list[int] | Indices | None,
-            progress: Progress | None = None) -> ImageStack:
+            progress: Progress | None = None,
+            load_into_func: Callable[[str, np.ndarray], None] | None = None,
+            img_shape: tuple[int, ...] | None = None,
+            stages: list[ImageStage] | None = None,
+            pages: list[tuple[str, int]] | None = None,
+            open_pages_func: OpenPagesFunc | None = None) -> ImageStack:
     """
     Reads a stack of images into memory, assuming dark and flat images
     are in separate directories.
 
+    If load_into_func is given, it is used to read each image straight into its slice of the stack, instead of reading
+    it with load_func and then copying it.
+
+    If pages is given, the files have several pages and the images are the (file, page) pairs in pages, which are read
+    with open_pages_func. The indices then select from the pages rather than the files.
+
+    If img_shape is not given, it is found by loading the first image.
+
+    The stages are applied in order to each image as soon as it has been loaded, by the same thread, so that loading
+    and processing overlap.
+
     Usual type in fits is 16-bit pixel depth, data type is denoted with:
         '>i2' - uint16
         '>f2' - float16
@@ -39,18 +71,21 @@ def execute(load_func: Callable[[str], np.ndarray],
 
     # The following codes assume that all images have the same size and properties as the first.
     # This is always true in the case of raw data
-    first_sample_img = load_func(sample_path[0])
-
-    # select the files loaded based on the indices, if any are provided
-    chosen_input_filenames = sample_path[indices[0]:indices[1]:indices[2]] if indices else sample_path
-
-    # get the shape of all images
-    img_shape = first_sample_img.shape
+    if img_shape is None:
+        img_shape = load_func(sample_path[0]).shape
 
     # forward all arguments to internal class for easy re-usage
-    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress)
-
-    sample_data = il.load_sample_data(chosen_input_filenames)
+    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress, load_into_func, stages,
+                     open_pages_func)
+
+    if pages is not None:
+        chosen_pages = pages[indices[0]:indices[1]:indices[2]] if indices else pages
+        chosen_input_filenames = [filename for filename, _ in chosen_pages]
+        sample_data = il.load_pages(chosen_pages)
+    else:
+        # select the files loaded based on the indices, if any are provided
+        chosen_input_filenames = sample_path[indices[0]:indices[1]:indices[2]] if indices else sample_path
+        sample_data = il.load_sample_data(chosen_input_filenames)
 
     return ImageStack(sample_data, chosen_input_filenames, indices)
 
@@ -63,8 +98,14 @@ class ImageLoader:
                  img_shape: tuple[int, ...],
                  data_dtype: npt.DTypeLike,
                  indices: list[int] | Indices | None,
-                 progress: Progress | None = None):
+                 progress: Progress | None = None,
+                 load_into_func: Callable[[str, np.ndarray], None] | None = None,
+                 stages: list[ImageStage] | None = None,
+                 open_pages_func: OpenPagesFunc | None = None):
         self.load_func = load_func
+        self.load_into_func = load_into_func
+        self.open_pages_func = open_pages_func
+        self.stages = stages if stages is not None else []
         self.img_format = img_format
         self.img_shape = img_shape
         self.data_dtype = data_dtype
@@ -79,28 +120,90 @@ class ImageLoader:
         else:
             raise ValueError(f"Data loaded has invalid shape: {self.img_shape}")
 
-    def _do_files_load_seq(self, data: pu.SharedArray, files: list[str]) -> pu.SharedArray:
+    def _load_file(self, data: pu.SharedArray, idx: int, in_file: str) -> int:
+        """
+        Load a file into its slot in data, returning the number of bytes loaded.
+        """
+        with self._load_errors(in_file):
+            if self.load_into_func is not None:
+                self.load_into_func(in_file, data.array[idx])
+            else:
+                data.array[idx, :] = self.load_func(in_file)
+        self._apply_stages(data, idx)
+        return data.array[idx].nbytes
+
+    @contextmanager
+    def _load_errors(self, in_file: str) -> Iterator[None]:
+        try:
+            yield
+        except ValueError as exc:
+            raise ValueError("An image has different width and/or height "
+                             "dimensions! All images must have the same "
+                             f"dimensions. Expected dimensions: {self.img_shape} Error "
+                             f"message: {exc}") from exc
+        except OSError as exc:
+            raise RuntimeError(f"Could not load file {in_file}. Error details: {exc}") from exc
+
+    def _apply_stages(self, data: pu.SharedArray, idx: int) -> None:
+        for stage in self.stages:
+            stage.func(idx, data.array, stage.params)  # type: ignore[arg-type]
+
+    def _do_files_load(self, data: pu.SharedArray, files: list[str]) -> pu.SharedArray:
+        """
+        Load the files concurrently on the IO thread pool, each straight into its slot in data.
+
+        Decoding and reading release the GIL, so the time is bound by the latency of each file rather than by a single
+        thread.
+        """
         progress = Progress.ensure_instance(self.progress, num_steps=len(files), task_name='Loading')
-
         with progress:
-            for idx, in_file in enumerate(files):
-                try:
-                    data.array[idx, :] = self.load_func(in_file)
-                    progress.update(msg='Image')
-                except ValueError as exc:
-                    raise ValueError("An image has different width and/or height "
-                                     "dimensions! All images must have the same "
-                                     f"dimensions. Expected dimensions: {self.img_shape} Error "
-                                     f"message: {exc}") from exc
-                except OSError as exc:
-                    raise RuntimeError(f"Could not load file {in_file}. Error details: {exc}") from exc
+            run_io_tasks(lambda idx: self._load_file(data, idx, files[idx]), len(files), progress, 'Image')
+        return data
 
+    def load_pages(self, pages: list[tuple[str, int]]) -> pu.SharedArray:
+        """
+        Load the given pages of multi-page files, each straight into its slot in the stack.
+
+        Each file is opened once, and batches of its pages are read concurrently on the IO thread pool, so the pages
+        are decoded in parallel while the file is read sequentially.
+        """
+        assert self.open_pages_func is not None
+        data = pu.create_array((len(pages), ) + tuple(self.img_shape), self.data_dtype)
+        # Runs of images from the same file, as (file, first index in data, pages)
+        runs = []
+        idx = 0
+        for in_file, file_pages in groupby(pages, key=lambda page: page[0]):
+            page_numbers = [page for _, page in file_pages]
+            runs.append((in_file, idx, page_numbers))
+            idx += len(page_numbers)
+
+        num_tasks = sum(math.ceil(len(page_numbers) / PAGES_PER_TASK) for _, _, page_numbers in runs)
+        progress = Progress.ensure_instance(self.progress, num_steps=num_tasks, task_name='Loading')
+        with progress:
+            for in_file, start, page_numbers in runs:
+                with self._load_errors(in_file), self.open_pages_func(in_file) as read_pages:
+                    run_io_tasks(partial(self._load_page_batch, data, read_pages, start, page_numbers),
+                                 math.ceil(len(page_numbers) / PAGES_PER_TASK), progress, 'Image')
         return data
 
+    def _load_page_batch(self, data: pu.SharedArray, read_pages: Callable[[Sequence[int], np.ndarray], None],
+                         start: int, page_numbers: list[int], batch: int) -> int:
+        """
+        Load a batch of the pages of a file into their slots in data, starting from start, returning the number of
+        bytes loaded.
+        """
+        first = batch * PAGES_PER_TASK
+        batch_pages = page_numbers[first:first + PAGES_PER_TASK]
+        out = data.array[start + first:start + first + len(batch_pages)]
+        read_pages(batch_pages, out)
+        for idx in range(start + first, start + first + len(batch_pages)):
+            self._apply_stages(data, idx)
+        return out.nbytes
+
     def load_files(self, files: list[str]) -> pu.SharedArray:
         # Zeroing here to make sure that we can allocate the memory.
         # If it's not possible better crash here than later.
         num_images = len(files)
         shape = (num_images, self.img_shape[0], self.img_shape[1])
         data = pu.create_array(shape, self.data_dtype)
-        return self._do_files_load_seq(data, files)
+        return self._do_files_load(data, files)
@@ -2,18 +2,22 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 import os
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from logging import getLogger
 from pathlib import Path
-from typing import TYPE_CHECKING
-from collections.abc import Callable
+from typing import Any, TYPE_CHECKING
+from collections.abc import Callable, Iterator, Sequence
 
 import numpy as np
 import astropy.io.fits as fits
 from tifffile import tifffile
 
+from mantidimaging.core.data.imagestack import COMPACT_DTYPES
 from mantidimaging.core.io.instrument_log import InstrumentLog
 from mantidimaging.core.io.loader import img_loader
+from mantidimaging.core.io.loader.nexus_loader import image_region
 from mantidimaging.core.io.utility import find_first_file_that_is_possibly_a_sample
 from mantidimaging.core.utility.data_containers import Indices, FILE_TYPES, ProjectionAngles
 from mantidimaging.core.io.filenames import FilenameGroup
@@ -21,7 +25,9 @@ from mantidimaging.core.io.filenames import FilenameGroup
 if TYPE_CHECKING:
     import numpy.typing as npt
     from mantidimaging.core.data import ImageStack
+    from mantidimaging.core.operations.base_filter import BaseFilter, ImageStage
     from mantidimaging.core.utility.progress_reporting import Progress
+    from mantidimaging.core.utility.sensible_roi import SensibleROI
 
 LOG = getLogger(__name__)
 
@@ -29,15 +35,22 @@ DEFAULT_IS_SINOGRAM = False
 DEFAULT_PIXEL_SIZE = 0
 DEFAULT_PIXEL_DEPTH = "float32"
 
+_thread_buffers = threading.local()
+
 
 @dataclass
 class ImageParameters:
     """
     Dataclass to hold info about an image stack that is to be loaded. Used with LoadingParameters
+
+    The indices select the images to load, and their step is the projection stride. Each image is cropped to the ROI
+    and binned as it is loaded, see load.
     """
     file_group: FilenameGroup
     log_file: Path | None = None
     indices: Indices | None = None
+    roi: SensibleROI | None = None
+    binning: int = 1
 
 
 @dataclass
@@ -50,10 +63,75 @@ class LoadingParameters:
 
     pixel_size: int = DEFAULT_PIXEL_SIZE
     name: str = ""
+    # float32 or float64, or uint16 or float16 to keep a compact stack, see ImageStack.is_compact
     dtype: str = DEFAULT_PIXEL_DEPTH
     sinograms: bool = DEFAULT_IS_SINOGRAM
 
 
+@dataclass(frozen=True)
+class ImageInfo:
+    """
+    Information about an image file that is read from its header, without decoding the image data
+    """
+    shape: tuple[int, ...]
+    # The dtype that the image is loaded with, after any FITS scaling, in native byte order
+    dtype: np.dtype
+    compression: str
+    # Number of pages (IFDs) in a TIFF file, always 1 for FITS
+    page_count: int
+
+
+# Maps FITS BITPIX values to the dtype of the stored data
+FITS_BITPIX_DTYPES = {8: np.uint8, 16: np.int16, 32: np.int32, 64: np.int64, -32: np.float32, -64: np.float64}
+
+
+def _tiff_info(filename: Path | str) -> ImageInfo:
+    try:
+        with tifffile.TiffFile(filename) as tif:
+            series = tif.series[0]
+            compression = tifffile.COMPRESSION(tif.pages.first.compression).name
+            return ImageInfo(tuple(series.shape), series.dtype, compression, len(tif.pages))
+    except tifffile.TiffFileError as e:
+        raise RuntimeError(f"TiffFileError {e.args[0]}: {filename}") from e
+
+
+def _fits_info(filename: Path | str) -> ImageInfo:
+    # Only the primary header is read
+    header = fits.getheader(filename)
+    shape = tuple(header[f"NAXIS{axis}"] for axis in range(header["NAXIS"], 0, -1))
+    return ImageInfo(shape, _fits_dtype(header), "NONE", 1)
+
+
+def _fits_dtype(header: fits.Header) -> np.dtype:
+    """
+    The dtype astropy loads an image with, which depends on the scaling keywords as well as BITPIX
+    """
+    stored = np.dtype(FITS_BITPIX_DTYPES[header["BITPIX"]])
+    bscale = header.get("BSCALE", 1)
+    bzero = header.get("BZERO", 0)
+    if bscale == 1 and bzero == 0:
+        return stored
+    if stored.kind == "i" and bscale == 1 and bzero == 2**(stored.itemsize * 8 - 1):
+        # Unsigned integers are stored as signed with an offset
+        return np.dtype(f"u{stored.itemsize}")
+    return np.dtype(np.float32 if stored.itemsize <= 2 else np.float64)
+
+
+def read_image_info(file_path: Path | str) -> ImageInfo:
+    """
+    Read the shape, dtype, compression and page count of an image file from its header.
+
+    This only reads the TIFF IFDs or the FITS header, so is much quicker than loading the image, especially on network
+    file systems.
+    """
+    in_format = Path(file_path).suffix.lstrip(".").lower()
+    if in_format in ['fits', 'fit']:
+        return _fits_info(file_path)
+    elif in_format in ['tiff', 'tif']:
+        return _tiff_info(file_path)
+    raise NotImplementedError("Loading not implemented for:", in_format)
+
+
 def _fitsread(filename: Path | str) -> np.ndarray:
     """
     Read one image and return it as a 2d numpy array
@@ -76,6 +154,210 @@ def _imread(filename: Path | str) -> np.ndarray:
         raise RuntimeError(f"TiffFileError {e.args[0]}: {filename}") from e
 
 
+def _fitsread_into(filename: Path | str, out: np.ndarray) -> None:
+    """
+    Read one FITS image into out, converting it to the dtype of out.
+
+    The file is memory mapped without scaling, so the data is read and converted in a single pass. Scaling keywords,
+    e.g. the BZERO used to store unsigned 16 bit data, are then applied in place.
+    """
+    with fits.open(filename, memmap=True, do_not_scale_image_data=True) as image:
+        if len(image) < 1:
+            raise RuntimeError(f"Could not load at least one FITS image/table file from: {filename}")
+        _copy_into(image[0].data, out)
+        bscale = image[0].header.get("BSCALE", 1)
+        bzero = image[0].header.get("BZERO", 0)
+    if bscale != 1:
+        np.multiply(out, bscale, out=out, casting='unsafe')
+    if bzero != 0:
+        np.add(out, bzero, out=out, casting='unsafe')
+
+
+def _imread_into(filename: Path | str, out: np.ndarray) -> None:
+    """
+    Read one TIFF image into out.
+
+    If the image has the same dtype as out it is decoded straight into out, otherwise it is decoded into a buffer that
+    is kept for the thread and converted into out in a single pass.
+    """
+    try:
+        with tifffile.TiffFile(filename) as tif:
+            series = tif.series[0]
+            _check_shape(series.shape, out.shape)
+            if series.dtype == out.dtype and out.flags.c_contiguous:
+                tif.asarray(out=out)
+            else:
+                _copy_into(tif.asarray(out=_decode_buffer(series.shape, series.dtype)), out)
+    except tifffile.TiffFileError as e:
+        raise RuntimeError(f"TiffFileError {e.args[0]}: {filename}") from e
+
+
+def _decode_buffer(shape: tuple[int, ...], dtype: npt.DTypeLike, name: str = "buffer") -> np.ndarray:
+    """
+    A buffer for decoding images into before converting them, reused while the images have the same shape and dtype.
+    Each thread keeps a buffer for each name.
+    """
+    buffer = getattr(_thread_buffers, name, None)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = np.empty(shape, dtype)
+        setattr(_thread_buffers, name, buffer)
+    return buffer
+
+
+def _copy_into(image: np.ndarray, out: np.ndarray) -> None:
+    _check_shape(image.shape, out.shape)
+    np.copyto(out, image, casting='unsafe')
+
+
+def _check_shape(shape: tuple[int, ...], expected: tuple[int, ...]) -> None:
+    # Assigning would broadcast an image with a length of 1 in any dimension, so the shapes are compared directly
+    if tuple(shape) != tuple(expected):
+        raise ValueError(f"could not load image with shape {tuple(shape)} into shape {tuple(expected)}")
+
+
+@contextmanager
+def _open_tiff_pages(filename: Path | str) -> Iterator[Callable[[Sequence[int], np.ndarray], None]]:
+    """
+    Open a multi-page TIFF and yield a function that reads the given pages of its first series into an array.
+
+    The file is only opened once. The function can be called from several threads at once: the reads from the file,
+    including the IFDs of pages that have not been looked up yet, are serialised, while the pages are decoded
+    concurrently. Pages are decoded straight into the array if it has the same dtype, otherwise into a buffer that is
+    kept for the thread and converted in a single pass.
+    """
+    try:
+        with tifffile.TiffFile(filename) as tif:
+            tif.filehandle.set_lock(True)
+            series = tif.series[0]
+            # Looking up a page reads its IFD from the current position of the file handle
+            lookup_lock = threading.Lock()
+
+            def read_pages(pages: Sequence[int], out: np.ndarray) -> None:
+                shape = (len(pages), ) + tuple(series.shape[1:])
+                _check_shape(shape, out.shape)
+                if series.dtype == out.dtype and out.flags.c_contiguous:
+                    decoded = out
+                else:
+                    decoded = _decode_buffer(shape, series.dtype)
+                with lookup_lock:
+                    tiff_pages = [series[page] for page in pages]
+                for tiff_page, page_out in zip(tiff_pages, decoded, strict=True):
+                    assert tiff_page is not None
+                    tiff_page.asarray(out=page_out, maxworkers=1)
+                if decoded is not out:
+                    _copy_into(decoded, out)
+
+            yield read_pages
+    except tifffile.TiffFileError as e:
+        raise RuntimeError(f"TiffFileError {e.args[0]}: {filename}") from e
+
+
+def loaded_image_shape(image_shape: tuple[int, ...],
+                       roi: SensibleROI | None = None,
+                       binning: int = 1) -> tuple[int, int]:
+    """
+    The shape that images are loaded with after cropping them to the ROI and binning them.
+
+    :param image_shape: The height and width of the images in the files
+    :param roi: The region of the images to load, or None for the whole images
+    :param binning: The number of pixels along each side of the blocks that are averaged into one pixel. Rows and
+                    columns at the bottom and right of the region that do not fill a block are dropped.
+    """
+    rows, columns = image_region(tuple(image_shape), roi)
+    if binning < 1:
+        raise ValueError(f"Binning must be at least 1, not {binning}")
+    shape = ((rows.stop - rows.start) // binning, (columns.stop - columns.start) // binning)
+    if 0 in shape:
+        raise ValueError(f"Binning by {binning} is larger than the region to load, {rows.stop - rows.start} x "
+                         f"{columns.stop - columns.start}")
+    return shape
+
+
+def _reduce_into(images: np.ndarray, out: np.ndarray, rows: slice, columns: slice, binning: int) -> None:
+    """
+    Crop an image, or a batch of images, to the rows and columns and average each block of binning x binning pixels
+    into out, which has the binned shape.
+    """
+    height, width = out.shape[-2:]
+    region = images[..., rows.start:rows.start + height * binning, columns.start:columns.start + width * binning]
+    if binning == 1:
+        _copy_into(region, out)
+        return
+    blocks = region.reshape(region.shape[:-2] + (height, binning, width, binning))
+    mean = blocks.mean(axis=(-3, -1), dtype=np.float64 if out.dtype == np.float64 else np.float32)
+    if out.dtype.kind in "ui":
+        # Round, as the cast to integers would truncate every binned pixel down
+        np.rint(mean, out=mean)
+    _copy_into(mean, out)
+
+
+def _reducing_loader_into(load_into_func: Callable[[Path | str, np.ndarray],
+                                                   None], image_shape: tuple[int, ...], dtype: npt.DTypeLike,
+                          roi: SensibleROI | None, binning: int) -> Callable[[Path | str, np.ndarray], None]:
+    """
+    Wrap a function that reads an image into an array so that it crops and bins the image into the array instead.
+    Each image is decoded into a buffer kept for the thread in the dtype of the file, so only the pixels that are
+    kept are converted.
+    """
+    rows, columns = image_region(tuple(image_shape), roi)
+
+    def load_into(filename: Path | str, out: np.ndarray) -> None:
+        image = _decode_buffer(tuple(image_shape), dtype, "region_buffer")
+        load_into_func(filename, image)
+        _reduce_into(image, out, rows, columns, binning)
+
+    return load_into
+
+
+def _reducing_pages_opener(open_pages_func: Callable[[str], Any], image_shape: tuple[int, ...], dtype: npt.DTypeLike,
+                           roi: SensibleROI | None, binning: int) -> Callable[[str], Any]:
+    """
+    Wrap a function that opens a multi-page file, like _open_tiff_pages, so that the pages are cropped and binned as
+    they are read.
+    """
+    rows, columns = image_region(tuple(image_shape), roi)
+
+    @contextmanager
+    def open_pages(filename: str) -> Iterator[Callable[[Sequence[int], np.ndarray], None]]:
+        with open_pages_func(filename) as read_pages:
+
+            def read_reduced_pages(pages: Sequence[int], out: np.ndarray) -> None:
+                images = _decode_buffer((len(pages), ) + tuple(image_shape), dtype, "region_buffer")
+                read_pages(pages, images)
+                _reduce_into(images, out, rows, columns, binning)
+
+            yield read_reduced_pages
+
+    return open_pages
+
+
+def _is_multi_page(in_format: str, info: ImageInfo) -> bool:
+    return in_format in ['tiff', 'tif'] and len(info.shape) == 3
+
+
+def _image_pages(file_names: list[str], first_info: ImageInfo) -> list[tuple[str, int]]:
+    """
+    The file and page of each image in a series of multi-page files. Only the IFDs of each file are read.
+    """
+    page_counts = [first_info.shape[0]] + [read_image_info(file_name).shape[0] for file_name in file_names[1:]]
+    return [(file_name, page) for file_name, page_count in zip(file_names, page_counts, strict=True)
+            for page in range(page_count)]
+
+
+def count_images(filename_group: FilenameGroup) -> int:
+    """
+    The number of images in the files of a group, counting each page of multi-page TIFF files.
+
+    Only the header of the first file is read unless it has several pages, as single page files are assumed to all be
+    single page.
+    """
+    first_file = filename_group.first_file()
+    info = read_image_info(first_file)
+    if not _is_multi_page(first_file.suffix.lstrip('.').lower(), info):
+        return len(filename_group.all_indexes)
+    return len(_image_pages([str(p) for p in filename_group.all_files()], info))
+
+
 def get_loader(in_format: str) -> Callable[[Path | str], np.ndarray]:
     if in_format in ['fits', 'fit']:
         load_func = _fitsread
@@ -86,16 +368,28 @@ def get_loader(in_format: str) -> Callable[[Path | str], np.ndarray]:
     return load_func
 
 
+def get_loader_into(in_format: str) -> Callable[[Path | str, np.ndarray], None]:
+    """
+    Get the function for reading an image of in_format into an existing array.
+    """
+    if in_format in ['fits', 'fit']:
+        return _fitsread_into
+    elif in_format in ['tiff', 'tif']:
+        return _imread_into
+    raise NotImplementedError("Loading not implemented for:", in_format)
+
+
 def read_image_dimensions(file_path: Path) -> tuple[int, int]:
-    load_func = get_loader(file_path.suffix.replace(".", ""))
-    img = load_func(file_path)
-    assert len(img.shape) == 2
-    return img.shape
+    """
+    The height and width of the images in a file, which may have several pages
+    """
+    shape = read_image_info(file_path).shape
+    assert len(shape) in (2, 3)
+    return shape[-2], shape[-1]
 
 
 def load_log(log_file: Path) -> InstrumentLog:
-    with open(log_file) as f:
-        return InstrumentLog(f.readlines(), log_file)
+    return InstrumentLog.from_file(log_file)
 
 
 def load_stack_from_group(group: FilenameGroup, progress: Progress | None = None) -> ImageStack:
@@ -109,25 +403,37 @@ def load_stack_from_image_params(image_params: ImageParameters,
                 progress=progress,
                 dtype=dtype,
                 indices=image_params.indices,
-                log_file=image_params.log_file)
+                log_file=image_params.log_file,
+                roi=image_params.roi,
+                binning=image_params.binning)
 
 
 def load(filename_group: FilenameGroup,
          dtype: npt.DTypeLike = np.float32,
          indices: list[int] | Indices | None = None,
          progress: Progress | None = None,
-         log_file: Path | None = None) -> ImageStack:
+         log_file: Path | None = None,
+         stages: list[ImageStage] | None = None,
+         roi: SensibleROI | None = None,
+         binning: int = 1) -> ImageStack:
     """
 
     Loads a stack, including sample, white and dark images.
 
-    :param dtype: Default:np.float32, data type for the input images
+    Only the selected images are read, and each is cropped to the ROI and binned as it is decoded, so the memory used
+    is that of the stack that is kept.
+
+    :param dtype: Default:np.float32, data type for the input images. Images can only be loaded as integers if their
+                  values fit without conversion, e.g. raw uint16 counts.
     :param filename_group: FilenameGroup to provided file names for loading
     :param indices: Specify which indices are loaded from the found files.
                     This **DOES NOT** check for the number in the image
                     filename, but removes all indices from the filenames list
                     that are not selected
     :param progress: The progress reporting instance
+    :param stages: Filters to apply to each image as it is loaded, see load_and_process
+    :param roi: The region of the images to load, or None for the whole images
+    :param binning: Average blocks of binning x binning pixels into one, see loaded_image_shape
     :return: an ImageStack
     """
     if indices and len(indices) < 3:
@@ -136,6 +442,25 @@ def load(filename_group: FilenameGroup,
     file_names = [str(p) for p in filename_group.all_files()]
     in_format = filename_group.first_file().suffix.lstrip('.')
     load_func = get_loader(in_format)
+    load_into_func = get_loader_into(in_format)
+    open_pages_func: Callable[[str], Any] = _open_tiff_pages
+
+    # All the images are assumed to have the same shape as the first
+    img_shape = None
+    pages = None
+    if file_names:
+        img_info = read_image_info(file_names[0])
+        img_shape = img_info.shape
+        if np.dtype(dtype).kind in "ui" and not np.can_cast(img_info.dtype, dtype):
+            raise ValueError(f"Images of type {img_info.dtype} can not be loaded as {np.dtype(dtype)} without "
+                             "changing their values")
+        if _is_multi_page(in_format.lower(), img_info):
+            pages = _image_pages(file_names, img_info)
+            img_shape = img_shape[1:]
+        if roi is not None or binning != 1:
+            load_into_func = _reducing_loader_into(load_into_func, img_shape, img_info.dtype, roi, binning)
+            open_pages_func = _reducing_pages_opener(open_pages_func, img_shape, img_info.dtype, roi, binning)
+            img_shape = loaded_image_shape(img_shape, roi, binning)
 
     if log_file is not None:
         log_data = load_log(log_file)
@@ -143,9 +468,22 @@ def load(filename_group: FilenameGroup,
             angles = log_data.projection_angles().value
             angle_order = np.argsort(angles)
             angles = angles[angle_order]
-            file_names = [file_names[i] for i in angle_order]
-
-    image_stack = img_loader.execute(load_func, file_names, in_format, dtype, indices, progress)
+            if pages is not None:
+                pages = [pages[i] for i in angle_order]
+            else:
+                file_names = [file_names[i] for i in angle_order]
+
+    image_stack = img_loader.execute(load_func,
+                                     file_names,
+                                     in_format,
+                                     dtype,
+                                     indices,
+                                     progress,
+                                     load_into_func=load_into_func,
+                                     img_shape=img_shape,
+                                     stages=stages,
+                                     pages=pages,
+                                     open_pages_func=open_pages_func)
 
     if log_file is not None:
         image_stack.log_file = log_data
@@ -165,6 +503,37 @@ def load(filename_group: FilenameGroup,
     return image_stack
 
 
+def load_and_process(filename_group: FilenameGroup,
+                     operations: list[tuple[type[BaseFilter], dict[str, Any]]],
+                     dtype: npt.DTypeLike = np.float32,
+                     indices: list[int] | Indices | None = None,
+                     progress: Progress | None = None,
+                     log_file: Path | None = None) -> ImageStack:
+    """
+    Load a stack and apply per-projection operations to each image as it is loaded.
+
+    Each image is decoded and then put through the operations by the same IO thread, while other threads are reading
+    further files, so that the time taken approaches the slower of loading and processing rather than their sum. The
+    operations are recorded in the operation history of the stack as if they had been run after loading.
+
+    :param operations: Filter classes with the keyword arguments to run them with, in order. Each filter must support
+                       image_stage.
+    """
+    if operations and np.dtype(dtype) in COMPACT_DTYPES:
+        raise ValueError(f"Operations can not be applied to images as they are loaded as {np.dtype(dtype)}")
+    stages = []
+    for operation, kwargs in operations:
+        stage = operation.image_stage(**kwargs)
+        if stage is None or not getattr(stage.func, "thread_safe", False):
+            raise ValueError(f"{operation.filter_name} can not be applied to each image as it is loaded")
+        stages.append(stage)
+
+    image_stack = load(filename_group, dtype, indices, progress, log_file, stages=stages)
+    for operation, kwargs in operations:
+        image_stack.record_operation(operation.__name__, operation.filter_name, **kwargs)
+    return image_stack
+
+
 def create_loading_parameters_for_file_path(file_path: Path) -> LoadingParameters | None:
     sample_file = find_first_file_that_is_possibly_a_sample(str(file_path))
     if sample_file is None:
@@ -0,0 +1,316 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+This module reads selections of images, or of regions of them, from NeXus (HDF5) datasets into shared memory, or
+lazily as they are viewed
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from logging import getLogger
+from typing import Any, TYPE_CHECKING
+
+import numpy as np
+
+from mantidimaging.core.io.utility import run_io_tasks
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility.sensible_roi import SensibleROI
+from mantidimaging.core.utility.progress_reporting import Progress
+
+if TYPE_CHECKING:
+    import h5py
+    import numpy.typing as npt
+
+LOG = getLogger(__name__)
+
+# Memory kept for decoded blocks of images by each lazy view
+LAZY_CACHE_BYTES = 512 * 1024**2
+# Size of the blocks of rows read from datasets without chunks, so a sinogram does not read whole images
+LAZY_BLOCK_BYTES = 256 * 1024
+
+
+def index_runs(indices: np.ndarray) -> list[tuple[slice, slice]]:
+    """
+    Splits increasing image indices into runs with an equal step between them, each of which can be read as one
+    hyperslab.
+
+    :param indices: Increasing indices of images in a dataset
+    :return: Pairs of (source, destination) slices, the source in the dataset and the destination in the array of the
+             selected images
+    """
+    runs = []
+    start = 0
+    while start < len(indices):
+        stop = start + 1
+        if stop < len(indices):
+            step = indices[stop] - indices[start]
+            while stop < len(indices) and indices[stop] - indices[stop - 1] == step:
+                stop += 1
+        else:
+            step = 1
+        runs.append((slice(int(indices[start]), int(indices[stop - 1]) + 1, int(step)), slice(start, stop)))
+        start = stop
+    return runs
+
+
+def image_region(image_shape: tuple[int, ...], roi: SensibleROI | None) -> tuple[slice, slice]:
+    """
+    The rows and columns of an ROI of images, or of the whole images if there is no ROI.
+
+    :param image_shape: The shape of one image
+    :param roi: The region of the images, which must be within them
+    :return: Slices of the rows and columns in the region
+    """
+    if roi is None:
+        return slice(0, image_shape[0]), slice(0, image_shape[1])
+    if not (0 <= roi.left < roi.right <= image_shape[1] and 0 <= roi.top < roi.bottom <= image_shape[0]):
+        raise ValueError(f"The region ({roi}) is not within the images of shape {image_shape}")
+    return slice(roi.top, roi.bottom), slice(roi.left, roi.right)
+
+
+def read_images(dataset: h5py.Dataset,
+                indices: np.ndarray,
+                dtype: npt.DTypeLike,
+                progress: Progress | None = None,
+                roi: SensibleROI | None = None) -> pu.SharedArray:
+    """
+    Reads the images at the given indices of a dataset straight into a new shared array, without an intermediate copy.
+
+    Datasets stored contiguously and uncompressed are read an image at a time on the IO thread pool. Otherwise the
+    images are read with one hyperslab for each run of evenly spaced indices, and converted to dtype by HDF5. When
+    the dataset is chunked only the chunks that overlap the ROI are read.
+
+    :param dataset: A 3D dataset of images
+    :param indices: Increasing indices of the images to read
+    :param dtype: The dtype of the shared array
+    :param progress: Updated as each image, or run of images, is read
+    :param roi: Only read this region of each image
+    """
+    rows, columns = image_region(dataset.shape[1:], roi)
+    data = pu.create_array((len(indices), rows.stop - rows.start, columns.stop - columns.start), dtype)
+    progress = Progress.ensure_instance(progress, task_name='Loading')
+    offset = _contiguous_offset(dataset)
+    with progress:
+        if offset is not None:
+            _read_contiguous_images(dataset, offset, indices, rows, columns, data.array, progress)
+        else:
+            runs = index_runs(indices)
+            progress.add_estimated_steps(len(runs))
+            for source, destination in runs:
+                dataset.read_direct(data.array, np.s_[source, rows, columns], destination)
+                progress.update(msg='Image')
+    return data
+
+
+def _contiguous_offset(dataset: h5py.Dataset) -> int | None:
+    """
+    The offset of the data in the file if it is stored as a plain contiguous array that can be read directly.
+    """
+    if (dataset.chunks is not None or dataset.compression is not None or dataset.external is not None
+            or dataset.dtype.kind not in "biuf" or dataset.file.driver != "sec2" or dataset.file.userblock_size != 0):
+        return None
+    return dataset.id.get_offset()
+
+
+def _read_contiguous_images(dataset: h5py.Dataset, offset: int, indices: np.ndarray, rows: slice, columns: slice,
+                            out: np.ndarray, progress: Progress) -> None:
+    """
+    Reads the rows of each image that are in the region, which are contiguous in the file, and then the columns in
+    the region from them.
+    """
+    row_bytes = dataset.shape[2] * dataset.dtype.itemsize
+    image_bytes = dataset.shape[1] * row_bytes
+    region_bytes = (rows.stop - rows.start) * row_bytes
+    filename = dataset.file.filename
+    # Reading into the output directly needs the same dtype and byte order as the file, and whole rows
+    read_into_out = out.dtype == dataset.dtype and columns == slice(0, dataset.shape[2])
+
+    def read_image(idx: int) -> int:
+        buffer: np.ndarray = out[idx] if read_into_out else np.empty(
+            (rows.stop - rows.start, dataset.shape[2]), dataset.dtype)
+        with open(filename, "rb", buffering=0) as f:
+            f.seek(offset + int(indices[idx]) * image_bytes + rows.start * row_bytes)
+            if f.readinto(buffer.data.cast("B")) != region_bytes:
+                raise OSError(f"Could not read image {indices[idx]} from {filename}")
+        if not read_into_out:
+            out[idx] = buffer[:, columns]
+        return region_bytes
+
+    progress.add_estimated_steps(len(indices))
+    run_io_tasks(read_image, len(indices), progress, 'Image')
+
+
+class LazyNexusImages:
+    """
+    A read only view of the images at the given indices of a NeXus dataset, or of a region of them, which reads
+    images and sinograms from the file as they are indexed instead of loading the whole stack.
+
+    The dataset is read in blocks of rows of one image, which match the chunks of the dataset when it has them, and
+    the decoded blocks are kept in a least recently used cache. The dataset stays open until :meth:`load` reads the
+    whole selection into shared memory, after which indexing reads from the loaded array. If the view is given the
+    file the dataset is in, it closes the file once it is loaded, closed or deleted.
+    """
+
+    def __init__(self,
+                 dataset: h5py.Dataset,
+                 indices: np.ndarray,
+                 dtype: npt.DTypeLike,
+                 cache_bytes: int = LAZY_CACHE_BYTES,
+                 roi: SensibleROI | None = None,
+                 nexus_file: h5py.File | None = None):
+        """
+        :param dataset: A 3D dataset of images
+        :param indices: Increasing indices of the images in the view
+        :param dtype: The dtype that images are converted to when read
+        :param cache_bytes: The memory used to cache blocks of decoded images
+        :param roi: Only view this region of each image
+        :param nexus_file: The file that the dataset is in, which the view takes ownership of. If None the caller
+            closes the file.
+        """
+        self._file = nexus_file
+        self._dataset: h5py.Dataset | None = dataset
+        self._loaded: pu.SharedArray | None = None
+        self.indices = np.asarray(indices)
+        self.dtype = np.dtype(dtype)
+        self.roi = roi
+        self.rows, self.columns = image_region(dataset.shape[1:], roi)
+        self.shape: tuple[int, ...] = (len(self.indices), self.rows.stop - self.rows.start,
+                                       self.columns.stop - self.columns.start)
+        # Blocks are numbered by the rows of the dataset, so that they line up with its chunks
+        self._dataset_rows = dataset.shape[1]
+        if dataset.chunks is not None:
+            self.block_rows = dataset.chunks[1]
+        else:
+            row_bytes = dataset.shape[2] * dataset.dtype.itemsize
+            self.block_rows = max(1, min(self._dataset_rows, LAZY_BLOCK_BYTES // max(row_bytes, 1)))
+        self.cache_bytes = cache_bytes
+        self._blocks: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self._cached_bytes = 0
+        # Guards the dataset and the cache. Blocks are read from the dataset while holding it, as h5py only runs one
+        # call at a time anyway.
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def __del__(self) -> None:
+        if getattr(self, "_file", None) is not None:
+            self.close()
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded is not None
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key: Any) -> np.ndarray:
+        """
+        Reads the selected part of the images. Only the image and row indices select which blocks are read, any
+        further indices are applied to the rows that were read.
+        """
+        if self._loaded is not None:
+            return self._loaded.array[key]
+        if not isinstance(key, tuple):
+            key = (key, )
+        if len(key) > self.ndim:
+            raise IndexError(f"Too many indices for the images: {key}")
+        image_key, row_key = (key + (slice(None), ) * 2)[:2]
+        images = np.arange(self.shape[0])[image_key]
+        rows = np.arange(self.shape[1])[row_key]
+
+        out = np.empty(images.shape + rows.shape + self.shape[2:], self.dtype)
+        flat_out = out.reshape((images.size, rows.size) + self.shape[2:])
+        flat_rows = rows.ravel() + self.rows.start
+        row_blocks = flat_rows // self.block_rows
+        for out_idx, image in enumerate(images.ravel()):
+            for block in np.unique(row_blocks):
+                in_block = row_blocks == block
+                flat_out[out_idx, in_block] = self._block(int(image),
+                                                          int(block))[flat_rows[in_block] - block * self.block_rows]
+        return out[(slice(None), ) * (images.ndim + rows.ndim) + key[2:]]
+
+    def __array__(self, dtype: npt.DTypeLike | None = None, copy: bool | None = None) -> np.ndarray:
+        return self[:] if dtype is None else self[:].astype(dtype)
+
+    def transpose(self, *axes: Any) -> LazyNexusImages | np.ndarray:
+        if len(axes) == 1 and axes[0] is not None:
+            axes = tuple(axes[0])
+        if axes in ((), (None, ), tuple(range(self.ndim))):
+            return self
+        return np.asarray(self).transpose(axes)
+
+    def min(self) -> Any:
+        return min(np.min(self[idx]) for idx in range(len(self)))
+
+    def max(self) -> Any:
+        return max(np.max(self[idx]) for idx in range(len(self)))
+
+    def load(self, progress: Progress | None = None) -> pu.SharedArray:
+        """
+        Reads all of the images into a new shared array, and closes the dataset.
+        """
+        with self._load_lock:
+            if self._loaded is None:
+                if self._dataset is None:
+                    raise ValueError("Can not read images from a closed NeXus file")
+                loaded = read_images(self._dataset, self.indices, self.dtype, progress, self.roi)
+                with self._lock:
+                    self._loaded = loaded
+                    self._blocks.clear()
+                    self._cached_bytes = 0
+                self.close()
+        return self._loaded
+
+    def close(self) -> None:
+        """
+        Closes the dataset, and the file if the view owns it. Only a loaded view can be indexed after it is closed.
+        """
+        with self._lock:
+            self._dataset = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _block(self, image: int, block: int) -> np.ndarray:
+        key = (image, block)
+        rows = slice(block * self.block_rows, min((block + 1) * self.block_rows, self._dataset_rows))
+        with self._lock:
+            if key in self._blocks:
+                self._blocks.move_to_end(key)
+                return self._blocks[key]
+            if self._loaded is not None:
+                # The view was loaded while this block was being looked up
+                return self._loaded_block(self._loaded, image, rows)
+            if self._dataset is None:
+                raise ValueError("Can not read images from a closed NeXus file")
+
+            data = np.empty((rows.stop - rows.start, ) + self.shape[2:], self.dtype)
+            self._dataset.read_direct(data, np.s_[int(self.indices[image]), rows, self.columns])
+            self._blocks[key] = data
+            self._cached_bytes += data.nbytes
+            while self._cached_bytes > self.cache_bytes and len(self._blocks) > 1:
+                _, evicted = self._blocks.popitem(last=False)
+                self._cached_bytes -= evicted.nbytes
+        return data
+
+    def _loaded_block(self, loaded: pu.SharedArray, image: int, rows: slice) -> np.ndarray:
+        """
+        A block of rows of the dataset copied from the loaded images. Only the rows inside the region of the view are
+        filled in, as no others are indexed.
+        """
+        data = np.empty((rows.stop - rows.start, ) + self.shape[2:], self.dtype)
+        start, stop = max(rows.start, self.rows.start), min(rows.stop, self.rows.stop)
+        data[start - rows.start:stop - rows.start] = loaded.array[image, start - self.rows.start:stop - self.rows.start]
+        return data
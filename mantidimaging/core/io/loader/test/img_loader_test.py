@@ -0,0 +1,120 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import time
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.io.loader.img_loader import PAGES_PER_TASK, ImageLoader, execute
+from mantidimaging.core.operations.base_filter import ImageStage
+from mantidimaging.core.utility.progress_reporting import Progress
+
+IMG_SHAPE = (4, 6)
+
+
+def _load_numbered_image(filename: str) -> np.ndarray:
+    number = int(filename.split("_")[1])
+    # Files finish loading out of order
+    time.sleep(0.001 * (number % 3))
+    return np.full(IMG_SHAPE, number, dtype=np.float32)
+
+
+class ImageLoaderTest(unittest.TestCase):
+
+    def _loader(self, load_func=_load_numbered_image, progress=None, stages=None) -> ImageLoader:
+        return ImageLoader(load_func, "tif", IMG_SHAPE, np.float32, None, progress, stages=stages)
+
+    def test_files_loaded_into_their_slots(self):
+        files = [f"img_{i}" for i in range(20)]
+
+        data = self._loader().load_files(files)
+
+        npt.assert_equal(data.array, np.arange(20, dtype=np.float32)[:, np.newaxis, np.newaxis] * np.ones(IMG_SHAPE))
+
+    def test_execute_selects_indices(self):
+        files = [f"img_{i}" for i in range(10)]
+
+        images = execute(_load_numbered_image, files, "tif", np.float32, [2, 8, 3])
+
+        npt.assert_equal(images.data[:, 0, 0], [2, 5])
+
+    def test_stages_applied_in_order_to_each_image(self):
+
+        def add(i, array, params):
+            array[i] += params["value"]
+
+        def multiply(i, array, params):
+            array[i] *= params["value"]
+
+        stages = [ImageStage(add, {"value": 1}), ImageStage(multiply, {"value": 3})]
+
+        data = self._loader(stages=stages).load_files([f"img_{i}" for i in range(20)])
+
+        npt.assert_equal(data.array[:, 0, 0], (np.arange(20) + 1) * 3)
+
+    def test_mismatched_dimensions_raise_value_error(self):
+
+        def load_func(filename):
+            return np.zeros((3, 3)) if filename == "img_3" else np.zeros(IMG_SHAPE)
+
+        with self.assertRaisesRegex(ValueError, "different width and/or height"):
+            self._loader(load_func).load_files([f"img_{i}" for i in range(5)])
+
+    def test_io_error_raises_runtime_error_with_filename(self):
+
+        def load_func(filename):
+            if filename == "img_2":
+                raise OSError("disk gone")
+            return np.zeros(IMG_SHAPE)
+
+        with self.assertRaisesRegex(RuntimeError, "Could not load file img_2. Error details: disk gone"):
+            self._loader(load_func).load_files([f"img_{i}" for i in range(5)])
+
+    def test_pages_loaded_into_their_slots(self):
+        opened_files = []
+
+        @contextmanager
+        def open_pages(filename):
+            opened_files.append(filename)
+            first_page = int(filename.split("_")[1])
+
+            def read_pages(pages, out):
+                out[:] = (first_page + np.array(pages))[:, np.newaxis, np.newaxis]
+
+            yield read_pages
+
+        pages = [("img_0", page) for page in range(2 * PAGES_PER_TASK + 1)] + [("img_100", 3), ("img_100", 1)]
+        loader = ImageLoader(_load_numbered_image, "tif", IMG_SHAPE, np.float32, None, open_pages_func=open_pages)
+
+        data = loader.load_pages(pages)
+
+        self.assertEqual(["img_0", "img_100"], opened_files)
+        npt.assert_equal(data.array[:, 0, 0], list(range(2 * PAGES_PER_TASK + 1)) + [103, 101])
+
+    def test_progress_reports_throughput(self):
+        progress = Progress()
+
+        self._loader(progress=progress).load_files([f"img_{i}" for i in range(5)])
+
+        image_messages = [step.msg for step in progress.progress_history if step.msg.startswith("Image")]
+        self.assertEqual(5, len(image_messages))
+        self.assertRegex(image_messages[-1], r"^Image, [\d.]+ MB/s")
+
+    def test_cancel_stops_remaining_files(self):
+        progress = Progress()
+        progress.cancel()
+        load_func = mock.Mock(return_value=np.zeros(IMG_SHAPE))
+
+        with self.assertRaisesRegex(RuntimeError, "cancelled"):
+            self._loader(load_func, progress).load_files([f"img_{i}" for i in range(500)])
+
+        self.assertLess(load_func.call_count, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,13 +2,16 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
 import unittest
 from pathlib import Path
 
+import numpy as np
 from numpy.testing import assert_allclose
 
 from .instrument_log_data import IMAT_2023_SPECTRA_LOG, INVALID_FILE, IMAT_2019_TOMO_LOG
 from mantidimaging.core.io.instrument_log import LogColumn, InstrumentLog, NoParserFound
+from mantidimaging.test_helpers.unit_test_helper import FakeFSTestCase
 
 
 class FilenamePatternTest(unittest.TestCase):
@@ -29,3 +32,39 @@ class FilenamePatternTest(unittest.TestCase):
     def test_WHEN_invalid_file_THEN_exception(self):
         filename, data = INVALID_FILE
         self.assertRaises(NoParserFound, InstrumentLog, data, Path(filename))
+
+    def test_WHEN_read_spectra_file_THEN_columns_are_read_only_arrays(self):
+        filename, data = IMAT_2023_SPECTRA_LOG
+        log = InstrumentLog(data.split("\n"), Path(filename))
+
+        for key in (LogColumn.TIME_OF_FLIGHT, LogColumn.SPECTRUM_COUNTS):
+            column = log.get_column(key)
+            self.assertIsInstance(column, np.ndarray)
+            self.assertFalse(column.flags.writeable)
+        self.assertEqual(log.get_column(LogColumn.SPECTRUM_COUNTS).dtype, np.int64)
+        self.assertEqual(log.length, 4)
+
+
+class InstrumentLogFromFileTest(FakeFSTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.filename, data = IMAT_2023_SPECTRA_LOG
+        self.fs.create_file(self.filename, contents=data)
+
+    def test_WHEN_file_read_twice_THEN_parsed_once(self):
+        log = InstrumentLog.from_file(Path(self.filename))
+
+        self.assertIs(InstrumentLog.from_file(Path(self.filename)), log)
+        assert_allclose(log.get_column(LogColumn.SPECTRUM_COUNTS), [334937, 331913, 331737, 331161])
+
+    def test_WHEN_file_modified_THEN_parsed_again(self):
+        log = InstrumentLog.from_file(Path(self.filename))
+        with open(self.filename, "a") as f:
+            f.write("0.0121639\t330000\n")
+        os.utime(self.filename, ns=(0, os.stat(self.filename).st_mtime_ns + 1))
+
+        new_log = InstrumentLog.from_file(Path(self.filename))
+
+        self.assertIsNot(new_log, log)
+        self.assertEqual(new_log.length, 5)
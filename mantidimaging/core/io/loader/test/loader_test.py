@@ -1,17 +1,31 @@
 # Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
+import os
+import tempfile
+import unittest
 from pathlib import Path
 from unittest import mock
 
+import astropy.io.fits as fits
 import numpy as np
+import numpy.testing as npt
+from parameterized import parameterized
+from tifffile import tifffile
 
 from mantidimaging.core.io.filenames import FilenameGroup
 from mantidimaging.core.io.instrument_log import InstrumentLog
 from mantidimaging.core.io.loader.loader import (DEFAULT_PIXEL_DEPTH, DEFAULT_PIXEL_SIZE, DEFAULT_IS_SINOGRAM,
-                                                 create_loading_parameters_for_file_path, get_loader, load, _imread)
+                                                 create_loading_parameters_for_file_path, get_loader, load, _imread,
+                                                 _imread_into, _fitsread_into, read_image_info, read_image_dimensions,
+                                                 load_and_process, _open_tiff_pages, count_images, loaded_image_shape)
+from mantidimaging.core.operation_history import const
+from mantidimaging.core.operations.clip_values import ClipValuesFilter
+from mantidimaging.core.operations.rebin import RebinFilter
+from mantidimaging.core.operations.rescale import RescaleFilter
 
-from mantidimaging.core.utility.data_containers import FILE_TYPES, ProjectionAngles
+from mantidimaging.core.utility.data_containers import FILE_TYPES, Indices, ProjectionAngles
+from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.test_helpers.unit_test_helper import FakeFSTestCase
 
 
@@ -26,6 +40,12 @@ class LoaderTest(FakeFSTestCase):
 
         self.assertRaisesRegex(RuntimeError, filename, _imread, filename=filename)
 
+    def test_WHEN_tif_file_invalid_THEN_imread_into_has_filename_in_exception_message(self):
+        filename = "/foo/bar/a.tif"
+        self.fs.create_file(filename, contents="BADDATA")
+
+        self.assertRaisesRegex(RuntimeError, filename, _imread_into, filename, np.zeros((3, 4)))
+
     def test_create_loading_parameters_for_file_path(self):
         output_directory = Path("/b")
         for filename in ["Tomo_log.txt", "Flat_After_log.txt", "Flat_Before_log.txt"]:
@@ -71,9 +91,10 @@ class LoaderTest(FakeFSTestCase):
         self._file_in_sequence(Path("/b/180deg/180deg_0000.tif"), sample.file_group.all_files())
         self.assertEqual(1, len(list(sample.file_group.all_files())))
 
+    @mock.patch('mantidimaging.core.io.loader.loader.read_image_info')
     @mock.patch('mantidimaging.core.io.loader.loader.load_log')
     @mock.patch('mantidimaging.core.io.loader.loader.img_loader.execute')
-    def test_load_with_golden_angles(self, mock_execute: mock.Mock, mock_load_log: mock.Mock):
+    def test_load_with_golden_angles(self, mock_execute: mock.Mock, mock_load_log: mock.Mock, _):
         filenames = [Path(f"foo_{n}.tif") for n in range(20)]
         angles = np.array([(n * 137.507764) % 360 for n in range(20)])
 
@@ -96,3 +117,261 @@ class LoaderTest(FakeFSTestCase):
         self._file_list_count_equal(filenames, reordered_filenames)
         self.assertListEqual(['foo_0.tif', 'foo_8.tif', 'foo_16.tif', 'foo_3.tif', 'foo_11.tif'],
                              reordered_filenames[:5])
+
+
+class ImageFileTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tif_path = os.path.join(self.temp_dir.name, "img.tif")
+        self.fits_path = os.path.join(self.temp_dir.name, "img.fits")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    @parameterized.expand([("same_dtype", np.float32), ("converted", np.uint16)])
+    def test_imread_into(self, _, file_dtype):
+        image = np.arange(12, dtype=file_dtype).reshape(3, 4)
+        tifffile.imwrite(self.tif_path, image)
+        out = np.zeros((2, 3, 4), dtype=np.float32)
+
+        _imread_into(self.tif_path, out[1])
+
+        npt.assert_equal(out[1], image)
+        npt.assert_equal(out[0], 0)
+
+    def test_imread_into_wrong_shape_raises(self):
+        tifffile.imwrite(self.tif_path, np.zeros((1, 4), dtype=np.uint16))
+
+        self.assertRaises(ValueError, _imread_into, self.tif_path, np.zeros((3, 4), dtype=np.float32))
+
+    @parameterized.expand([
+        ("float", np.array([[-1.5, 0], [2.5, 1e6]], dtype=np.float32), np.float32),
+        ("unsigned_converted", np.array([[0, 1], [40000, 65535]], dtype=np.uint16), np.float32),
+        ("unsigned", np.array([[0, 1], [40000, 65535]], dtype=np.uint16), np.uint16),
+        ("signed", np.array([[-32768, -1], [0, 32767]], dtype=np.int16), np.float32),
+    ])
+    def test_fitsread_into(self, _, image, out_dtype):
+        fits.PrimaryHDU(image).writeto(self.fits_path)
+        out = np.zeros((2, 2), dtype=out_dtype)
+
+        _fitsread_into(self.fits_path, out)
+
+        npt.assert_equal(out, image)
+
+    @parameterized.expand([("uncompressed", None, "NONE"), ("compressed", "zlib", "ADOBE_DEFLATE")])
+    def test_read_tiff_info(self, _, compression, expected_compression):
+        tifffile.imwrite(self.tif_path, np.zeros((3, 4), dtype=np.uint16), compression=compression)
+
+        with mock.patch('mantidimaging.core.io.loader.loader.tifffile.TiffFile.asarray') as mock_asarray:
+            info = read_image_info(self.tif_path)
+        mock_asarray.assert_not_called()
+
+        self.assertEqual((3, 4), info.shape)
+        self.assertEqual(np.uint16, info.dtype)
+        self.assertEqual(expected_compression, info.compression)
+        self.assertEqual(1, info.page_count)
+
+    def test_read_tiff_info_page_count(self):
+        with tifffile.TiffWriter(self.tif_path) as tif:
+            for _ in range(3):
+                tif.write(np.zeros((3, 4), dtype=np.float32))
+
+        self.assertEqual(3, read_image_info(self.tif_path).page_count)
+
+    @parameterized.expand([
+        ("float", np.zeros((3, 4), dtype=np.float32), np.float32),
+        ("unsigned", np.zeros((3, 4), dtype=np.uint16), np.uint16),
+        ("signed", np.zeros((3, 4), dtype=np.int16), np.int16),
+        ("3d", np.zeros((2, 3, 4), dtype=np.float64), np.float64),
+    ])
+    def test_read_fits_info_matches_loaded_image(self, _, image, expected_dtype):
+        fits.PrimaryHDU(image).writeto(self.fits_path)
+
+        info = read_image_info(self.fits_path)
+
+        self.assertEqual(image.shape, info.shape)
+        self.assertEqual(expected_dtype, info.dtype)
+        with fits.open(self.fits_path) as hdul:
+            self.assertEqual(hdul[0].data.dtype.newbyteorder("="), info.dtype)
+
+    def test_read_fits_info_scaled(self):
+        hdu = fits.PrimaryHDU(np.zeros((3, 4), dtype=np.float32))
+        hdu.scale('int16', bscale=0.5)
+        hdu.writeto(self.fits_path)
+
+        with fits.open(self.fits_path) as hdul:
+            self.assertEqual(hdul[0].data.dtype.newbyteorder("="), read_image_info(self.fits_path).dtype)
+
+    def test_read_image_dimensions(self):
+        tifffile.imwrite(self.tif_path, np.zeros((3, 4), dtype=np.uint16))
+
+        self.assertEqual((3, 4), read_image_dimensions(Path(self.tif_path)))
+
+    def test_read_image_dimensions_multi_page(self):
+        tifffile.imwrite(self.tif_path, np.zeros((2, 3, 4), dtype=np.uint16), photometric="minisblack")
+
+        self.assertEqual((3, 4), read_image_dimensions(Path(self.tif_path)))
+
+    @parameterized.expand([("same_dtype", np.float32, None), ("converted", np.uint16, None),
+                           ("compressed", np.uint16, "zlib")])
+    def test_open_tiff_pages(self, _, file_dtype, compression):
+        images = np.arange(5 * 3 * 4, dtype=file_dtype).reshape(5, 3, 4)
+        tifffile.imwrite(self.tif_path, images, compression=compression, photometric="minisblack")
+        out = np.zeros((3, 3, 4), dtype=np.float32)
+
+        with _open_tiff_pages(self.tif_path) as read_pages:
+            read_pages([4, 1], out[:2])
+            read_pages([2], out[2:])
+
+        npt.assert_equal(out, images[[4, 1, 2]])
+
+    def _write_multi_page_stack(self, page_counts: list[int], compression: str | None = None) -> FilenameGroup:
+        first_image = 0
+        for i, page_count in enumerate(page_counts):
+            images = np.arange(first_image, first_image + page_count, dtype=np.uint16)[:, None, None] * np.ones(
+                (3, 4), dtype=np.uint16)
+            with tifffile.TiffWriter(os.path.join(self.temp_dir.name, f"stack_{i:04d}.tif"), bigtiff=True) as tif:
+                for image in images:
+                    tif.write(image, contiguous=compression is None, compression=compression, metadata=None)
+            first_image += page_count
+        group = FilenameGroup.from_file(Path(self.temp_dir.name, "stack_0000.tif"))
+        group.find_all_files()
+        return group
+
+    @parameterized.expand([("contiguous", None), ("compressed", "zlib")])
+    def test_load_multi_page_files(self, _, compression):
+        group = self._write_multi_page_stack([13, 7], compression)
+
+        images = load(group, indices=[1, 20, 3])
+
+        self.assertEqual((7, 3, 4), images.data.shape)
+        npt.assert_equal(images.data[:, 0, 0], np.arange(1, 20, 3))
+        self.assertEqual(7, len(images.filenames))
+        self.assertEqual(["stack_0000.tif"] * 4 + ["stack_0001.tif"] * 3,
+                         [Path(filename).name for filename in images.filenames])
+
+    def test_count_images(self):
+        self.assertEqual(20, count_images(self._write_multi_page_stack([13, 7])))
+        self.assertEqual(3, count_images(self._write_stack(3)))
+
+    def _write_stack(self, num_images: int) -> FilenameGroup:
+        for i in range(num_images):
+            image = np.arange(12, dtype=np.uint16).reshape(3, 4) * (i + 1)
+            tifffile.imwrite(os.path.join(self.temp_dir.name, f"img_{i:04d}.tif"), image)
+        group = FilenameGroup.from_file(Path(self.temp_dir.name, "img_0000.tif"))
+        group.find_all_files()
+        return group
+
+    @staticmethod
+    def _crop_and_bin(images: np.ndarray, roi: SensibleROI, binning: int) -> np.ndarray:
+        height, width = roi.height // binning, roi.width // binning
+        region = images[:, roi.top:roi.top + height * binning, roi.left:roi.left + width * binning]
+        return region.reshape(len(images), height, binning, width, binning).mean(axis=(2, 4), dtype=np.float32)
+
+    def _write_images(self, num_images: int, fits_files: bool = False) -> np.ndarray:
+        images = np.random.default_rng(0).integers(0, 1000, (num_images, 9, 11), dtype=np.uint16)
+        for i, image in enumerate(images):
+            if fits_files:
+                fits.PrimaryHDU(image).writeto(os.path.join(self.temp_dir.name, f"img_{i:04d}.fits"))
+            else:
+                tifffile.imwrite(os.path.join(self.temp_dir.name, f"img_{i:04d}.tif"), image)
+        return images
+
+    @parameterized.expand([
+        ("crop_tif", False, SensibleROI(2, 1, 9, 8), 1),
+        ("bin_tif", False, None, 2),
+        ("crop_and_bin_tif", False, SensibleROI(1, 2, 10, 9), 3),
+        ("crop_and_bin_fits", True, SensibleROI(1, 2, 10, 9), 2),
+    ])
+    def test_load_roi_and_binning(self, _, fits_files, roi, binning):
+        images = self._write_images(6, fits_files)
+        group = FilenameGroup.from_file(Path(self.temp_dir.name, "img_0000.fits" if fits_files else "img_0000.tif"))
+        group.find_all_files()
+
+        loaded = load(group, indices=Indices(1, 6, 2), roi=roi, binning=binning)
+
+        expected = self._crop_and_bin(images[1:6:2], roi or SensibleROI(0, 0, 11, 9), binning)
+        self.assertEqual(loaded.data.shape, expected.shape)
+        npt.assert_allclose(loaded.data, expected, rtol=1e-6)
+
+    def test_load_multi_page_roi_and_binning(self):
+        images = np.random.default_rng(0).integers(0, 1000, (20, 9, 11), dtype=np.uint16)
+        tifffile.imwrite(self.tif_path, images, photometric="minisblack")
+        group = FilenameGroup.from_file(Path(self.tif_path))
+        group.find_all_files()
+        roi = SensibleROI(1, 0, 11, 9)
+
+        loaded = load(group, roi=roi, binning=2)
+
+        npt.assert_allclose(loaded.data, self._crop_and_bin(images, roi, 2), rtol=1e-6)
+
+    def test_load_binned_integers_rounded(self):
+        # Blocks with sums of 7 and 5, which have means of 1.75 and 1.25
+        image = np.array([[1, 2, 1, 1], [2, 2, 1, 2]], dtype=np.uint16)
+        for i in range(3):
+            tifffile.imwrite(os.path.join(self.temp_dir.name, f"img_{i:04d}.tif"), image)
+        group = FilenameGroup.from_file(Path(self.temp_dir.name, "img_0000.tif"))
+        group.find_all_files()
+
+        loaded = load(group, np.uint16, binning=2)
+
+        npt.assert_array_equal(loaded.data, np.full((3, 1, 2), [2, 1], dtype=np.uint16))
+
+    @parameterized.expand([
+        ("whole", None, 1, (9, 11)),
+        ("binned", None, 2, (4, 5)),
+        ("cropped_and_binned", SensibleROI(1, 2, 10, 9), 3, (2, 3)),
+    ])
+    def test_loaded_image_shape(self, _, roi, binning, expected):
+        self.assertEqual(loaded_image_shape((9, 11), roi, binning), expected)
+
+    @parameterized.expand([("zero_binning", None, 0), ("binning_too_large", SensibleROI(0, 0, 3, 3), 4),
+                           ("roi_outside", SensibleROI(0, 0, 12, 9), 1)])
+    def test_loaded_image_shape_invalid(self, _, roi, binning):
+        self.assertRaises(ValueError, loaded_image_shape, (9, 11), roi, binning)
+
+    @parameterized.expand([("uint16", np.uint16), ("float16", np.float16)])
+    def test_load_compact_dtype(self, _, dtype):
+        images = self._write_images(4)
+        group = FilenameGroup.from_file(Path(self.temp_dir.name, "img_0000.tif"))
+        group.find_all_files()
+
+        loaded = load(group, dtype)
+
+        self.assertTrue(loaded.is_compact)
+        self.assertEqual(loaded.dtype, dtype)
+        npt.assert_array_equal(loaded.data, images.astype(dtype))
+
+    def test_load_as_integers_that_do_not_fit_raises(self):
+        tifffile.imwrite(os.path.join(self.temp_dir.name, "img_0000.tif"), np.full((3, 4), 0.5, dtype=np.float32))
+        group = FilenameGroup.from_file(Path(self.temp_dir.name, "img_0000.tif"))
+        group.find_all_files()
+
+        with self.assertRaisesRegex(ValueError, "can not be loaded as uint16"):
+            load(group, np.uint16)
+
+    def test_load_and_process_compact_dtype_raises(self):
+        group = self._write_stack(3)
+
+        with self.assertRaisesRegex(ValueError, "can not be applied"):
+            load_and_process(group, [(ClipValuesFilter, {"clip_min": 5.0})], np.uint16)
+
+    def test_load_and_process_matches_processing_after_load(self):
+        group = self._write_stack(12)
+        clip_kwargs = {"clip_min": 5.0, "clip_max": 100.0}
+        rescale_kwargs = {"min_input": 0.0, "max_input": 100.0, "max_output": 1.0}
+
+        processed = load_and_process(group, [(ClipValuesFilter, clip_kwargs), (RescaleFilter, rescale_kwargs)])
+        expected = load(group)
+        ClipValuesFilter.filter_func(expected, **clip_kwargs)
+        RescaleFilter.filter_func(expected, **rescale_kwargs)
+
+        npt.assert_allclose(processed.data, expected.data)
+        self.assertEqual(["ClipValuesFilter", "RescaleFilter"],
+                         [operation[const.OPERATION_NAME] for operation in processed.metadata[const.OPERATION_HISTORY]])
+
+    def test_load_and_process_refuses_filters_without_image_stage(self):
+        group = self._write_stack(2)
+
+        self.assertRaises(ValueError, load_and_process, group, [(RebinFilter, {"rebin_param": 0.5})])
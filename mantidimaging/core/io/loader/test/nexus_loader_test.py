@@ -0,0 +1,263 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import h5py
+import numpy as np
+import psutil
+import numpy.testing as npt
+from parameterized import parameterized
+
+from mantidimaging.core.io.loader.nexus_loader import LazyNexusImages, image_region, index_runs, read_images
+from mantidimaging.core.utility.sensible_roi import SensibleROI
+
+SHAPE = (12, 5, 6)
+
+
+class IndexRunsTest(unittest.TestCase):
+
+    @parameterized.expand([
+        ("contiguous", [2, 3, 4, 5], [(slice(2, 6, 1), slice(0, 4))]),
+        ("stepped", [1, 4, 7], [(slice(1, 8, 3), slice(0, 3))]),
+        ("single", [7], [(slice(7, 8, 1), slice(0, 1))]),
+        ("gap", [0, 1, 2, 8, 9], [(slice(0, 3, 1), slice(0, 3)), (slice(8, 10, 1), slice(3, 5))]),
+        ("empty", [], []),
+    ])
+    def test_index_runs(self, _, indices, expected):
+        self.assertEqual(index_runs(np.array(indices, dtype=int)), expected)
+
+
+class ImageRegionTest(unittest.TestCase):
+
+    def test_whole_image(self):
+        self.assertEqual(image_region((5, 6), None), (slice(0, 5), slice(0, 6)))
+
+    def test_roi(self):
+        self.assertEqual(image_region((5, 6), SensibleROI(1, 2, 6, 4)), (slice(2, 4), slice(1, 6)))
+
+    @parameterized.expand([("too_wide", SensibleROI(0, 0, 7, 5)), ("too_tall", SensibleROI(0, 1, 6, 6)),
+                           ("empty", SensibleROI(2, 2, 2, 4)), ("negative", SensibleROI(-1, 0, 6, 5))])
+    def test_roi_outside_images_raises(self, _, roi):
+        with self.assertRaisesRegex(ValueError, "not within the images"):
+            image_region((5, 6), roi)
+
+
+class ReadImagesTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "data.nxs")
+        self.data = np.random.default_rng(0).random(SHAPE)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _read(self, indices, out_dtype, roi=None, **dataset_options):
+        with h5py.File(self.path, "w") as nexus_file:
+            nexus_file.create_dataset("data", data=self.data, **dataset_options)
+        with h5py.File(self.path, "r") as nexus_file:
+            return read_images(nexus_file["data"], np.array(indices, dtype=int), out_dtype, roi=roi)
+
+    @parameterized.expand([
+        ("same_dtype", "float32", {
+            "dtype": "float32"
+        }),
+        ("converted", "float32", {
+            "dtype": "float64"
+        }),
+        ("big_endian", "float32", {
+            "dtype": ">f4"
+        }),
+        ("chunked", "float32", {
+            "dtype": "float32",
+            "chunks": (1, 5, 6)
+        }),
+        ("compressed", "float64", {
+            "dtype": "float64",
+            "chunks": (1, 5, 6),
+            "compression": "gzip"
+        }),
+    ])
+    def test_read_images(self, _, dtype, dataset_options):
+        indices = [0, 1, 2, 5, 7, 9, 11]
+
+        images = self._read(indices, dtype, **dataset_options)
+
+        self.assertEqual(images.array.dtype, np.dtype(dtype))
+        npt.assert_array_equal(images.array, self.data[indices].astype(dataset_options["dtype"]).astype(dtype))
+
+    @parameterized.expand([
+        ("rows", SensibleROI(0, 1, 6, 4), {
+            "dtype": "float32"
+        }),
+        ("region", SensibleROI(1, 1, 5, 4), {
+            "dtype": "float32"
+        }),
+        ("converted_region", SensibleROI(1, 1, 5, 4), {
+            "dtype": "float64"
+        }),
+        ("chunked_region", SensibleROI(2, 3, 6, 5), {
+            "dtype": "float32",
+            "chunks": (1, 2, 6),
+            "compression": "gzip"
+        }),
+    ])
+    def test_read_region(self, _, roi, dataset_options):
+        indices = [1, 3, 5, 6, 11]
+
+        images = self._read(indices, "float32", roi, **dataset_options)
+
+        expected = self.data[indices, roi.top:roi.bottom, roi.left:roi.right]
+        npt.assert_array_equal(images.array, expected.astype(dataset_options["dtype"]).astype("float32"))
+
+    @parameterized.expand([("contiguous", {}), ("chunked", {"chunks": (1, 5, 6)})])
+    def test_contiguous_file_read_in_parallel(self, _, dataset_options):
+        with mock.patch("mantidimaging.core.io.loader.nexus_loader.run_io_tasks") as run_io_tasks:
+            self._read([3, 4], "float32", dtype="float32", **dataset_options)
+
+        self.assertEqual(run_io_tasks.called, not dataset_options)
+
+
+class LazyNexusImagesTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "data.nxs")
+        self.data = np.random.default_rng(0).random(SHAPE)
+        self.indices = np.array([0, 2, 3, 5, 8, 11])
+        self.expected = self.data[self.indices].astype(np.float32)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _lazy_images(self, cache_bytes=2**20, roi=None, **dataset_options) -> LazyNexusImages:
+        with h5py.File(self.path, "w") as nexus_file:
+            nexus_file.create_dataset("data", data=self.data, **dataset_options)
+        nexus_file = h5py.File(self.path, "r")
+        return LazyNexusImages(nexus_file["data"], self.indices, np.float32, cache_bytes, roi, nexus_file=nexus_file)
+
+    @parameterized.expand([
+        ("image", 2),
+        ("negative_image", -1),
+        ("images", slice(1, 5, 2)),
+        ("image_list", [4, 0]),
+        ("sinogram", (slice(None), 3)),
+        ("row_range", (1, slice(1, 4))),
+        ("pixel", (2, 4, 5)),
+        ("region", (slice(None), slice(0, 3), slice(2, 4))),
+        ("all", slice(None)),
+    ])
+    def test_getitem(self, _, key):
+        for dataset_options in [{}, {"chunks": (1, 2, 6), "compression": "gzip"}]:
+            npt.assert_array_equal(self._lazy_images(**dataset_options)[key], self.expected[key])
+
+    @parameterized.expand([
+        ("image", 2),
+        ("sinogram", (slice(None), 1)),
+        ("region", (slice(None), slice(0, 2), slice(1, 3))),
+        ("all", slice(None)),
+    ])
+    def test_getitem_of_roi(self, _, key):
+        roi = SensibleROI(1, 1, 5, 4)
+        expected = self.expected[:, 1:4, 1:5]
+        for dataset_options in [{}, {"chunks": (1, 2, 6), "compression": "gzip"}]:
+            images = self._lazy_images(roi=roi, **dataset_options)
+
+            self.assertEqual(images.shape, expected.shape)
+            npt.assert_array_equal(images[key], expected[key])
+            npt.assert_array_equal(images.load().array, expected)
+
+    def test_shape_and_dtype(self):
+        images = self._lazy_images()
+
+        self.assertEqual(images.shape, self.expected.shape)
+        self.assertEqual(images.ndim, 3)
+        self.assertEqual(images.size, self.expected.size)
+        self.assertEqual(images.dtype, np.float32)
+        self.assertEqual(images.min(), self.expected.min())
+        self.assertEqual(images.max(), self.expected.max())
+
+    def test_blocks_match_chunks(self):
+        self.assertEqual(self._lazy_images(chunks=(1, 2, 6)).block_rows, 2)
+
+    def test_blocks_read_once(self):
+        images = self._lazy_images(chunks=(1, 2, 6))
+
+        with mock.patch.object(images._dataset, "read_direct", wraps=images._dataset.read_direct) as read_direct:
+            images[1]
+            images[1, 2:4]
+            images[:, 0]
+
+        self.assertEqual(read_direct.call_count, 3 + 5)
+
+    def test_least_recently_used_blocks_evicted(self):
+        block_bytes = 2 * SHAPE[2] * 4
+        images = self._lazy_images(cache_bytes=3 * block_bytes, chunks=(1, 2, 6))
+
+        images[0, 0:6]
+        images[0, 0]
+        images[1, 0]
+
+        self.assertEqual(list(images._blocks), [(0, 2), (0, 0), (1, 0)])
+        # The last block of an image only has the one remaining row
+        self.assertEqual(images._cached_bytes, 2.5 * block_bytes)
+
+    def test_load_closes_file(self):
+        images = self._lazy_images()
+        filename = images._dataset.file.filename
+
+        data = images.load()
+
+        npt.assert_array_equal(data.array, self.expected)
+        self.assertTrue(images.is_loaded)
+        self.assertIsNone(images._dataset)
+        self.assertFalse(any(f.path == filename for f in psutil.Process().open_files()))
+        npt.assert_array_equal(images[3], self.expected[3])
+
+    def test_close_closes_file(self):
+        images = self._lazy_images()
+        nexus_file = images._dataset.file
+
+        images.close()
+
+        self.assertFalse(nexus_file)
+        with self.assertRaises(ValueError):
+            images[0]
+
+    def test_blocks_read_from_loaded_images(self):
+        roi = SensibleROI(1, 1, 5, 4)
+        images = self._lazy_images(roi=roi, chunks=(1, 2, 6))
+        images.load()
+
+        # A block that was not cached before the load is copied from the loaded images
+        npt.assert_array_equal(images._block(2, 1)[:2], self.expected[2, 2:4, 1:5])
+
+    def test_load_while_reading_blocks(self):
+        images = self._lazy_images(cache_bytes=1, chunks=(1, 2, 6))
+        errors = []
+
+        def read_images():
+            try:
+                for _ in range(20):
+                    for idx in range(len(images)):
+                        npt.assert_array_equal(images[idx], self.expected[idx])
+            except Exception as error:
+                errors.append(error)
+
+        reader = threading.Thread(target=read_images)
+        reader.start()
+        images.load()
+        reader.join()
+
+        self.assertEqual(errors, [])
+        npt.assert_array_equal(images[:], self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
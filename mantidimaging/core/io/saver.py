@@ -2,10 +2,12 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 import datetime
+import io
 import os
+import zlib
 from logging import getLogger
-from typing import TYPE_CHECKING
-from collections.abc import Callable
+from typing import Any, TYPE_CHECKING
+from collections.abc import Callable, Iterable, Iterator
 
 import h5py
 from pathlib import Path
@@ -16,12 +18,15 @@ from tifffile import tifffile
 from mantidimaging.core.operation_history.const import TIMESTAMP
 import astropy.io.fits as fits
 
-from .utility import DEFAULT_IO_FILE_FORMAT, NEXUS_PROCESSED_DATA_PATH
+from .utility import DEFAULT_IO_FILE_FORMAT, NEXUS_PROCESSED_DATA_PATH, NEXUS_PROCESSED_METADATA_PATH, run_io_tasks
 from ..operations.rescale import RescaleFilter
+from ..parallel import manager as pm
 from ..utility.progress_reporting import Progress
 from ..utility.version_check import CheckVersion
 
 if TYPE_CHECKING:
+    import numpy.typing as npt
+
     from ..data.dataset import StrictDataset
     from ..data.imagestack import ImageStack
     from ..utility.data_containers import Indices
@@ -32,6 +37,31 @@ DEFAULT_ZFILL_LENGTH = 6
 DEFAULT_NAME_PREFIX = 'image'
 DEFAULT_NAME_POSTFIX = ''
 INT16_SIZE = 65536
+# Stacks are converted and compressed for NeXus in slabs of about this many bytes, which bounds the extra memory needed
+NEXUS_SLAB_BYTES = 64 * 1024**2
+# Target size of the chunks of image datasets in NeXus files. A chunk is a band of whole rows of one image, so reading
+# a projection reads only the chunks of that image, and reading a sinogram reads one band from each image.
+NEXUS_CHUNK_BYTES = 256 * 1024
+# Lossless compression that can be selected for the image datasets in NeXus files, as options to create_dataset
+NEXUS_COMPRESSION: dict[str, dict[str, Any]] = {
+    "none": {},
+    "gzip": {
+        "compression": "gzip",
+        "compression_opts": 4
+    },
+    "gzip + shuffle": {
+        "compression": "gzip",
+        "compression_opts": 4,
+        "shuffle": True
+    },
+    "lzf": {
+        "compression": "lzf"
+    },
+    "lzf + shuffle": {
+        "compression": "lzf",
+        "shuffle": True
+    },
+}
 
 package_version = CheckVersion().get_version()
 
@@ -46,6 +76,16 @@ def write_img(data: np.ndarray, filename: str, overwrite: bool = False, descript
     tifffile.imwrite(filename, data, description=description, metadata=None, software="Mantid Imaging")
 
 
+def write_img_stack(images: Iterable[np.ndarray], filename: str, description: str | None = "") -> None:
+    """
+    Write images as the pages of a single BigTIFF file. The pages are stored contiguously and uncompressed, one after
+    the other, so the file is written and read back sequentially.
+    """
+    with tifffile.TiffWriter(filename, bigtiff=True) as tif:
+        for image in images:
+            tif.write(image, contiguous=True, description=description, metadata=None, software="Mantid Imaging")
+
+
 def write_nxs(data: np.ndarray, filename: str, projection_angles: np.ndarray | None = None, overwrite: bool = False):
     import h5py
     nxs = h5py.File(filename, 'w')
@@ -65,6 +105,28 @@ def write_nxs(data: np.ndarray, filename: str, projection_angles: np.ndarray | N
         rangle[...] = projection_angles
 
 
+def _rescale_to_uint16(image: np.ndarray, min_input: float, max_input: float) -> np.ndarray:
+    """
+    Rescale an image from [min_input, max_input] to the full uint16 range, clipping values outside of it.
+
+    Gives exactly the same result as rescaling a copy of the image with RescaleFilter.filter_array and casting to
+    uint16, but in a few vectorised passes over the image without modifying it.
+    """
+    if not min_input < max_input:
+        return RescaleFilter.filter_array(np.copy(image),
+                                          min_input=min_input,
+                                          max_input=max_input,
+                                          max_output=INT16_SIZE - 1).astype(np.uint16)
+    slope = np.float64(INT16_SIZE - 1) / (np.float64(max_input) - np.float64(min_input))
+    scaled = np.subtract(image, min_input, dtype=np.float64)
+    scaled *= slope
+    # np.interp returns the end points exactly, rather than via the slope
+    np.putmask(scaled, image < min_input, 0)
+    np.putmask(scaled, image >= max_input, INT16_SIZE - 1)
+    # The rescale filter stores its result in the image's dtype before the cast
+    return scaled.astype(image.dtype, copy=False).astype(np.uint16)
+
+
 def image_save(images: ImageStack,
                output_dir: str,
                name_prefix: str = DEFAULT_NAME_PREFIX,
@@ -76,11 +138,14 @@ def image_save(images: ImageStack,
                name_postfix: str = DEFAULT_NAME_POSTFIX,
                indices: list[int] | Indices | None = None,
                pixel_depth: str | None = None,
-               progress: Progress | None = None) -> str | list[str]:
+               progress: Progress | None = None,
+               multi_page: bool = False) -> str | list[str]:
     """
     Save image volume (3d) into a series of slices along the Z axis.
     The Z axis in the script is the ndarray.shape[0].
 
+    The slices can instead be saved as the pages of a single multi-page TIFF file, see write_img_stack.
+
     :param images: Data as images/slices stores in numpy array
     :param output_dir: Output directory for the files
     :param name_prefix: Prefix for the names of the images,
@@ -106,7 +171,10 @@ def image_save(images: ImageStack,
     :param pixel_depth: Defines the target pixel depth of the save operation so
            np.float32 or np.int16 will ensure the values are scaled
            correctly to these values.
-    :returns: The filename/filenames of the saved data.
+    :param multi_page: Save a TIFF stack as one BigTIFF file named from the
+           prefix and postfix, with a page for each slice.
+    :returns: The filename/filenames of the saved data. For a multi-page file
+           the filename of each slice is the file.
     """
     progress = Progress.ensure_instance(progress, task_name='Save')
 
@@ -125,7 +193,7 @@ def image_save(images: ImageStack,
         rescale_info = ""
     elif pixel_depth == "int16":
         # turn the offset to string otherwise json throws a TypeError when trying to save float32
-        rescale_params = {"offset": str(min_value), "slope": int_16_slope}
+        rescale_params = {"offset": str(min_value), "slope": float(int_16_slope)}
         rescale_info = "offset = {offset} \n slope = {slope}".format(**rescale_params)
     else:
         raise ValueError("The pixel depth given is not handled: " + pixel_depth)
@@ -155,42 +223,61 @@ def image_save(images: ImageStack,
         num_images = data.shape[0]
         progress.set_estimated_steps(num_images)
 
+        def output_image(idx: int) -> np.ndarray:
+            if pixel_depth == "int16":
+                return _rescale_to_uint16(images.data[idx], min_value, max_value)
+            return data[idx, :, :]
+
+        if multi_page and out_format in ['tif', 'tiff']:
+            filename = os.path.join(output_dir, f"{name_prefix}{name_postfix}.{out_format}")
+
+            def stack_images() -> Iterator[np.ndarray]:
+                for idx in range(num_images):
+                    yield output_image(idx)
+                    progress.update(msg='Image')
+
+            with progress:
+                write_img_stack(stack_images(), filename, rescale_info)
+            return [filename] * num_images
+
         names = generate_names(name_prefix, indices, num_images, custom_idx, zfill_len, name_postfix, out_format)
 
         for i in range(len(names)):
             names[i] = os.path.join(output_dir, names[i])
 
+        def save_image(idx: int) -> int:
+            output_data = output_image(idx)
+            write_func(output_data, names[idx], overwrite_all, rescale_info)
+            return output_data.nbytes
+
+        # Images are rescaled, encoded and written on the IO threads, each thread working on a different file
         with progress:
-            for idx in range(num_images):
-                # Overwrite images with the copy that has been rescaled.
-                if pixel_depth == "int16":
-                    output_data = RescaleFilter.filter_array(np.copy(images.data[idx]),
-                                                             min_input=min_value,
-                                                             max_input=max_value,
-                                                             max_output=INT16_SIZE - 1).astype(np.uint16)
-                    write_func(output_data, names[idx], overwrite_all, rescale_info)
-                else:
-                    write_func(data[idx, :, :], names[idx], overwrite_all, rescale_info)
-
-                progress.update(msg='Image')
+            run_io_tasks(save_image, num_images, progress, 'Image')
 
         return names
 
 
-def nexus_save(dataset: StrictDataset, path: str, sample_name: str, save_as_float: bool):
+def nexus_save(dataset: StrictDataset, path: str, sample_name: str, save_as_float: bool, compression: str = "none"):
     """
     Uses information from a StrictDataset to create a NeXus file.
+
+    The images are written to the file as they are converted and compressed, rather than building the whole file in
+    memory first.
     :param dataset: The dataset to save as a NeXus file.
     :param path: The NeXus file path.
     :param sample_name: The sample name.
+    :param save_as_float: Save the images as float32 rather than scaling them to int16.
+    :param compression: Compression of the image datasets, one of the keys of NEXUS_COMPRESSION.
     """
+    if compression not in NEXUS_COMPRESSION:
+        raise ValueError(f"Unknown NeXus compression: {compression}")
     try:
-        nexus_file = h5py.File(path, "w", driver="core")
+        nexus_file = h5py.File(path, "w")
     except OSError as exc:
         raise RuntimeError("Unable to save NeXus file. " + str(exc)) from exc
 
     try:
-        _nexus_save(nexus_file, dataset, sample_name, save_as_float)
+        _nexus_save(nexus_file, dataset, sample_name, save_as_float, compression)
     except OSError as exc:
         nexus_file.close()
         os.remove(path)
@@ -199,12 +286,17 @@ def nexus_save(dataset: StrictDataset, path: str, sample_name: str, save_as_floa
     nexus_file.close()
 
 
-def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str, save_as_float: bool):
+def _nexus_save(nexus_file: h5py.File,
+                dataset: StrictDataset,
+                sample_name: str,
+                save_as_float: bool,
+                compression: str = "none"):
     """
     Takes a NeXus file and writes the StrictDataset information to it.
     :param nexus_file: The NeXus file.
     :param dataset: The StrictDataset.
     :param sample_name: The sample name.
+    :param compression: Compression of the image datasets, one of the keys of NEXUS_COMPRESSION.
     """
     # Top-level group
     entry = nexus_file.create_group("entry1")
@@ -236,9 +328,10 @@ def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str,
     rotation_angle.attrs["units"] = "rad"
 
     if dataset.is_processed:
-        _save_processed_data_to_nexus(nexus_file, dataset, rotation_angle, detector["image_key"], save_as_float)
+        _save_processed_data_to_nexus(nexus_file, dataset, rotation_angle, detector["image_key"], save_as_float,
+                                      compression)
     else:
-        _save_image_stacks_to_nexus(dataset, detector, save_as_float)
+        _save_image_stacks_to_nexus(dataset, detector, save_as_float, compression)
 
     # data field
     data = tomo_entry.create_group("data")
@@ -248,16 +341,20 @@ def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str,
 
     for recon in dataset.recons:
         assert dataset.sample.filenames is not None
-        _save_recon_to_nexus(nexus_file, recon, dataset.sample.filenames[0])
+        _save_recon_to_nexus(nexus_file, recon, dataset.sample.filenames[0], compression)
 
 
-def _save_processed_data_to_nexus(nexus_file: h5py.File, dataset: StrictDataset, rotation_angle: h5py.Dataset,
-                                  image_key: h5py.Dataset, save_as_float: bool):
+def _save_processed_data_to_nexus(nexus_file: h5py.File,
+                                  dataset: StrictDataset,
+                                  rotation_angle: h5py.Dataset,
+                                  image_key: h5py.Dataset,
+                                  save_as_float: bool,
+                                  compression: str = "none"):
     data = nexus_file.create_group(NEXUS_PROCESSED_DATA_PATH)
     data["rotation_angle"] = rotation_angle
     data["image_key"] = image_key
     _set_nx_class(data, "NXdata")
-    _save_image_stacks_to_nexus(dataset, data, save_as_float)
+    _save_image_stacks_to_nexus(dataset, data, save_as_float, compression)
 
     process = data.create_group("process")
     _set_nx_class(process, "NXprocess")
@@ -265,51 +362,130 @@ def _save_processed_data_to_nexus(nexus_file: h5py.File, dataset: StrictDataset,
     process.create_dataset("date", data=np.bytes_(datetime.datetime.now().isoformat()))
     process.create_dataset("version", data=np.bytes_(package_version))
 
+    # The operation history and metadata of the sample, so that they are restored when the file is loaded
+    metadata = io.StringIO()
+    dataset.sample.save_metadata(metadata)
+    nexus_file.create_dataset(NEXUS_PROCESSED_METADATA_PATH, data=np.bytes_(metadata.getvalue()))
+
 
-def _save_image_stacks_to_nexus(dataset: StrictDataset, data_group: h5py.Group, save_as_float: bool):
+def _save_image_stacks_to_nexus(dataset: StrictDataset,
+                                data_group: h5py.Group,
+                                save_as_float: bool,
+                                compression: str = "none"):
     combined_data_shape = (sum([len(arr) for arr in dataset.nexus_arrays]), ) + dataset.nexus_arrays[0].shape[1:]
 
+    dtype = "float32" if save_as_float else "int16"
+    image_data = _create_image_dataset(data_group, "data", combined_data_shape, dtype, compression)
+
     index = 0
-    if save_as_float:
-        data = dataset.nexus_arrays
-        dtype = "float32"
-    else:
-        data, _ = _convert_float_to_int(dataset.nexus_arrays)
-        dtype = "int16"
+    for arr in dataset.nexus_arrays:
+        if save_as_float:
+            _write_images(image_data, index, arr)
+        else:
+            _write_as_int16(arr, image_data, index, _int16_scaling_factor(arr))
+        index += arr.shape[0]
 
-    data_group.create_dataset("data", shape=combined_data_shape, dtype=dtype)
 
-    for arr in data:
-        data_group["data"][index:index + arr.shape[0]] = arr
-        index += arr.shape[0]
+def _create_image_dataset(group: h5py.Group, name: str, shape: tuple[int, ...], dtype: npt.DTypeLike,
+                          compression: str) -> h5py.Dataset:
+    """
+    Creates a dataset for a stack of images, chunked in bands of rows and with the selected compression.
+    :param compression: One of the keys of NEXUS_COMPRESSION.
+    """
+    row_bytes = shape[2] * np.dtype(dtype).itemsize
+    chunk_rows = max(1, min(shape[1], NEXUS_CHUNK_BYTES // max(1, row_bytes)))
+    return group.create_dataset(name,
+                                shape=shape,
+                                dtype=dtype,
+                                chunks=(1, chunk_rows, max(1, shape[2])) if all(shape) else None,
+                                **NEXUS_COMPRESSION[compression])
+
+
+def _slab_size(arr: np.ndarray) -> int:
+    return max(1, NEXUS_SLAB_BYTES // max(1, arr[0].nbytes)) if len(arr) else 1
 
 
-def _convert_float_to_int(arrays: list[np.ndarray]) -> tuple[list[np.ndarray], list[int]]:
+def _write_images(dataset: h5py.Dataset, start: int, images: np.ndarray) -> None:
     """
-    Scales a float array to convert it to ints.
-    :param arrays: The dataset arrays.
-    :return: A list of int arrays and a list of scaling factors.
+    Writes a stack of images into an image dataset from index start, a slab of images at a time.
+
+    The chunks of gzip compressed datasets are shuffled and compressed on the thread pool and written directly into
+    the file, rather than one at a time by the HDF5 filter pipeline.
     """
-    converted = []
-    factors = []
+    compress_in_parallel = (dataset.compression == "gzip" and dataset.chunks is not None and dataset.chunks[0] == 1
+                            and dataset.chunks[2] == dataset.shape[2] and not dataset.fletcher32
+                            and dataset.scaleoffset is None)
+    slab_size = _slab_size(images)
+    for slab_start in range(0, len(images), slab_size):
+        slab = images[slab_start:slab_start + slab_size]
+        if compress_in_parallel:
+            _write_compressed_chunks(dataset, start + slab_start, slab)
+        else:
+            dataset[start + slab_start:start + slab_start + len(slab)] = slab
 
-    def scale_row(row):
-        return np.round(row * scaling_factor).astype("int16")
 
-    for arr in arrays:
-        scaling_factor = np.iinfo("int16").max / max(abs(arr.min()), abs(arr.max()))
-        scaled_arr = np.apply_along_axis(scale_row, axis=1, arr=arr)
-        converted.append(scaled_arr)
-        factors.append(scaling_factor)
+def _write_compressed_chunks(dataset: h5py.Dataset, start: int, images: np.ndarray) -> None:
+    """
+    Compresses the chunks of the images in parallel with the dataset's filters, shuffle and gzip, and writes them.
+    """
+    chunk_shape = dataset.chunks
+    chunk_rows = chunk_shape[1]
+    level = dataset.compression_opts
+    offsets = [(idx, row) for idx in range(len(images)) for row in range(0, images.shape[1], chunk_rows)]
+
+    def compress(offset: tuple[int, int]) -> bytes:
+        idx, row = offset
+        chunk = np.zeros(chunk_shape[1:], dtype=dataset.dtype)
+        # Chunks at the bottom edge are stored at full size
+        rows = images[idx, row:row + chunk_rows]
+        chunk[:len(rows)] = rows
+        if dataset.shuffle:
+            # Byte shuffle, as the HDF5 shuffle filter: the first byte of every element, then the second byte...
+            chunk_bytes = chunk.view(np.uint8).reshape(-1, chunk.itemsize).T.tobytes()
+        else:
+            chunk_bytes = chunk.tobytes()
+        return zlib.compress(chunk_bytes, level)
 
-    return converted, factors
+    for (idx, row), compressed in zip(offsets, pm.get_thread_pool().map(compress, offsets), strict=True):
+        dataset.id.write_direct_chunk((start + idx, row, 0), compressed)
+
+
+def _int16_scaling_factor(arr: np.ndarray) -> float:
+    """
+    Finds the factor that scales the largest absolute value in a float array to the int16 maximum.
+
+    The minimum and maximum are found for a part of the array on each thread of the thread pool.
+    """
+    parts = np.array_split(arr, max(1, min(pm.cores, len(arr))))
+    part_ranges = list(pm.get_thread_pool().map(lambda part: (part.min(), part.max()), parts))
+    arr_min = np.array([part_min for part_min, _ in part_ranges]).min()
+    arr_max = np.array([part_max for _, part_max in part_ranges]).max()
+    return np.iinfo("int16").max / max(abs(arr_min), abs(arr_max))
+
+
+def _write_as_int16(arr: np.ndarray, dataset: h5py.Dataset, start: int, scaling_factor: float) -> None:
+    """
+    Scales a float array to int16 and writes it into dataset from index start.
+
+    The array is converted a slab of images at a time, so at most one slab of converted data is held in memory.
+    :param arr: The array to convert.
+    :param dataset: The int16 dataset to write into.
+    :param start: The index in the dataset of the first image of the array.
+    :param scaling_factor: The factor to multiply the array by, from _int16_scaling_factor.
+    """
+    slab_size = _slab_size(arr)
+    for slab_start in range(0, len(arr), slab_size):
+        scaled = arr[slab_start:slab_start + slab_size] * scaling_factor
+        np.round(scaled, out=scaled)
+        _write_images(dataset, start + slab_start, scaled.astype("int16"))
 
 
-def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack, sample_path: str):
+def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack, sample_path: str, compression: str = "none"):
     """
     Saves a recon to a NeXus file.
     :param nexus_file: The NeXus file.
     :param recon: The recon data.
+    :param compression: Compression of the recon data, one of the keys of NEXUS_COMPRESSION.
     """
     recon_entry = nexus_file.create_group(recon.name)
     _set_nx_class(recon_entry, "NXentry")
@@ -347,8 +523,7 @@ def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack, sample_path:
     data = recon_entry.create_group("data")
     _set_nx_class(data, "NXdata")
 
-    data.create_dataset("data", shape=recon.data.shape, dtype="float32")
-    data["data"][:] = recon.data
+    _write_images(_create_image_dataset(data, "data", recon.data.shape, "float32", compression), 0, recon.data)
 
     x_arr, y_arr, z_arr = _create_pixel_size_arrays(recon)
     data.create_dataset("x", shape=x_arr.shape, dtype="float16", data=x_arr)
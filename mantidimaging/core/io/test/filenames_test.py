@@ -2,13 +2,16 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
+import tempfile
 from pathlib import Path
 import unittest
+from unittest import mock
 
 from parameterized import parameterized
 
 from mantidimaging.test_helpers.unit_test_helper import FakeFSTestCase
-from ..filenames import FilenameGroup, FilenamePattern, FilenamePatternGolden
+from ..filenames import DirectoryIndex, FilenameGroup, FilenamePattern, FilenamePatternGolden
 from ...utility.data_containers import FILE_TYPES
 
 
@@ -227,7 +230,7 @@ class FilenameGroupTest(FakeFSTestCase):
         ("/a/180deg/foo_180deg_000000.tif"),
     ])
     def test_find_related_proj_180(self, proj_name):
-        tomo_list = [Path("/a/Tomo/foo_Tomo_%06d.tif" % i) for i in range(10)]
+        tomo_list = [Path(f"/a/Tomo/foo_Tomo_{i:06d}.tif") for i in range(10)]
         proj_180_list = [Path(proj_name)]
         for file_name in tomo_list + proj_180_list:
             self.fs.create_file(file_name)
@@ -258,6 +261,77 @@ class FilenameGroupTest(FakeFSTestCase):
         self._files_equal(flat_before_list[0], flat_before_fg.first_file())
         self._file_list_count_equal(flat_before_list, flat_before_fg.all_files())
 
+    def test_find_all_files_ignores_other_families(self):
+        file_list = [Path(f"/a/IMAT_Flower_Tomo_{i:06d}.tif") for i in range(5)]
+        other_list = [Path(f"/a/IMAT_Flower_Flat_{i:06d}.tif") for i in range(5)] + [Path("/a/IMAT_Flower_Tomo.tif")]
+        for file_name in file_list + other_list:
+            self.fs.create_file(file_name)
+
+        fg = FilenameGroup.from_file(file_list[2])
+        with mock.patch.object(fg.pattern, "match", wraps=fg.pattern.match) as match:
+            fg.find_all_files()
+
+        self.assertEqual(fg.all_indexes, list(range(5)))
+        self.assertEqual(match.call_count, 5)
+
+    def test_related_files_found_with_one_scan_of_each_directory(self):
+        tomo_list = [Path(f"/a/Tomo/foo_Tomo_{i:06d}.tif") for i in range(10)]
+        flat_list = [Path(f"/a/Flat_Before/foo_Flat_Before_{i:06d}.tif") for i in range(10)]
+        for file_name in tomo_list + flat_list + [Path("/a/Tomo.txt")]:
+            self.fs.create_file(file_name)
+
+        with mock.patch("mantidimaging.core.io.filenames.os.scandir", wraps=os.scandir) as scandir:
+            fg = FilenameGroup.from_file(tomo_list[0])
+            fg.find_all_files()
+            fg.find_log_file()
+            for file_type in FILE_TYPES:
+                fg.find_related(file_type)
+            flat_fg = fg.find_related(FILE_TYPES.FLAT_BEFORE)
+            flat_fg.find_all_files()
+            fg.find_all_files()
+
+        self.assertEqual(sorted(Path(call.args[0]).name for call in scandir.call_args_list),
+                         ["Flat_Before", "Tomo", "a"])
+        self._files_equal(fg.log_path, Path("/a/Tomo.txt"))
+        self._file_list_count_equal(flat_list, flat_fg.all_files())
+
+
+class DirectoryIndexTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_families(self):
+        for name in ["a_001.tif", "a_002.tif", "a_1000.tif", "b_001.tif", "a_001.fits", "a.json"]:
+            (self.directory / name).touch()
+        (self.directory / "Flat").mkdir()
+
+        index = DirectoryIndex(self.directory)
+
+        self.assertCountEqual(index.families[("a_", ".tif")], ["a_001.tif", "a_002.tif", "a_1000.tif"])
+        self.assertEqual(index.families[("b_", ".tif")], ["b_001.tif"])
+        self.assertEqual(index.families[("a_", ".fits")], ["a_001.fits"])
+        self.assertEqual(index.directories, {"Flat"})
+        self.assertEqual(index.entry_name("a.json"), "a.json")
+        self.assertIsNone(index.entry_name("b.json"))
+
+    def test_index_reused_until_directory_changes(self):
+        (self.directory / "a_001.tif").touch()
+        index = DirectoryIndex.of(self.directory)
+
+        self.assertIs(DirectoryIndex.of(self.directory), index)
+
+        (self.directory / "a_002.tif").touch()
+        os.utime(self.directory, ns=(0, index.version[2] + 1))
+        new_index = DirectoryIndex.of(self.directory)
+
+        self.assertIsNot(new_index, index)
+        self.assertCountEqual(new_index.names, ["a_001.tif", "a_002.tif"])
+
 
 class GoldenFilenameGroupTest(FakeFSTestCase):
 
@@ -2,6 +2,7 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 import datetime
+import json
 import os
 import unittest
 from pathlib import Path
@@ -10,10 +11,13 @@ from unittest import mock
 import h5py
 import numpy as np
 import numpy.testing as npt
+import pytest
+from parameterized import parameterized
+from tifffile import tifffile
 
 from mantidimaging.core.io.filenames import FilenameGroup
-from mantidimaging.core.io.utility import NEXUS_PROCESSED_DATA_PATH
-from mantidimaging.core.operation_history.const import TIMESTAMP
+from mantidimaging.core.io.utility import NEXUS_PROCESSED_DATA_PATH, NEXUS_PROCESSED_METADATA_PATH
+from mantidimaging.core.operation_history.const import OPERATION_HISTORY, OPERATION_NAME, TIMESTAMP
 
 import mantidimaging.test_helpers.unit_test_helper as th
 from mantidimaging.core.data import ImageStack
@@ -21,7 +25,9 @@ from mantidimaging.core.data.dataset import StrictDataset
 from mantidimaging.core.io import loader
 from mantidimaging.core.io import saver
 from mantidimaging.core.io.saver import _rescale_recon_data, _save_recon_to_nexus, _save_processed_data_to_nexus, \
-    _save_image_stacks_to_nexus, _convert_float_to_int
+    _save_image_stacks_to_nexus, _int16_scaling_factor, _write_as_int16, _rescale_to_uint16, \
+    _create_image_dataset, _write_images
+from mantidimaging.core.operations.rescale import RescaleFilter
 from mantidimaging.core.utility.version_check import CheckVersion
 from mantidimaging.test_helpers import FileOutputtingTestCase
 
@@ -50,6 +56,24 @@ def test_rescale_negative_recon_data():
     assert int(np.max(_rescale_recon_data(recon.data))) == np.iinfo("uint16").max
 
 
+@pytest.mark.parametrize("dtype", [np.float32, np.float64, np.int32])
+@pytest.mark.parametrize("min_input,max_input", [(-3.7, 250.1), (0, 1), (5, 5)])
+def test_rescale_to_uint16_matches_rescale_filter(dtype, min_input, max_input):
+    image = (np.random.default_rng(0).standard_normal((20, 30)) * 200).astype(dtype)
+    image.flat[:4] = [min_input, max_input, np.nextafter(max_input, -np.inf), 0]
+    if np.issubdtype(dtype, np.floating):
+        image.flat[4:7] = [np.nan, np.inf, -np.inf]
+    original = image.copy()
+
+    with np.errstate(invalid="ignore"):
+        expected = RescaleFilter.filter_array(image.copy(), min_input, max_input, saver.INT16_SIZE - 1)
+        expected = expected.astype(np.uint16)
+        result = _rescale_to_uint16(image, min_input, max_input)
+
+    npt.assert_array_equal(result, expected)
+    npt.assert_array_equal(image, original)
+
+
 class IOTest(FileOutputtingTestCase):
 
     def __init__(self, *args, **kwargs):
@@ -176,6 +200,42 @@ class IOTest(FileOutputtingTestCase):
 
         npt.assert_equal(loaded_images.data, images.data)
 
+    def test_save_int16_rescales_each_image(self):
+        images = th.generate_images(shape=(12, 8, 10))
+        images.data[3, 2, 2] = np.nan
+
+        names = saver.image_save(images, self.output_directory, pixel_depth="int16")
+
+        min_value, max_value = np.nanmin(images.data), np.nanmax(images.data)
+        for idx, name in enumerate(names):
+            expected = np.interp(images.data[idx], [min_value, max_value], [0, saver.INT16_SIZE - 1])
+            with np.errstate(invalid="ignore"):
+                expected = expected.astype(np.float32).astype(np.uint16)
+            npt.assert_array_equal(tifffile.imread(name), expected)
+
+    @parameterized.expand([("float32", "float32"), ("int16", "int16")])
+    def test_save_multi_page_stack(self, _, pixel_depth):
+        images = th.generate_images(shape=(12, 8, 10))
+
+        names = saver.image_save(images, self.output_directory, pixel_depth=pixel_depth, multi_page=True)
+
+        filename = os.path.join(self.output_directory, saver.DEFAULT_NAME_PREFIX + ".tif")
+        self.assertEqual([filename] * 12, names)
+        self.assertEqual(["image.tif"], [name for name in os.listdir(self.output_directory) if ".tif" in name])
+        with tifffile.TiffFile(filename) as tif:
+            self.assertTrue(tif.is_bigtiff)
+            self.assertEqual((12, 8, 10), tif.series[0].shape)
+            self.assertIsNotNone(tif.series[0].dataoffset)
+
+        group = FilenameGroup.from_file(Path(filename))
+        group.find_all_files()
+        loaded_images = loader.load(group)
+
+        if pixel_depth == "float32":
+            npt.assert_equal(loaded_images.data, images.data)
+        else:
+            npt.assert_equal(loaded_images.data, [tifffile.imread(filename, key=idx) for idx in range(12)])
+
     def test_metadata_round_trip(self):
         # Create dummy image stack
         sample = th.gen_img_numpy_rand()
@@ -367,6 +427,19 @@ class IOTest(FileOutputtingTestCase):
                              CheckVersion().get_version())
             self.assertIn(str(datetime.date.today()), _nexus_dataset_to_string(nexus_file[process_path]["date"]))
 
+    def test_save_process_metadata(self):
+        ds = StrictDataset(th.generate_images())
+        ds.sample.record_operation("MedianFilter", "Median", size=3)
+        with h5py.File("path", "w", driver="core", backing_store=False) as nexus_file:
+            rotation_angle = nexus_file.create_dataset("rotation_angle", dtype="float")
+            image_key = nexus_file.create_dataset("image_key", dtype="int")
+            _save_processed_data_to_nexus(nexus_file, ds, rotation_angle, image_key, True)
+
+            metadata = json.loads(_nexus_dataset_to_string(nexus_file[NEXUS_PROCESSED_METADATA_PATH]))
+
+        self.assertEqual(metadata, ds.sample.metadata)
+        self.assertEqual(metadata[OPERATION_HISTORY][0][OPERATION_NAME], "MedianFilter")
+
     @mock.patch("mantidimaging.core.io.saver._save_recon_to_nexus")
     def test_dont_save_recons_if_none_present(self, recon_save_mock: mock.Mock):
 
@@ -469,14 +542,57 @@ class IOTest(FileOutputtingTestCase):
             _save_image_stacks_to_nexus(ds, data, False)
             self.assertEqual(data["data"].dtype, "int16")
 
-    def test_convert_float_to_int(self):
-        n_arrs = 3
-        float_arr = [th.gen_img_numpy_rand() for _ in range(3)]
-        conv, factors = _convert_float_to_int(float_arr)
+    @parameterized.expand([(compression, ) for compression in saver.NEXUS_COMPRESSION])
+    @mock.patch("mantidimaging.core.io.saver.NEXUS_CHUNK_BYTES", 3 * 10 * 4)
+    @mock.patch("mantidimaging.core.io.saver.NEXUS_SLAB_BYTES", 2 * 8 * 10 * 4)
+    def test_write_images_compressed(self, compression):
+        images = th.gen_img_numpy_rand((5, 8, 10)).astype("float32")
+
+        with h5py.File("path", "w", driver="core", backing_store=False) as nexus_file:
+            dataset = _create_image_dataset(nexus_file, "data", (7, 8, 10), "float32", compression)
+            _write_images(dataset, 1, images)
+
+            self.assertEqual(dataset.chunks, (1, 3, 10))
+            self.assertEqual(dataset.compression, saver.NEXUS_COMPRESSION[compression].get("compression"))
+            self.assertEqual(dataset.shuffle, saver.NEXUS_COMPRESSION[compression].get("shuffle", False))
+            npt.assert_array_equal(dataset[1:6], images)
+            npt.assert_array_equal(dataset[0], 0)
 
-        for i in range(n_arrs):
-            close_arr = np.isclose(conv[i] / factors[i], float_arr[i], rtol=1e-5)
-            self.assertTrue(np.count_nonzero(close_arr) >= len(close_arr) * 0.75)
+    def test_nexus_save_compressed_file(self):
+        sd = StrictDataset(th.generate_images())
+        path = os.path.join(self.output_directory, "compressed.nxs")
+
+        saver.nexus_save(sd, path, "sample-name", True, compression="gzip + shuffle")
+
+        with h5py.File(path, "r") as nexus_file:
+            data = nexus_file["entry1"]["tomo_entry"]["instrument"]["detector"]["data"]
+            self.assertEqual(data.compression, "gzip")
+            npt.assert_array_equal(data, sd.sample.data)
+
+    def test_nexus_save_unknown_compression_raises(self):
+        with self.assertRaises(ValueError):
+            saver.nexus_save(StrictDataset(th.generate_images()), "path", "sample-name", True, compression="zip")
+
+    def test_int16_scaling_factor(self):
+        arr = th.gen_img_numpy_rand((9, 8, 10)) - 0.7
+        arr[4, 2, 3] = -5
+
+        self.assertEqual(_int16_scaling_factor(arr), np.iinfo("int16").max / 5)
+
+    @mock.patch("mantidimaging.core.io.saver.NEXUS_SLAB_BYTES", 2 * 8 * 10 * 4)
+    def test_write_as_int16_in_slabs(self):
+        arr = th.gen_img_numpy_rand((9, 8, 10)) - 0.5
+        factor = _int16_scaling_factor(arr)
+
+        with h5py.File("path", "w", driver="core", backing_store=False) as nexus_file:
+            dataset = nexus_file.create_dataset("data", shape=(11, 8, 10), dtype="int16")
+            _write_as_int16(arr, dataset, 2, factor)
+            written = dataset[...]
+
+        npt.assert_array_equal(written[:2], 0)
+        npt.assert_array_equal(written[2:], np.round(arr * factor).astype("int16"))
+        close_arr = np.isclose(written[2:] / factor, arr, atol=1 / factor)
+        self.assertTrue(close_arr.all())
 
     def test_create_rits_format(self):
         tof = np.array([1, 2, 3])
@@ -4,16 +4,34 @@ from __future__ import annotations
 
 import glob
 import os
-import numpy as np
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from logging import getLogger
+from typing import TYPE_CHECKING
+from collections.abc import Callable
+
+import numpy as np
+
+from mantidimaging.core.parallel import manager as pm
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from mantidimaging.core.utility.progress_reporting import Progress
 
 log = getLogger(__name__)
 
 DEFAULT_IO_FILE_FORMAT = 'tif'
 NEXUS_PROCESSED_DATA_PATH = "processed-data"
+# The metadata of the sample, including its operation history, as json
+NEXUS_PROCESSED_METADATA_PATH = f"{NEXUS_PROCESSED_DATA_PATH}/process/notes"
 
 THRESHOLD_180 = np.radians(1)
 
+# The most files that can be queued for each IO thread. Files are submitted as earlier ones finish, so that errors
+# and cancellation stop the work quickly.
+QUEUED_FILES_PER_THREAD = 2
+
 
 def find_first_file_that_is_possibly_a_sample(file_path: str) -> str | None:
     # Grab all .tif or .tiff files
@@ -35,3 +53,47 @@ def find_projection_closest_to_180(projections: np.ndarray, projection_angles: n
     """
     diff = np.abs(projection_angles - np.pi)
     return projections[diff.argmin()], np.amin(diff)
+
+
+def run_io_tasks(task: Callable[[int], int], num_tasks: int, progress: Progress, msg: str) -> int:
+    """
+    Run task(0) ... task(num_tasks - 1) concurrently on the IO thread pool, e.g. to read or write a series of files.
+
+    Reading, writing and most encoding release the GIL, so the time is bound by the latency of each file rather than
+    by a single thread. On an error or cancellation the queued tasks are dropped and the running ones are waited for
+    before the exception is raised, so no thread is left touching the data.
+
+    :param task: Processes the file at the given index and returns the number of bytes it read or wrote
+    :param num_tasks: Number of files
+    :param progress: Updated as each file finishes, with the throughput so far
+    :param msg: Progress message, followed by the throughput in MB/s
+    :return: The total number of bytes read or written
+    """
+    executor = pm.get_io_thread_pool()
+    max_queued = QUEUED_FILES_PER_THREAD * pm.IO_THREADS
+    start_time = time.perf_counter()
+    total_bytes = 0
+    pending: set[Future[int]] = set()
+
+    def wait_for_first() -> None:
+        nonlocal total_bytes, pending
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            total_bytes += future.result()
+            throughput = total_bytes / 1024**2 / max(time.perf_counter() - start_time, 1e-9)
+            progress.update(msg=f'{msg}, {throughput:.1f} MB/s')
+
+    try:
+        for idx in range(num_tasks):
+            if len(pending) >= max_queued:
+                wait_for_first()
+            pending.add(executor.submit(task, idx))
+        while pending:
+            wait_for_first()
+    finally:
+        for future in pending:
+            future.cancel()
+        wait(pending)
+
+    log.info(f"{msg}: {num_tasks} files, {total_bytes / 1024**2:.1f} MB in {time.perf_counter() - start_time:.2f}s")
+    return total_bytes
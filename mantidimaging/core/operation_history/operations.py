@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from functools import partial
 from logging import getLogger
-from typing import Any
+from typing import Any, TYPE_CHECKING
 from collections.abc import Callable, Iterable
 
 import numpy as np
@@ -12,6 +12,9 @@ import numpy as np
 from mantidimaging.core.operations.loader import load_filter_packages
 from . import const
 
+if TYPE_CHECKING:
+    from mantidimaging.core.operations.pipeline import Operation
+
 MODULE_NOT_FOUND = "Could not find module with name '{}'"
 
 
@@ -65,3 +68,19 @@ def ops_to_partials(filter_ops: Iterable[ImageOperation]) -> Iterable[partial]:
     }
     filter_funcs.update(fixed_funcs)
     return (op.to_partial(filter_funcs) for op in filter_ops)
+
+
+def ops_to_pipeline(filter_ops: Iterable[ImageOperation]) -> list[Operation]:
+    """
+    The filter classes and keyword arguments of the operations, to be run with
+    mantidimaging.core.operations.pipeline.run_pipeline
+    """
+    filter_classes = {f.__name__: f for f in load_filter_packages()}
+    pipeline = []
+    for op in filter_ops:
+        if op.filter_name not in filter_classes:
+            msg = MODULE_NOT_FOUND.format(op.filter_name)
+            getLogger(__name__).error(msg)
+            raise KeyError(msg)
+        pipeline.append((filter_classes[op.filter_name], op.filter_kwargs))
+    return pipeline
@@ -23,3 +23,17 @@ class OperationHistoryTest(unittest.TestCase):
         ops = operations.ops_to_partials(in_ops)
         with self.assertRaisesRegex(KeyError, MODULE_NOT_FOUND.format(fake_module_name)):
             list(ops)
+
+    def test_ops_to_pipeline(self):
+        in_ops = [ImageOperation("MedianFilter", {"size": 3}, "Median"), ImageOperation("RescaleFilter", {}, "Rescale")]
+
+        pipeline = operations.ops_to_pipeline(in_ops)
+
+        self.assertEqual([(f.__name__, kwargs) for f, kwargs in pipeline], [("MedianFilter", {
+            "size": 3
+        }), ("RescaleFilter", {})])
+
+    def test_ops_to_pipeline_bad_module(self):
+        fake_module_name = "NonExistingFilter12"
+        with self.assertRaisesRegex(KeyError, MODULE_NOT_FOUND.format(fake_module_name)):
+            operations.ops_to_pipeline([ImageOperation(fake_module_name, {}, "unknown")])
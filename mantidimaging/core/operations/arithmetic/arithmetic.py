@@ -25,6 +25,7 @@ class ArithmeticFilter(BaseFilter):
 
     """
     filter_name = "Arithmetic"
+    compact_dtypes = ("float16", )
 
     @staticmethod
     def filter_func(images: ImageStack,
@@ -53,7 +54,9 @@ class ArithmeticFilter(BaseFilter):
         return images
 
     @staticmethod
-    def compute_function(i: int, array: np.ndarray, params: dict[str, float]):
+    @ps.thread_safe
+    @ps.vectorised
+    def compute_function(i: int | slice, array: np.ndarray, params: dict[str, float]):
         array[i] = array[i] * (params["mult"] / params["div"]) + (params["add"] - params["sub"])
 
     @staticmethod
@@ -2,8 +2,8 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
-from functools import partial
-from typing import TYPE_CHECKING, Any
+from functools import partial, wraps
+from typing import TYPE_CHECKING, Any, NamedTuple
 from collections.abc import Callable
 from enum import Enum, auto
 
@@ -15,6 +15,7 @@ if TYPE_CHECKING:
     from PyQt5.QtWidgets import QFormLayout, QWidget  # noqa: F401   # pragma: no cover
     from mantidimaging.gui.mvp_base import BaseMainWindowView  # pragma: no cover
     from mantidimaging.gui.widgets.dataset_selector import DatasetSelectorWidgetView
+    from mantidimaging.core.parallel.shared import ComputeFuncType
 
 
 class FilterGroup(Enum):
@@ -23,11 +24,23 @@ class FilterGroup(Enum):
     Advanced = auto()
 
 
+class ImageStage(NamedTuple):
+    """
+    A filter set up to be applied to one projection at a time, as its compute function and the parameters to call it
+    with, i.e. func(index, array, params)
+    """
+    func: ComputeFuncType
+    params: dict[str, Any]
+
+
 class BaseFilter:
     filter_name = "Unnamed Filter"
     link_histograms = False
     show_negative_overlay = True
     operate_on_sinograms = False
+    # The compact dtypes (see ImageStack.is_compact) that the filter can run on. Stacks stored with any other compact
+    # dtype are promoted to float32 by filter_func before the filter is applied, see promote_compact.
+    compact_dtypes: tuple[str, ...] = ()
 
     SINOGRAM_FILTER_INFO = "This filter will work on a\nsinogram view of the data."
 
@@ -39,6 +52,21 @@ class BaseFilter:
     which are optional.
     """
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Wrap each filter_func, so that filters are written for float images however they are called
+        if "filter_func" in cls.__dict__:
+            cls.filter_func = staticmethod(  # type: ignore[method-assign]
+                _promoting_filter_func(cls, cls.__dict__["filter_func"].__func__))
+
+    @classmethod
+    def promote_compact(cls, images: ImageStack) -> None:
+        """
+        Promotes a compact stack (see ImageStack.is_compact) to float32, unless the filter can run on its dtype.
+        """
+        if isinstance(images, ImageStack) and images.is_compact and images.dtype not in cls.compact_dtypes:
+            images.promote()
+
     @staticmethod
     def filter_func(data: ImageStack) -> ImageStack:
         """
@@ -51,6 +79,30 @@ class BaseFilter:
         raise_not_implemented("filter_func")
         return ImageStack(np.asarray([]))
 
+    @staticmethod
+    def peak_memory(images: ImageStack, **kwargs) -> int:
+        """
+        The bytes of shared memory that filter_func allocates on top of the input images, used to reserve memory
+        before the filter is run. Filters that create a new output array should override this.
+
+        :param images: the image data the filter will be applied to
+        :param kwargs: the arguments that will be passed to filter_func
+        """
+        return 0
+
+    @staticmethod
+    def image_stage(**kwargs) -> ImageStage | None:
+        """
+        Set up the filter to be applied to one projection at a time, e.g. to each image as it is loaded.
+
+        Filters with a thread safe compute_function that processes each projection independently should override this
+        to validate the arguments and return the stage, and run the same stage in filter_func.
+
+        :param kwargs: the arguments that would be passed to filter_func
+        :return: the stage, or None if the filter can not be applied to one projection at a time
+        """
+        return None
+
     @staticmethod
     def execute_wrapper(args) -> partial:
         """
@@ -107,5 +159,15 @@ class BaseFilter:
         return stack
 
 
+def _promoting_filter_func(filter_class: type[BaseFilter], filter_func: Callable) -> Callable:
+
+    @wraps(filter_func)
+    def wrapper(images, *args, **kwargs):
+        filter_class.promote_compact(images)
+        return filter_func(images, *args, **kwargs)
+
+    return wrapper
+
+
 def raise_not_implemented(function_name):
     raise NotImplementedError(f"Required method '{function_name}' not implemented for filter")
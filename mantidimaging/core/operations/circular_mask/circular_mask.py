@@ -26,6 +26,7 @@ class CircularMaskFilter(BaseFilter):
     Caution: Ensure that the radius does not mask data from the sample.
     """
     filter_name = "Circular Mask"
+    compact_dtypes = ("float16", )
     link_histograms = True
 
     @staticmethod
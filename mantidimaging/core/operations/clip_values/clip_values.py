@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
-from mantidimaging.core.operations.base_filter import BaseFilter
+from mantidimaging.core.operations.base_filter import BaseFilter, ImageStage
 from mantidimaging.core.parallel import shared as ps
 
 if TYPE_CHECKING:
@@ -25,6 +25,7 @@ class ClipValuesFilter(BaseFilter):
     Caution: Make sure the value range does not clip information from the sample.
     """
     filter_name = "Clip Values"
+    compact_dtypes = ("float16", )
     link_histograms = True
 
     @staticmethod
@@ -54,6 +55,17 @@ class ClipValuesFilter(BaseFilter):
 
         :return: The processed 3D numpy.ndarray.
         """
+        stage = ClipValuesFilter.image_stage(clip_min, clip_max, clip_min_new_value, clip_max_new_value)
+        ps.run_compute_func(stage.func, data.data.shape[0], [data.shared_array], stage.params, progress)
+
+        return data
+
+    @staticmethod
+    def image_stage(clip_min=None,
+                    clip_max=None,
+                    clip_min_new_value=None,
+                    clip_max_new_value=None,
+                    **kwargs) -> ImageStage:
         # We're using is None because 0.0 is a valid value
         if clip_min is None and clip_max is None:
             raise ValueError('At least one of clip_min or clip_max must be supplied')
@@ -63,13 +75,10 @@ class ClipValuesFilter(BaseFilter):
             'clip_min_new_value': clip_min_new_value,
             'clip_max_new_value': clip_max_new_value
         }
-
-        ps.run_compute_func(ClipValuesFilter.compute_function, data.data.shape[0], [data.shared_array], params,
-                            progress)
-
-        return data
+        return ImageStage(ClipValuesFilter.compute_function, params)
 
     @staticmethod
+    @ps.thread_safe
     def compute_function(i: int, array: np.ndarray, params: dict[str, Any]):
         slice = array[i]
         clip_min = params['clip_min'] if params['clip_min'] is not None else slice.min()
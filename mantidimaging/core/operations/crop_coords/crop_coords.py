@@ -10,6 +10,7 @@ from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
 from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.utility.sensible_roi import SensibleROI
+from mantidimaging.core.utility.size_calculator import full_size_bytes
 from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
@@ -29,6 +30,8 @@ class CropCoordinatesFilter(BaseFilter):
     during the rotation of the sample in the dataset.
     """
     filter_name = "Crop Coordinates"
+    # Cropping only copies pixels, so raw counts are kept as they are
+    compact_dtypes = ("uint16", "float16")
     link_histograms = True
 
     @staticmethod
@@ -73,6 +76,18 @@ class CropCoordinatesFilter(BaseFilter):
         images.shared_array = output
         return images
 
+    @staticmethod
+    def peak_memory(images: ImageStack,
+                    region_of_interest: list[int] | list[float] | SensibleROI | None = None,
+                    **kwargs) -> int:
+        if region_of_interest is None:
+            region_of_interest = SensibleROI.from_list([0, 0, 50, 50])
+        if isinstance(region_of_interest, list):
+            region_of_interest = SensibleROI.from_list(region_of_interest)
+        assert isinstance(region_of_interest, SensibleROI)
+        shape = (images.data.shape[0], region_of_interest.height, region_of_interest.width)
+        return full_size_bytes(shape, images.dtype) if all(s >= 0 for s in shape) else 0
+
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
@@ -30,6 +30,7 @@ class DivideFilter(BaseFilter):
     Caution: Check preview values before applying divide
     """
     filter_name = "Divide"
+    compact_dtypes = ("float16", )
     link_histograms = True
 
     @staticmethod
@@ -53,7 +54,9 @@ class DivideFilter(BaseFilter):
         return images
 
     @staticmethod
-    def compute_function(i: int, array: np.ndarray, params: dict):
+    @ps.thread_safe
+    @ps.vectorised
+    def compute_function(i: int | slice, array: np.ndarray, params: dict):
         value = params['value']
         array[i] /= value
 
@@ -2,6 +2,9 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import threading
+import weakref
+from collections import OrderedDict
 from functools import partial
 from typing import Any, TYPE_CHECKING
 from PyQt5.QtWidgets import QComboBox, QCheckBox
@@ -9,19 +12,29 @@ from PyQt5.QtWidgets import QComboBox, QCheckBox
 import numpy as np
 
 from mantidimaging import helper as h
-from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
+from mantidimaging.core.operation_history import const
+from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup, ImageStage
 from mantidimaging.core.parallel import utility as pu, shared as ps
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.gui.utility.qt_helpers import Type
 from mantidimaging.gui.widgets.dataset_selector import DatasetSelectorWidgetView
 
 if TYPE_CHECKING:
+    import uuid
+
     from mantidimaging.core.data import ImageStack
 
 # The smallest and largest allowed pixel value
 MINIMUM_PIXEL_VALUE = 1e-9
 MAXIMUM_PIXEL_VALUE = 1e9
 valid_methods = ["Only Before", "Only After", "Both, concatenated"]
+valid_averages = ["Mean", "Median"]
+# Number of averaged flat and dark stacks that are kept, see average_images
+AVERAGE_CACHE_SIZE = 8
+
+# Averages by stack and method, with the length of the stack's history and the array of its data when it was averaged
+_averages: OrderedDict[tuple[uuid.UUID, str], tuple[int, weakref.ref[np.ndarray], np.ndarray]] = OrderedDict()
+_averages_lock = threading.Lock()
 
 
 def enable_correct_fields_only(selected_flat_fielding_widget, flat_before_widget, flat_after_widget, dark_before_widget,
@@ -52,7 +65,8 @@ class FlatFieldFilter(BaseFilter):
     and to correct for a beam profile, scintillator imperfections and/or  detector inhomogeneities. This
     operation produces images of transmission values.
 
-    In practice, several open beam and dark images are averaged in the flat-fielding process.
+    In practice, several open beam and dark images are averaged in the flat-fielding process. The median can be used
+    instead of the mean to ignore bright spots that are only in some of the images.
 
     Intended to be used on: Projections
 
@@ -73,6 +87,7 @@ class FlatFieldFilter(BaseFilter):
                     dark_after: ImageStack | None = None,
                     selected_flat_fielding: str | None = None,
                     use_dark: bool = True,
+                    average_method: str = "Mean",
                     progress=None) -> ImageStack:
         """Do background correction with flat and dark images.
 
@@ -84,47 +99,47 @@ class FlatFieldFilter(BaseFilter):
         :param selected_flat_fielding: Select which of the flat fielding methods to use, just Before stacks, just After
                                        stacks or combined.
         :param use_dark: Whether to use dark frame subtraction
+        :param average_method: How the flat and dark images are averaged, one of valid_averages
         :return: Filtered data (stack of images)
         """
         h.check_data_stack(images)
 
-        if selected_flat_fielding == "Both, concatenated" and flat_after is not None and flat_before is not None \
-                and dark_after is not None and dark_before is not None:
-            flat_avg = (flat_before.data.mean(axis=0) + flat_after.data.mean(axis=0)) / 2.0
-            if use_dark:
-                dark_avg = (dark_before.data.mean(axis=0) + dark_after.data.mean(axis=0)) / 2.0
-        elif selected_flat_fielding == "Only Before" and flat_before is not None and dark_before is not None:
-            flat_avg = flat_before.data.mean(axis=0)
-            if use_dark:
-                dark_avg = dark_before.data.mean(axis=0)
-        elif selected_flat_fielding == "Only After" and flat_after is not None and dark_after is not None:
-            flat_avg = flat_after.data.mean(axis=0)
-            if use_dark:
-                dark_avg = dark_after.data.mean(axis=0)
-        else:
-            raise ValueError("selected_flat_fielding not in:", valid_methods)
-
-        if not use_dark:
-            dark_avg = np.zeros_like(flat_avg)
-
-        if flat_avg is not None and dark_avg is not None:
-            if 2 != flat_avg.ndim or 2 != dark_avg.ndim:
-                raise ValueError(
-                    f"Incorrect shape of the flat image ({flat_avg.shape}) or dark image ({dark_avg.shape}) \
-                    which should match the shape of the sample images ({images.data.shape})")
-
-            if not images.data.shape[1:] == flat_avg.shape == dark_avg.shape:
-                raise ValueError(f"Not all images are the expected shape: {images.data.shape[1:]}, instead "
-                                 f"flat had shape: {flat_avg.shape}, and dark had shape: {dark_avg.shape}")
-
-            progress = Progress.ensure_instance(progress,
-                                                num_steps=images.data.shape[0],
-                                                task_name='Background Correction')
-            _execute(images, flat_avg, dark_avg, progress)
+        stage = FlatFieldFilter.image_stage(flat_before, flat_after, dark_before, dark_after, selected_flat_fielding,
+                                            use_dark, average_method)
+        dark_avg = stage.params['dark']
+        if not images.data.shape[1:] == dark_avg.shape:
+            raise ValueError(f"Not all images are the expected shape: {images.data.shape[1:]}, instead "
+                             f"flat and dark had shape: {dark_avg.shape}")
+
+        progress = Progress.ensure_instance(progress, num_steps=images.data.shape[0], task_name='Background Correction')
+        ps.run_compute_func(stage.func, images.data.shape[0], images.shared_array, stage.params, progress)
 
         h.check_data_stack(images)
         return images
 
+    @staticmethod
+    def image_stage(flat_before: ImageStack | None = None,
+                    flat_after: ImageStack | None = None,
+                    dark_before: ImageStack | None = None,
+                    dark_after: ImageStack | None = None,
+                    selected_flat_fielding: str | None = None,
+                    use_dark: bool = True,
+                    average_method: str = "Mean",
+                    **kwargs) -> ImageStage:
+        flat_avg, dark_avg = _flat_and_dark_averages(flat_before, flat_after, dark_before, dark_after,
+                                                     selected_flat_fielding, use_dark, average_method)
+        norm_divide = np.subtract(flat_avg, dark_avg)
+        # prevent divide-by-zero issues, and negative pixels make no sense
+        norm_divide[norm_divide == 0] = MINIMUM_PIXEL_VALUE
+        return ImageStage(FlatFieldFilter.compute_function, {'dark': dark_avg, 'scale': np.reciprocal(norm_divide)})
+
+    @staticmethod
+    @ps.thread_safe
+    def compute_function(i: int, array: np.ndarray, params: dict[str, Any]):
+        # (data - dark) / (flat - dark) as one pass over the projection, while it is in the CPU cache
+        np.subtract(array[i], params['dark'], out=array[i])
+        np.multiply(array[i], params['scale'], out=array[i])
+
     @staticmethod
     def register_gui(form, on_change, view) -> dict[str, Any]:
         from mantidimaging.gui.utility import add_property_to_form
@@ -151,6 +166,15 @@ class FlatFieldFilter(BaseFilter):
                                                     on_change=on_change,
                                                     tooltip="Flat images to be used for correcting the flat field.")
 
+        _, average_method_widget = add_property_to_form("Average Method",
+                                                        Type.CHOICE,
+                                                        valid_values=valid_averages,
+                                                        form=form,
+                                                        filters_view=view,
+                                                        on_change=on_change,
+                                                        tooltip="How the flat and dark images are averaged. The "
+                                                        "median ignores bright spots that are only in some images.")
+
         _, use_dark_widget = add_property_to_form("Use Dark Frame",
                                                   Type.BOOL,
                                                   default_value=True,
@@ -214,13 +238,15 @@ class FlatFieldFilter(BaseFilter):
             'dark_before_widget': dark_before_widget,
             'dark_after_widget': dark_after_widget,
             'use_dark_widget': use_dark_widget,
+            'average_method_widget': average_method_widget,
         }
 
     @staticmethod
     def execute_wrapper(  # type: ignore
             flat_before_widget: DatasetSelectorWidgetView, flat_after_widget: DatasetSelectorWidgetView,
             dark_before_widget: DatasetSelectorWidgetView, dark_after_widget: DatasetSelectorWidgetView,
-            selected_flat_fielding_widget: QComboBox, use_dark_widget: QCheckBox) -> partial:
+            selected_flat_fielding_widget: QComboBox, use_dark_widget: QCheckBox,
+            average_method_widget: QComboBox) -> partial:
 
         flat_before_images = BaseFilter.get_images_from_stack(flat_before_widget, "flat before")
         flat_after_images = BaseFilter.get_images_from_stack(flat_after_widget, "flat after")
@@ -232,13 +258,16 @@ class FlatFieldFilter(BaseFilter):
 
         use_dark = use_dark_widget.isChecked()
 
+        average_method = average_method_widget.currentText()
+
         return partial(FlatFieldFilter.filter_func,
                        flat_before=flat_before_images,
                        flat_after=flat_after_images,
                        dark_before=dark_before_images,
                        dark_after=dark_after_images,
                        selected_flat_fielding=selected_flat_fielding,
-                       use_dark=use_dark)
+                       use_dark=use_dark,
+                       average_method=average_method)
 
     @staticmethod
     def validate_execute_kwargs(kwargs):
@@ -260,58 +289,87 @@ class FlatFieldFilter(BaseFilter):
         return FilterGroup.Basic
 
 
-def _divide(data, norm_divide):
-    np.true_divide(data, norm_divide, out=data)
-
-
-def _subtract(data, dark=None):
-    # specify out to do in place, otherwise the data is copied
-    np.subtract(data, dark, out=data)
-
-
-def _norm_divide(flat: np.ndarray, dark: np.ndarray) -> np.ndarray:
-    # subtract dark from flat
-    return np.subtract(flat, dark)
-
-
-def _execute(images: ImageStack, flat=None, dark=None, progress=None):
-    """A benchmark justifying the current implementation, performed on
-    500x2048x2048 images.
-
-    #1 Separate runs
-    Subtract (sequential with np.subtract(data, dark, out=data)) - 13s
-    Divide (par) - 1.15s
+def average_images(images: ImageStack, method: str = "Mean") -> np.ndarray:
+    """
+    The mean or median of a stack of flat or dark images, computed in parallel over rows of the images.
 
-    #2 Separate parallel runs
-    Subtract (par) - 5.5s
-    Divide (par) - 1.15s
+    Averages are cached until an operation is applied to the stack or its data is replaced, so that the stacks are not
+    averaged again each time the flat-fielding preview is refreshed. The returned image is read only.
 
-    #3 Added subtract into _divide so that it is:
-                np.true_divide(
-                    np.subtract(data, dark, out=data), norm_divide, out=data)
-    Subtract then divide (par) - 55s
+    :param images: The flat or dark images
+    :param method: One of valid_averages
     """
-    with progress:
-        progress.update(msg="Applying background correction")
-
-        if images.uses_shared_memory:
-            shared_dark = pu.copy_into_shared_memory(dark)
-            norm_divide = pu.copy_into_shared_memory(_norm_divide(flat, dark))
-        else:
-            shared_dark = pu.SharedArray(dark, None)
-            norm_divide = pu.SharedArray(_norm_divide(flat, dark), None)
+    if method not in valid_averages:
+        raise ValueError(f"average_method not in: {valid_averages}")
+    key = (images.id, method)
+    version = len(images.metadata.get(const.OPERATION_HISTORY, []))
+    shared_array = images.shared_array
+    # The data can be replaced either with a new shared array, or with a new array in the same shared array
+    data = shared_array.array
+    with _averages_lock:
+        cached = _averages.get(key)
+        if cached is not None and cached[0] == version and cached[1]() is data:
+            _averages.move_to_end(key)
+            return cached[2]
+
+    average = pu.SharedArray(np.empty(data.shape[1:], np.promote_types(data.dtype, np.float32)), None)
+    ps.run_compute_func(_average_rows, data.shape[1], [shared_array, average], {'method': method})
+    average.array.flags.writeable = False
+    with _averages_lock:
+        _averages[key] = (version, weakref.ref(data), average.array)
+        _averages.move_to_end(key)
+        while len(_averages) > AVERAGE_CACHE_SIZE:
+            _averages.popitem(last=False)
+    return average.array
+
+
+def clear_average_cache() -> None:
+    with _averages_lock:
+        _averages.clear()
+
+
+@ps.thread_safe
+@ps.vectorised
+def _average_rows(rows: int | slice, arrays: list[np.ndarray], params: dict[str, Any]):
+    images, out = arrays
+    if params['method'] == "Median":
+        out[rows] = np.median(images[:, rows], axis=0)
+    else:
+        out[rows] = np.mean(images[:, rows], axis=0)
 
-        # prevent divide-by-zero issues, and negative pixels make no sense
-        norm_divide.array[norm_divide.array == 0] = MINIMUM_PIXEL_VALUE
 
-        # subtract the dark from all images
-        do_subtract = ps.create_partial(_subtract, fwd_function=ps.inplace_second_2d)
-        arrays = [images.shared_array, shared_dark]
-        ps.execute(do_subtract, arrays, images.data.shape[0], progress)
+def _flat_and_dark_averages(flat_before: ImageStack | None,
+                            flat_after: ImageStack | None,
+                            dark_before: ImageStack | None,
+                            dark_after: ImageStack | None,
+                            selected_flat_fielding: str | None,
+                            use_dark: bool,
+                            average_method: str = "Mean") -> tuple[np.ndarray, np.ndarray]:
+    """
+    Average the flat and dark stacks selected by selected_flat_fielding. The dark is zero if use_dark is False.
+    When both the before and after stacks are used, their averages are averaged.
+    """
+    average = partial(average_images, method=average_method)
+    if selected_flat_fielding == "Both, concatenated" and flat_after is not None and flat_before is not None \
+            and dark_after is not None and dark_before is not None:
+        flat_avg = (average(flat_before) + average(flat_after)) / 2.0
+        if use_dark:
+            dark_avg = (average(dark_before) + average(dark_after)) / 2.0
+    elif selected_flat_fielding == "Only Before" and flat_before is not None and dark_before is not None:
+        flat_avg = average(flat_before)
+        if use_dark:
+            dark_avg = average(dark_before)
+    elif selected_flat_fielding == "Only After" and flat_after is not None and dark_after is not None:
+        flat_avg = average(flat_after)
+        if use_dark:
+            dark_avg = average(dark_after)
+    else:
+        raise ValueError("selected_flat_fielding not in:", valid_methods)
 
-        # divide the data by (flat - dark)
-        do_divide = ps.create_partial(_divide, fwd_function=ps.inplace_second_2d)
-        arrays = [images.shared_array, norm_divide]
-        ps.execute(do_divide, arrays, images.data.shape[0], progress)
+    if not use_dark:
+        dark_avg = np.zeros_like(flat_avg)
 
-    return images
+    if 2 != flat_avg.ndim or 2 != dark_avg.ndim or flat_avg.shape != dark_avg.shape:
+        raise ValueError(f"Incorrect shape of the flat image ({flat_avg.shape}) or dark image ({dark_avg.shape}), "
+                         "which should be 2D images of the same shape")
+    return flat_avg, dark_avg
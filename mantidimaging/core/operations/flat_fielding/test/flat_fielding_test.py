@@ -11,7 +11,8 @@ import numpy as np
 import numpy.testing as npt
 
 import mantidimaging.test_helpers.unit_test_helper as th
-from mantidimaging.core.operations.flat_fielding.flat_fielding import enable_correct_fields_only
+from mantidimaging.core.operations.flat_fielding.flat_fielding import (average_images, clear_average_cache,
+                                                                       enable_correct_fields_only)
 from mantidimaging.core.operations.flat_fielding import FlatFieldFilter
 
 if TYPE_CHECKING:
@@ -25,6 +26,9 @@ class FlatFieldingTest(unittest.TestCase):
     Tests return value and in-place modified data.
     """
 
+    def setUp(self) -> None:
+        clear_average_cache()
+
     def _make_images(self) -> tuple[ImageStack, ImageStack, ImageStack, ImageStack, ImageStack]:
         images = th.generate_images()
         flat_before = th.generate_images()
@@ -115,16 +119,106 @@ class FlatFieldingTest(unittest.TestCase):
         selected_flat_fielding_widget = mock.Mock()
         selected_flat_fielding_widget.currentText = mock.Mock(return_value="Only Before")
         use_dark_widget = mock.Mock()
+        average_method_widget = mock.Mock()
+        average_method_widget.currentText = mock.Mock(return_value="Median")
 
         execute_func = FlatFieldFilter.execute_wrapper(flat_before_widget=flat_before_widget,
                                                        flat_after_widget=flat_before_widget,
                                                        dark_before_widget=dark_before_widget,
                                                        dark_after_widget=dark_after_widget,
                                                        selected_flat_fielding_widget=selected_flat_fielding_widget,
-                                                       use_dark_widget=use_dark_widget)
+                                                       use_dark_widget=use_dark_widget,
+                                                       average_method_widget=average_method_widget)
         images = th.generate_images()
         execute_func(images)
 
+        self.assertEqual(execute_func.keywords["average_method"], "Median")
+
+    def test_real_result_median(self):
+        images, flat_before, dark_before, flat_after, dark_after = self._make_images()
+        images.data[:] = 26.
+        flat_before.data[:] = 7.
+        # A bright spot in one flat image is ignored by the median
+        flat_before.data[0, 1, 2] = 1000.
+        dark_before.data[:] = 6.
+
+        result = FlatFieldFilter.filter_func(images,
+                                             flat_before=flat_before,
+                                             dark_before=dark_before,
+                                             selected_flat_fielding="Only Before",
+                                             average_method="Median")
+
+        npt.assert_almost_equal(result.data, np.full(images.data.shape, 20.), 7)
+
+    @parameterized.expand([("Mean", np.mean), ("Median", np.median)])
+    def test_average_images(self, method, expected_func):
+        images = th.generate_images_for_parallel(seed=2)
+
+        average = average_images(images, method)
+
+        npt.assert_allclose(average, expected_func(images.data, axis=0), rtol=1e-6)
+        self.assertEqual(average.dtype, np.float32)
+        self.assertFalse(average.flags.writeable)
+
+    def test_average_images_cached_until_stack_changed(self):
+        images = th.generate_images()
+        average = average_images(images)
+
+        self.assertIs(average_images(images), average)
+        self.assertIsNot(average_images(images, "Median"), average)
+
+        images.data[:] = 2.
+        images.record_operation("ArithmeticFilter", "Arithmetic")
+        npt.assert_equal(average_images(images), 2.)
+
+    def test_average_images_recomputed_for_new_data(self):
+        images = th.generate_images()
+        average = average_images(images)
+
+        images.promote(np.float64)
+
+        self.assertIsNot(average_images(images), average)
+
+    def test_average_images_recomputed_when_data_replaced(self):
+        images = th.generate_images()
+        average_images(images)
+
+        images.data = np.zeros_like(images.data)
+
+        npt.assert_equal(average_images(images), 0.)
+
+    def test_invalid_average_method_raises(self):
+        with self.assertRaisesRegex(ValueError, "average_method"):
+            average_images(th.generate_images(), "Mode")
+
+    def test_mismatched_flat_and_dark_raise(self):
+        images, flat_before, _, _, _ = self._make_images()
+        dark_before = th.generate_images((10, 4, 5))
+
+        with self.assertRaisesRegex(ValueError, "same shape"):
+            FlatFieldFilter.filter_func(images,
+                                        flat_before=flat_before,
+                                        dark_before=dark_before,
+                                        selected_flat_fielding="Only Before")
+
+    def test_image_stage_matches_filter_func(self):
+        images, flat_before, dark_before, flat_after, dark_after = self._make_images()
+        kwargs = {
+            "flat_before": flat_before,
+            "flat_after": flat_after,
+            "dark_before": dark_before,
+            "dark_after": dark_after,
+            "selected_flat_fielding": "Both, concatenated"
+        }
+        stage_images = images.copy()
+
+        FlatFieldFilter.filter_func(images, **kwargs)
+        stage = FlatFieldFilter.image_stage(**kwargs)
+        for i in range(stage_images.data.shape[0]):
+            stage.func(i, stage_images.data, stage.params)
+
+        npt.assert_allclose(stage_images.data, images.data, rtol=1e-6)
+
     def test_enable_correct_fields_only_before(self):
         text = "Only Before"
         flat_before_widget = mock.MagicMock()
@@ -26,6 +26,7 @@ class GaussianFilter(BaseFilter):
     When: As a pre-processing or post-reconstruction step to reduce noise.
     """
     filter_name = "Gaussian"
+    compact_dtypes = ("float16", )
     link_histograms = True
 
     @staticmethod
@@ -59,6 +60,7 @@ class GaussianFilter(BaseFilter):
         return data
 
     @staticmethod
+    @ps.thread_safe
     def compute_function(i: int, array: np.ndarray, params):
         scipy_ndimage.gaussian_filter(array[i],
                                       sigma=params['size'],
@@ -3,8 +3,7 @@
 from __future__ import annotations
 import os
 import pkgutil
-import sys
-from importlib.util import module_from_spec
+from importlib import import_module
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -16,22 +15,13 @@ _OPERATION_MODULES_LIST: list[BaseFilterClass] = []
 
 def _find_operation_modules() -> list[BaseFilterClass]:
     module_list: list[BaseFilterClass] = []
-    for finder, module_name, ispkg in pkgutil.walk_packages([os.path.dirname(__file__)]):
+    for _, module_name, ispkg in pkgutil.iter_modules([os.path.dirname(__file__)]):
         if not ispkg:
             continue
 
-        if getattr(sys, 'frozen', False):
-            # If we're running a PyInstaller executable then we need to use a full module path
-            module_name = f'mantidimaging.core.operations.{module_name}'
-
-        # near impossible to type check as find can be a pyinstaller specific type that we can't normally import
-        spec = finder.find_spec(module_name)  # type: ignore[call-arg]
-
-        assert spec is not None
-        assert spec.loader is not None
-        module = module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
+        # Import using the full module path, so that compute functions pickled for the process pool can be imported on
+        # demand in the worker processes
+        module = import_module(f'{__package__}.{module_name}')
         if hasattr(module, 'FILTER_CLASS'):
             module_list.append(module.FILTER_CLASS)
 
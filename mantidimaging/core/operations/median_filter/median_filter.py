@@ -15,7 +15,7 @@ import scipy.ndimage as scipy_ndimage
 
 from mantidimaging import helper as h
 from mantidimaging.core.gpu import utility as gpu
-from mantidimaging.core.operations.base_filter import BaseFilter
+from mantidimaging.core.operations.base_filter import BaseFilter, ImageStage
 from mantidimaging.core.parallel import shared as ps
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.gui.utility import add_property_to_form
@@ -87,17 +87,24 @@ class MedianFilter(BaseFilter):
         """
         # Validation
         h.check_data_stack(data)
-        if size is None or size <= 1:
-            raise ValueError(f'Size parameter must be greater than 1, but value provided was {size}')
-
-        params = {'mode': mode, 'size': size, 'force_cpu': force_cpu, 'progress': progress}
-        if force_cpu:
-            ps.run_compute_func(MedianFilter.compute_function, data.data.shape[0], data.shared_array, params)
+        stage = MedianFilter.image_stage(size, mode, force_cpu)
+        if stage is not None:
+            ps.run_compute_func(stage.func, data.data.shape[0], data.shared_array, stage.params)
         else:
             _execute_gpu(data.data, size, mode, progress=None)
         return data
 
     @staticmethod
+    def image_stage(size=None, mode="reflect", force_cpu=True, **kwargs) -> ImageStage | None:
+        if size is None or size <= 1:
+            raise ValueError(f'Size parameter must be greater than 1, but value provided was {size}')
+        if not force_cpu:
+            # The GPU implementation processes the whole stack at once
+            return None
+        return ImageStage(MedianFilter.compute_function, {'mode': mode, 'size': size})
+
+    @staticmethod
+    @ps.thread_safe
     def compute_function(i: int, array: np.ndarray, params: dict[str, Any]):
         mode = params['mode']
         size = params['size']
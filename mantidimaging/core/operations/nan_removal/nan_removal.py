@@ -35,6 +35,7 @@ class NaNRemovalFilter(BaseFilter):
     """
 
     filter_name = "NaN Removal"
+    compact_dtypes = ("float16", )
     link_histograms = True
 
     MODES = ["Constant", "Median"]
@@ -62,7 +63,9 @@ class NaNRemovalFilter(BaseFilter):
         return data
 
     @staticmethod
-    def compute_constant_function(i: int, array: np.ndarray, params: dict):
+    @ps.thread_safe
+    @ps.vectorised
+    def compute_constant_function(i: int | slice, array: np.ndarray, params: dict):
         replace_value = params['replace_value']
         nan_idxs = np.isnan(array[i])
         array[i][nan_idxs] = replace_value
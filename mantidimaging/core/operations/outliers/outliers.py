@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING
 import numpy as np
 from scipy.ndimage import median_filter
 
-from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
+from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup, ImageStage
 from mantidimaging.core.parallel import shared as ps
 from mantidimaging.gui.utility import add_property_to_form
 from mantidimaging.gui.utility.qt_helpers import Type
@@ -36,6 +36,7 @@ class OutliersFilter(BaseFilter):
     images, to remove pixels with very large values that will cause issues for flat-fielding.
     """
     filter_name = "Remove Outliers"
+    compact_dtypes = ("float16", )
     link_histograms = True
 
     @staticmethod
@@ -53,19 +54,23 @@ class OutliersFilter(BaseFilter):
 
         :return: The processed 3D numpy.ndarray
         """
+        stage = OutliersFilter.image_stage(diff, radius, mode)
+        ps.run_compute_func(stage.func, images.data.shape[0], images.shared_array, stage.params, progress)
+
+        return images
+
+    @staticmethod
+    def image_stage(diff=None, radius=_default_radius, mode=_default_mode, **kwargs) -> ImageStage:
         if not diff or not diff > 0:
             raise ValueError(f'diff parameter must be greater than 0. Value provided was {diff}')
 
         if not radius or not radius > 0:
             raise ValueError(f'radius parameter must be greater than 0. Value provided was {radius}')
 
-        params = {'diff': diff, 'radius': radius, 'mode': mode}
-        ps.run_compute_func(OutliersFilter.compute_function, images.data.shape[0], images.shared_array, params,
-                            progress)
-
-        return images
+        return ImageStage(OutliersFilter.compute_function, {'diff': diff, 'radius': radius, 'mode': mode})
 
     @staticmethod
+    @ps.thread_safe
     def compute_function(i: int, array: np.ndarray, params):
         diff = params['diff']
         radius = params['radius']
@@ -0,0 +1,111 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+This module applies a sequence of operations to a stack, fusing runs of per-projection operations into a single
+parallel pass over the data
+"""
+from __future__ import annotations
+
+from logging import getLogger
+from typing import Any, TYPE_CHECKING
+
+import numpy as np
+
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel.accountant import accountant
+
+if TYPE_CHECKING:
+    from mantidimaging.core.data import ImageStack
+    from mantidimaging.core.operations.base_filter import ImageStage
+    from mantidimaging.core.operations.loader import BaseFilterClass
+
+    # A filter class with the keyword arguments to run it with
+    Operation = tuple[BaseFilterClass, dict[str, Any]]
+
+LOG = getLogger(__name__)
+
+
+def fused_stage(operation: BaseFilterClass, kwargs: dict[str, Any]) -> ImageStage | None:
+    """
+    The stage that runs an operation as part of a fused pass, or None if it has to be run on its own.
+
+    Operations that work on sinograms, or that do not provide a thread safe image_stage (e.g. because they change the
+    shape of the images), can not be fused.
+
+    :raises ValueError: If the arguments are not valid for the operation
+    """
+    if operation.operate_on_sinograms:
+        return None
+    stage = operation.image_stage(**kwargs)
+    if stage is None or not getattr(stage.func, "thread_safe", False):
+        return None
+    return stage
+
+
+@ps.thread_safe
+def _run_stages(index: int, array: np.ndarray, params: dict[str, Any]) -> None:
+    for stage in params['stages']:
+        stage.func(index, array, stage.params)
+
+
+def run_pipeline(images: ImageStack, operations: list[Operation], progress=None) -> ImageStack:
+    """
+    Applies the operations to the stack in order, recording each of them in the operation history of the stack.
+
+    Consecutive operations that can be applied to one projection at a time are fused, so that each projection is put
+    through all of them while it is in the CPU cache, in one parallel pass over the stack instead of one pass for each
+    operation. Any other operation is run on its own with its filter_func, between the fused passes.
+
+    All the stages are set up before any operation is run, so invalid arguments are reported before the stack is
+    changed. A run of operations whose reference images (e.g. the flat and dark averages of flat fielding) do not
+    match the shape of the stack when the run is reached, because an earlier operation cropped or binned it, is not
+    fused, so that each filter_func reports the mismatch.
+
+    :param images: The stack to process in place
+    :param operations: Filter classes with the keyword arguments to run them with, in order
+    :param progress: The progress reporting instance
+    :return: The processed stack
+    """
+    stages = [fused_stage(operation, kwargs) for operation, kwargs in operations]
+
+    start = 0
+    while start < len(operations):
+        stop = start + 1
+        if stages[start] is not None:
+            while stop < len(operations) and stages[stop] is not None:
+                stop += 1
+        if stop - start > 1 and all(_fits_images(stage, images) for stage in stages[start:stop]):
+            _run_fused(images, operations[start:stop], stages[start:stop], progress)
+        else:
+            for operation in operations[start:stop]:
+                _run_staged(images, operation, progress)
+        start = stop
+    return images
+
+
+def _fits_images(stage: ImageStage | None, images: ImageStack) -> bool:
+    """
+    Whether the reference images in the parameters of the stage are the same shape as the images in the stack
+    """
+    assert stage is not None
+    image_shape = images.data.shape[1:]
+    return all(param.shape == image_shape for param in stage.params.values()
+               if isinstance(param, np.ndarray) and param.ndim == 2)
+
+
+def _run_fused(images: ImageStack, operations: list[Operation], stages: list[ImageStage | None], progress) -> None:
+    LOG.info(f"Fusing operations: {', '.join(operation.filter_name for operation, _ in operations)}")
+    for operation, _ in operations:
+        operation.promote_compact(images)
+    peak_memory = max(operation.peak_memory(images, **kwargs) for operation, kwargs in operations)
+    with accountant.reserve(peak_memory):
+        ps.run_compute_func(_run_stages, images.data.shape[0], images.shared_array, {'stages': stages}, progress)
+    for operation, kwargs in operations:
+        images.record_operation(operation.__name__, operation.filter_name, **kwargs)
+
+
+def _run_staged(images: ImageStack, operation: Operation, progress) -> None:
+    filter_class, kwargs = operation
+    with accountant.reserve(filter_class.peak_memory(images, **kwargs)):
+        filter_class.filter_func(images, **{**kwargs, 'progress': progress})
+    images.record_operation(filter_class.__name__, filter_class.filter_name, **kwargs)
@@ -10,6 +10,7 @@ from skimage.transform import resize
 
 from mantidimaging.core.operations.base_filter import BaseFilter
 from mantidimaging.core.parallel import utility as pu, shared as ps
+from mantidimaging.core.utility.size_calculator import full_size_bytes
 from mantidimaging.gui.utility import add_property_to_form
 from mantidimaging.gui.utility.qt_helpers import Type
 
@@ -67,6 +68,10 @@ class RebinFilter(BaseFilter):
         mode = params['mode']
         output[i] = resize(array[i], output_shape=new_shape, mode=mode, preserve_range=True)
 
+    @staticmethod
+    def peak_memory(images: ImageStack, rebin_param=0.5, **kwargs) -> int:
+        return full_size_bytes(_rebinned_shape(images, rebin_param), images.dtype)
+
     @staticmethod
     def register_gui(form, on_change, view):
         # Rebin by uniform factor options
@@ -146,7 +151,7 @@ class RebinFilter(BaseFilter):
         return partial(RebinFilter.filter_func, mode=mode_field.currentText(), rebin_param=params)
 
 
-def _create_reshaped_array(images, rebin_param):
+def _rebinned_shape(images, rebin_param) -> tuple[int, int, int]:
     old_shape = images.data.shape
     num_images = old_shape[0]
 
@@ -159,8 +164,11 @@ def _create_reshaped_array(images, rebin_param):
         expected_dimy = int(rebin_param * old_shape[1])
         expected_dimx = int(rebin_param * old_shape[2])
 
-    shape = (num_images, expected_dimy, expected_dimx)
-    return pu.create_array(shape, images.dtype)
+    return num_images, expected_dimy, expected_dimx
+
+
+def _create_reshaped_array(images, rebin_param):
+    return pu.create_array(_rebinned_shape(images, rebin_param), images.dtype)
 
 
 def modes():
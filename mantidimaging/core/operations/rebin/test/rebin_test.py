@@ -100,6 +100,12 @@ class RebinTest(unittest.TestCase):
         rebin_param = (100000, 100000)
         self.assertRaises(RuntimeError, RebinFilter.filter_func, images, rebin_param=rebin_param, mode=mode)
 
+    @parameterized.expand([("factor", 0.5, 10 * 5 * 5 * 4), ("shape", (20, 30), 10 * 20 * 30 * 4)])
+    def test_peak_memory_is_size_of_output(self, _, rebin_param, expected):
+        images = th.generate_images(shape=(10, 10, 10))
+
+        self.assertEqual(RebinFilter.peak_memory(images, rebin_param=rebin_param), expected)
+
     def test_execute_wrapper_return_is_runnable(self):
         """
         Test that the partial returned by execute_wrapper can be executed (kwargs are named correctly)
@@ -7,7 +7,7 @@ from typing import Any, TYPE_CHECKING
 
 import numpy as np
 from mantidimaging.core.parallel import shared as ps
-from mantidimaging.core.operations.base_filter import BaseFilter
+from mantidimaging.core.operations.base_filter import BaseFilter, ImageStage
 from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
@@ -24,6 +24,7 @@ class RescaleFilter(BaseFilter):
     When: Automatically used when saving as unsigned integer image formats, to avoid clipping negative values
     """
     filter_name = 'Rescale'
+    compact_dtypes = ("float16", )
 
     @staticmethod
     def filter_func(images: ImageStack,
@@ -42,12 +43,22 @@ class RescaleFilter(BaseFilter):
         :return: The ImageStack object scaled to a new range.
         """
 
-        params = {'min_input': min_input, 'max_input': max_input, 'max_output': max_output}
-        ps.run_compute_func(RescaleFilter.compute_function, len(images.data), [images.shared_array], params)
+        stage = RescaleFilter.image_stage(min_input, max_input, max_output)
+        ps.run_compute_func(stage.func, len(images.data), [images.shared_array], stage.params)
         return images
 
     @staticmethod
-    def compute_function(index: int, array: np.ndarray, params: dict):
+    def image_stage(min_input: float = 0.0,
+                    max_input: float = 10000.0,
+                    max_output: float = 256.0,
+                    **kwargs) -> ImageStage:
+        params = {'min_input': min_input, 'max_input': max_input, 'max_output': max_output}
+        return ImageStage(RescaleFilter.compute_function, params)
+
+    @staticmethod
+    @ps.thread_safe
+    @ps.vectorised
+    def compute_function(index: int | slice, array: np.ndarray, params: dict):
         min_input, max_input, max_output = params['min_input'], params['max_input'], params['max_output']
         array[index] = RescaleFilter.filter_array(array[index], min_input, max_input, max_output)
 
@@ -51,6 +51,13 @@ class RotateFilter(BaseFilter):
         _do_rotation(data, round(angle, 3), progress)
         return data
 
+    @staticmethod
+    def peak_memory(images: ImageStack, angle=None, **kwargs) -> int:
+        # Only rotations by 90 or 270 degrees change the shape, which needs a new array
+        if angle is None or _get_cardinal_angle(round(angle, 3) % 360) not in (90, 270):
+            return 0
+        return images.data.nbytes
+
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
@@ -0,0 +1,48 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.operations.clip_values import ClipValuesFilter
+from mantidimaging.core.operations.flat_fielding import FlatFieldFilter
+from mantidimaging.core.operations.median_filter import MedianFilter
+
+
+class PromoteCompactTest(unittest.TestCase):
+
+    def test_filter_func_promotes_stack_the_filter_can_not_run_on(self):
+        images = th.generate_images(dtype=np.uint16)
+
+        MedianFilter.filter_func(images, size=3)
+
+        self.assertEqual(images.dtype, np.float32)
+
+    def test_filter_func_keeps_stack_the_filter_can_run_on(self):
+        images = th.generate_images(dtype=np.float16)
+
+        ClipValuesFilter.filter_func(images, clip_min=0.2, clip_max=0.8)
+
+        self.assertEqual(images.dtype, np.float16)
+
+    def test_flat_fielding_raw_counts(self):
+        images, flat, dark = (th.generate_images(dtype=np.uint16) for _ in range(3))
+        images.data[:] = 26
+        flat.data[:] = 7
+        dark.data[:] = 6
+
+        FlatFieldFilter.filter_func(images, flat_before=flat, dark_before=dark, selected_flat_fielding="Only Before")
+
+        self.assertEqual(images.dtype, np.float32)
+        npt.assert_almost_equal(images.data, 20.)
+
+    def test_filter_func_keeps_its_name(self):
+        self.assertEqual(MedianFilter.filter_func.__name__, "filter_func")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -50,6 +50,11 @@ class OperationsTest(unittest.TestCase):
     def test_load_filters(self):
         self.assertGreater(len(self.filters), 10)
 
+    def test_filters_loaded_with_full_module_path(self):
+        # The process pool workers import the modules on demand when unpickling a task
+        for filter in self.filters:
+            self.assertTrue(filter.__module__.startswith("mantidimaging.core.operations."), filter.__module__)
+
     def test_operation_works_inplace(self):
         for filter in self.filters:
             filter_name = filter.filter_name
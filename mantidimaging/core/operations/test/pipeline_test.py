@@ -0,0 +1,109 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.operation_history import const
+from mantidimaging.core.operations.clip_values import ClipValuesFilter
+from mantidimaging.core.operations.crop_coords import CropCoordinatesFilter
+from mantidimaging.core.operations.flat_fielding import FlatFieldFilter
+from mantidimaging.core.operations.median_filter import MedianFilter
+from mantidimaging.core.operations.outliers import OutliersFilter
+from mantidimaging.core.operations.pipeline import fused_stage, run_pipeline
+from mantidimaging.core.operations.remove_all_stripe import RemoveAllStripesFilter
+from mantidimaging.core.operations.rescale import RescaleFilter
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
+
+CLIP = (ClipValuesFilter, {"clip_min": 0.2, "clip_max": 0.8})
+MEDIAN = (MedianFilter, {"size": 3, "mode": "reflect"})
+OUTLIERS = (OutliersFilter, {"diff": 0.1, "radius": 3, "mode": "bright"})
+RESCALE = (RescaleFilter, {"min_input": 0.0, "max_input": 1.0, "max_output": 100.0})
+CROP = (CropCoordinatesFilter, {"region_of_interest": [1, 2, 7, 6]})
+
+
+@start_multiprocessing_pool
+class PipelineTest(unittest.TestCase):
+
+    def _run_each(self, images, operations):
+        for operation, kwargs in operations:
+            operation.filter_func(images, **kwargs)
+        return images
+
+    def test_fused_operations_match_running_each_operation(self):
+        operations = [OUTLIERS, MEDIAN, CLIP, RESCALE]
+        images = th.generate_images_for_parallel(seed=3)
+        expected = self._run_each(images.copy(), operations)
+
+        with mock.patch.object(ps, "run_compute_func", wraps=ps.run_compute_func) as run_compute_func:
+            run_pipeline(images, operations)
+
+        run_compute_func.assert_called_once()
+        npt.assert_array_almost_equal(images.data, expected.data)
+
+    def test_shape_changing_operation_runs_between_fused_passes(self):
+        operations = [MEDIAN, CLIP, CROP, RESCALE, CLIP]
+        images = th.generate_images_for_parallel(seed=4)
+        expected = self._run_each(images.copy(), operations)
+
+        with mock.patch.object(CropCoordinatesFilter, "filter_func",
+                               wraps=CropCoordinatesFilter.filter_func) as crop_filter_func:
+            run_pipeline(images, operations)
+
+        crop_filter_func.assert_called_once()
+        self.assertEqual(images.data.shape, expected.data.shape)
+        npt.assert_array_almost_equal(images.data, expected.data)
+
+    def test_each_operation_recorded_in_history(self):
+        operations = [MEDIAN, CROP, CLIP, RESCALE]
+        images = th.generate_images()
+
+        run_pipeline(images, operations)
+
+        history = images.metadata[const.OPERATION_HISTORY]
+        self.assertEqual([op[const.OPERATION_NAME] for op in history],
+                         ["MedianFilter", "CropCoordinatesFilter", "ClipValuesFilter", "RescaleFilter"])
+        self.assertEqual(history[3][const.OPERATION_KEYWORD_ARGS], RESCALE[1])
+
+    def test_invalid_arguments_raise_before_stack_changed(self):
+        images = th.generate_images()
+        original = images.data.copy()
+
+        with self.assertRaises(ValueError):
+            run_pipeline(images, [CLIP, (MedianFilter, {"size": 1})])
+
+        npt.assert_array_equal(images.data, original)
+        self.assertNotIn(const.OPERATION_HISTORY, images.metadata)
+
+    def test_flat_field_after_crop_reports_shape_mismatch(self):
+        images, flat, dark = (th.generate_images() for _ in range(3))
+        flat_field = (FlatFieldFilter, {
+            "flat_before": flat,
+            "dark_before": dark,
+            "selected_flat_fielding": "Only Before"
+        })
+
+        with self.assertRaisesRegex(ValueError, "Not all images are the expected shape"):
+            run_pipeline(images, [CROP, flat_field, CLIP])
+
+    def test_compact_stack_promoted_before_fused_pass(self):
+        images = th.generate_images(dtype=np.float16)
+
+        run_pipeline(images, [CLIP, MEDIAN])
+
+        self.assertEqual(images.dtype, np.float32)
+
+    def test_sinogram_and_shape_changing_operations_not_fused(self):
+        self.assertIsNone(fused_stage(RemoveAllStripesFilter, {}))
+        self.assertIsNone(fused_stage(*CROP))
+        self.assertIsNotNone(fused_stage(*MEDIAN))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, TYPE_CHECKING
+from collections.abc import Iterable, Iterator
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+    from mantidimaging.core.parallel.utility import SharedArray
+
+LOG = getLogger(__name__)
+
+_PARALLEL_DIR = os.path.dirname(__file__)
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """
+    Raised when an allocation or reservation would take the shared memory in use over the budget.
+    """
+
+
+@dataclass
+class Allocation:
+    nbytes: int
+    # Where the allocation was requested from, as "file:line in function"
+    created: str
+    owner: weakref.ref | None = None
+
+    @property
+    def owner_name(self) -> str:
+        owner = self.owner() if self.owner is not None else None
+        return getattr(owner, "name", "unowned") if owner is not None else "unowned"
+
+
+@dataclass
+class _Reservation:
+    nbytes: int
+    used: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.nbytes - self.used)
+
+
+class SharedMemoryAccountant:
+    """
+    Keeps track of every SharedArray allocated in shared memory, with its size, owner and where it was created.
+
+    If a budget is set, allocations that would take the memory in use over it are refused. Operations can reserve their
+    projected peak memory up front with reserve(), so that they are refused, or wait for memory to be released, before
+    starting rather than failing part way through. Allocations made by the thread holding a reservation are taken from
+    it.
+    """
+
+    def __init__(self, budget: int | None = None):
+        self.budget = budget
+        self._condition = threading.Condition()
+        self._allocations: dict[int, Allocation] = {}
+        self._reservations: dict[int, _Reservation] = {}
+
+    def register(self, shared_array: SharedArray, nbytes: int) -> None:
+        """
+        Record a new allocation, raising MemoryBudgetExceeded if it does not fit in the budget.
+        """
+        with self._condition:
+            reservation = self._reservations.get(threading.get_ident())
+            from_reservation = min(nbytes, reservation.remaining) if reservation is not None else 0
+            self._check_fits(nbytes - from_reservation, f"allocate {nbytes} bytes")
+            if reservation is not None:
+                reservation.used += nbytes
+            self._allocations[id(shared_array)] = Allocation(nbytes, _creation_site())
+
+    def unregister(self, shared_array: SharedArray) -> None:
+        with self._condition:
+            if self._allocations.pop(id(shared_array), None) is not None:
+                self._condition.notify_all()
+
+    def set_owner(self, shared_array: SharedArray, owner: Any) -> None:
+        """
+        Record the object, usually an ImageStack, that the allocation belongs to.
+        """
+        with self._condition:
+            allocation = self._allocations.get(id(shared_array))
+            if allocation is not None:
+                allocation.owner = weakref.ref(owner)
+
+    @contextmanager
+    def reserve(self, nbytes: int, timeout: float = 0) -> Iterator[None]:
+        """
+        Reserve memory for the projected peak of an operation run in this thread.
+
+        :param nbytes: Bytes of shared memory the operation will allocate
+        :param timeout: Seconds to wait for memory to be released if the reservation does not fit in the budget,
+                        before raising MemoryBudgetExceeded
+        """
+        thread_id = threading.get_ident()
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if thread_id in self._reservations:
+                raise RuntimeError("This thread already has a memory reservation")
+            while not self._fits(nbytes):
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 0:
+                    self._check_fits(nbytes, f"reserve {nbytes} bytes")
+                LOG.info(f"Waiting for shared memory to reserve {nbytes} bytes")
+                self._condition.wait(remaining_time)
+            self._reservations[thread_id] = _Reservation(nbytes)
+        try:
+            yield
+        finally:
+            with self._condition:
+                del self._reservations[thread_id]
+                self._condition.notify_all()
+
+    @property
+    def allocated_bytes(self) -> int:
+        with self._condition:
+            return sum(allocation.nbytes for allocation in self._allocations.values())
+
+    def allocations(self) -> list[Allocation]:
+        with self._condition:
+            return list(self._allocations.values())
+
+    def usage_of(self, owners: Iterable[Any]) -> int:
+        """
+        Bytes of shared memory used by the given owners, e.g. the stacks of a dataset.
+        """
+        owner_ids = {id(owner) for owner in owners}
+        with self._condition:
+            return sum(allocation.nbytes for allocation in self._allocations.values()
+                       if allocation.owner is not None and id(allocation.owner()) in owner_ids)
+
+    def usage_by_owner(self) -> dict[str, int]:
+        usage: dict[str, int] = {}
+        for allocation in self.allocations():
+            usage[allocation.owner_name] = usage.get(allocation.owner_name, 0) + allocation.nbytes
+        return usage
+
+    def report(self) -> str:
+        summary = f"Shared memory in use: {self.allocated_bytes / 1024**2:.1f} MB"
+        if self.budget is not None:
+            summary += f" of {self.budget / 1024**2:.1f} MB budget"
+        lines = [summary]
+        for allocation in sorted(self.allocations(), key=lambda a: a.nbytes, reverse=True):
+            lines.append(f"  {allocation.nbytes / 1024**2:.1f} MB {allocation.owner_name} from {allocation.created}")
+        return "\n".join(lines)
+
+    def _committed_bytes(self) -> int:
+        allocated = sum(allocation.nbytes for allocation in self._allocations.values())
+        return allocated + sum(reservation.remaining for reservation in self._reservations.values())
+
+    def _fits(self, nbytes: int) -> bool:
+        return self.budget is None or self._committed_bytes() + nbytes <= self.budget
+
+    def _check_fits(self, nbytes: int, action: str) -> None:
+        if not self._fits(nbytes):
+            assert self.budget is not None
+            LOG.info(f"Refused to {action}\n{self.report()}")
+            raise MemoryBudgetExceeded(f"Not enough shared memory to {action}. "
+                                       f"{self._committed_bytes() / 1024**2:.1f} MB of the "
+                                       f"{self.budget / 1024**2:.1f} MB budget is in use or reserved.")
+
+
+def _creation_site() -> str:
+    """
+    Find the first frame outside of the parallel package, which is where the allocation was requested from.
+    """
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None and os.path.dirname(frame.f_code.co_filename) == _PARALLEL_DIR:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+accountant = SharedMemoryAccountant()
@@ -0,0 +1,167 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import atexit
+import math
+import mmap
+import sys
+import threading
+from collections import OrderedDict
+from logging import getLogger
+from multiprocessing import shared_memory
+from typing import NamedTuple, TYPE_CHECKING
+
+import numpy as np
+
+from mantidimaging.core.utility.memory_usage import system_free_memory
+from mantidimaging.core.parallel import manager as pm
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+LOG = getLogger(__name__)
+
+# Segment sizes are rounded up to one of this many size classes per doubling, so that stacks with similar sizes can
+# reuse each other's segments. Pages of the unused tail of a segment are never touched, so do not use any memory.
+SIZE_CLASSES_PER_OCTAVE = 4
+# The most memory that released segments are allowed to hold, as a fraction of the memory that would be free if they
+# were unlinked
+MAX_FREE_MEMORY_FRACTION = 0.25
+
+
+def size_class(size: int) -> int:
+    """
+    The capacity of the segment used for an allocation of size bytes, a whole number of pages.
+    """
+    if size <= mmap.PAGESIZE:
+        return mmap.PAGESIZE
+    capacity = math.ceil(2**(math.ceil(math.log2(size) * SIZE_CLASSES_PER_OCTAVE) / SIZE_CLASSES_PER_OCTAVE))
+    return math.ceil(capacity / mmap.PAGESIZE) * mmap.PAGESIZE
+
+
+class ArenaStats(NamedTuple):
+    hits: int
+    misses: int
+    cached_segments: int
+    cached_bytes: int
+
+
+class _Segment(NamedTuple):
+    capacity: int
+    # The reference count of the segment's mmap when no arrays are using it
+    free_refcount: int
+
+
+class SharedMemoryArena:
+    """
+    Recycles shared memory segments between allocations.
+
+    Creating a segment costs several system calls, and every page faults in the first time it is written. Released
+    segments are kept, and handed back out for later allocations in the same size class after being zeroed.
+
+    A segment is only kept if no arrays still reference its memory, which is checked using the reference count of its
+    mmap. Released segments are unlinked, oldest first, when they hold more than max_free_memory_fraction of the
+    memory that would be free without them.
+    """
+
+    def __init__(self, max_free_memory_fraction: float = MAX_FREE_MEMORY_FRACTION):
+        self.max_free_memory_fraction = max_free_memory_fraction
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._segments: dict[str, _Segment] = {}
+        # Released segments in the order they were released
+        self._free: OrderedDict[str, SharedMemory] = OrderedDict()
+
+    def allocate(self, size: int) -> SharedMemory:
+        """
+        Get a zeroed segment of at least size bytes, reusing a released segment if there is one.
+        """
+        if size <= 0:
+            # Match the error from creating an empty SharedMemory
+            raise ValueError("'size' must be a positive number different from zero")
+        capacity = size_class(size)
+        with self._lock:
+            # The most recently released segment is the most likely to still be in the CPU caches
+            for name in reversed(self._free):
+                if self._segments[name].capacity == capacity:
+                    mem = self._free.pop(name)
+                    self.hits += 1
+                    break
+            else:
+                mem = None
+                self.misses += 1
+
+        if mem is not None:
+            np.ndarray((size, ), dtype=np.uint8, buffer=mem.buf).fill(0)
+            return mem
+
+        mem = shared_memory.SharedMemory(name=pm.generate_mi_shared_mem_name(), create=True, size=capacity)
+        with self._lock:
+            self._segments[mem.name] = _Segment(capacity, sys.getrefcount(mem._mmap))  # type: ignore[attr-defined]
+        return mem
+
+    def release(self, mem: SharedMemory) -> bool:
+        """
+        Keep a segment for reuse.
+
+        :return: False if the segment was not allocated by the arena, or arrays still use it. It must then be closed
+                 and unlinked by the caller.
+        """
+        with self._lock:
+            segment = self._segments.get(mem.name)
+            if segment is None:
+                return False
+            if sys.getrefcount(mem._mmap) != segment.free_refcount:  # type: ignore[attr-defined]
+                del self._segments[mem.name]
+                return False
+            self._free[mem.name] = mem
+        self.trim()
+        return True
+
+    def trim(self, free_memory: float | None = None) -> None:
+        """
+        Unlink released segments, oldest first, until they are within max_free_memory_fraction of the free memory.
+
+        :param free_memory: Free memory in bytes, read from the system if not given
+        """
+        if free_memory is None:
+            free_memory = system_free_memory().kb() * 1024
+        with self._lock:
+            cached_bytes = self._cached_bytes()
+            limit = self.max_free_memory_fraction * max(0.0, free_memory + cached_bytes)
+            while self._free and cached_bytes > limit:
+                name, mem = self._free.popitem(last=False)
+                cached_bytes -= self._segments.pop(name).capacity
+                _free_segment(mem)
+
+    def clear(self) -> None:
+        """
+        Unlink all the released segments.
+        """
+        with self._lock:
+            while self._free:
+                name, mem = self._free.popitem()
+                del self._segments[name]
+                _free_segment(mem)
+
+    def stats(self) -> ArenaStats:
+        with self._lock:
+            return ArenaStats(self.hits, self.misses, len(self._free), self._cached_bytes())
+
+    def _cached_bytes(self) -> int:
+        return sum(self._segments[name].capacity for name in self._free)
+
+
+def _free_segment(mem: SharedMemory) -> None:
+    mem.close()
+    try:
+        mem.unlink()
+    except FileNotFoundError:
+        # Do nothing, memory has already been freed
+        pass
+
+
+arena = SharedMemoryArena()
+atexit.register(arena.clear)
@@ -2,30 +2,42 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import get_context
 import os
 import uuid
+from functools import partial
 from logging import getLogger
 from typing import TYPE_CHECKING
 
 import psutil
 from psutil import NoSuchProcess, AccessDenied
 
-from mantidimaging.core.operations.loader import load_filter_packages
-
 if TYPE_CHECKING:
     from multiprocessing.pool import Pool
+    from multiprocessing.synchronize import Event
 
 MEM_PREFIX = 'MI'
 MEM_DIR_LINUX = '/dev/shm'
 CURRENT_PID = psutil.Process().pid
 
+# The same as the ThreadPoolExecutor default, which is intended for IO bound work
+IO_THREADS = min(32, (os.cpu_count() or 1) + 4)
+
 LOG = getLogger(__name__)
 perf_logger = getLogger("perf." + __name__)
 
 cores: int = 1
 pool: Pool | None = None
+thread_pool: ThreadPoolExecutor | None = None
+io_thread_pool: ThreadPoolExecutor | None = None
+# Set when an operation is cancelled, tasks check it between slices and stop early
+cancel_event: threading.Event | Event = threading.Event()
+# Directory on local disk for stacks that do not fit in memory, which are then backed by memory mapped files. Stacks are
+# only kept in memory if this is None.
+scratch_dir: str | None = None
 
 
 def create_and_start_pool(process_count: int) -> None:
@@ -36,23 +48,81 @@ def create_and_start_pool(process_count: int) -> None:
         cores = context.cpu_count()
     else:
         cores = process_count
-    global pool
+    global pool, cancel_event
     LOG.info(f'Creating process pool with {cores} processes')
-    pool = context.Pool(cores, initializer=worker_setup)
+    cancel_event = context.Event()
+    pool = context.Pool(cores, initializer=worker_setup, initargs=(cancel_event, ))
 
     if perf_logger.isEnabledFor(1):
         perf_logger.info(f"Process pool started in {time.monotonic() - t0}")
 
+    # The workers start in the background, so the GUI can carry on starting up while they import the parallel modules
+    pool.map_async(_warm_up_worker, range(cores), chunksize=1, callback=partial(_report_warm_up, t0))
+
+
+def worker_setup(event: Event) -> None:
+    global cancel_event
+    cancel_event = event
+    # Only the modules needed to receive tasks are imported up front. Operation modules are imported on demand when a
+    # task that uses them is unpickled.
+    import mantidimaging.core.parallel.shared  # noqa: F401
+    from mantidimaging.core.parallel.utility import start_segment_eviction
+    start_segment_eviction()
+
+
+def _warm_up_worker(_) -> tuple[int, int]:
+    """
+    Runs in a worker process once it is ready for tasks. Returns its pid and resident memory in bytes.
+    """
+    process = psutil.Process()
+    return process.pid, process.memory_info().rss
+
+
+def _report_warm_up(start_time: float, results: list[tuple[int, int]]) -> None:
+    if perf_logger.isEnabledFor(1):
+        # A worker may have run more than one of the warm up tasks, so only count each process once
+        worker_rss = dict(results)
+        mean_rss_mb = sum(worker_rss.values()) / len(worker_rss) / 1024**2
+        perf_logger.info(f"Process pool warmed up in {time.monotonic() - start_time}, "
+                         f"{len(worker_rss)} workers reported using {mean_rss_mb:.1f} MB each")
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    Get the thread pool used for operations that release the GIL, creating it on first use.
+    """
+    global thread_pool
+    if thread_pool is None:
+        LOG.info(f'Creating thread pool with {cores} threads')
+        thread_pool = ThreadPoolExecutor(cores, thread_name_prefix="mantidimaging_compute")
+    return thread_pool
+
+
+def get_io_thread_pool() -> ThreadPoolExecutor:
+    """
+    Get the thread pool used for reading and writing files, creating it on first use.
 
-def worker_setup():
-    # Required to import modules for running operations
-    load_filter_packages()
+    File access is bound by the latency of each file, so this has IO_THREADS threads, more than there are cores.
+    """
+    global io_thread_pool
+    if io_thread_pool is None:
+        LOG.info(f'Creating IO thread pool with {IO_THREADS} threads')
+        io_thread_pool = ThreadPoolExecutor(IO_THREADS, thread_name_prefix="mantidimaging_io")
+    return io_thread_pool
 
 
 def end_pool():
     if pool:
         pool.close()
         pool.terminate()
+    global thread_pool
+    if thread_pool:
+        thread_pool.shutdown(cancel_futures=True)
+        thread_pool = None
+    global io_thread_pool
+    if io_thread_pool:
+        io_thread_pool.shutdown(cancel_futures=True)
+        io_thread_pool = None
 
 
 def generate_mi_shared_mem_name() -> str:
@@ -2,15 +2,23 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import time
 from functools import partial
 from typing import Any, TYPE_CHECKING
 from collections.abc import Callable
 
+import numpy as np
+
+from mantidimaging.core.parallel import manager as pm
 from mantidimaging.core.parallel import utility as pu
 
 if TYPE_CHECKING:
     from numpy import ndarray
 
+# Compact dtypes that stacks are stored with to save memory. Compute functions on a single array of one of these are
+# given a float32 copy of the slices of each task, which is stored back into the array after the function has run.
+SCRATCH_DTYPES = (np.dtype(np.float16), )
+
 
 def inplace3(func, data: list[pu.SharedArray] | list[pu.SharedArrayProxy], i, **kwargs):
     func(data[0].array[i], data[1].array[i], data[2].array, **kwargs)
@@ -81,6 +89,29 @@ ComputeFuncType = (Callable[[int, list['ndarray'], dict[str, Any]], None]
                    | Callable[[int, 'ndarray', dict[str, Any]], None])
 
 
+def vectorised(func: ComputeFuncType) -> ComputeFuncType:
+    """
+    Mark a compute function as able to process a contiguous block of slices in a single call.
+
+    The index is then passed as a slice object, so that ``array[index]`` gives ``array[start:stop]``. This should only
+    be used for functions that treat every slice independently, e.g. element-wise arithmetic.
+    """
+    func.vectorised = True  # type: ignore[union-attr]
+    return func
+
+
+def thread_safe(func: ComputeFuncType) -> ComputeFuncType:
+    """
+    Mark a compute function as safe to run on the thread pool.
+
+    The function must spend most of its time in code that releases the GIL, e.g. NumPy ufuncs or scipy.ndimage
+    filters, and must only write to its own slices. The arrays are then used in process without any pickling, and
+    do not need to be in shared memory to be processed in parallel.
+    """
+    func.thread_safe = True  # type: ignore[union-attr]
+    return func
+
+
 class _Worker:
 
     def __init__(self, func: ComputeFuncType, arrays: list[pu.SharedArray] | list[pu.SharedArrayProxy],
@@ -89,11 +120,36 @@ class _Worker:
         self.arrays = arrays
         self.params = params
 
-    def __call__(self, index: int):
+    def __call__(self, indices: range) -> pu.TaskResult:
+        t0 = time.perf_counter()
+        if pm.cancel_event.is_set():
+            return pu.TaskResult(indices[:0], 0.0)
+
         ndarrays = [sa.array for sa in self.arrays]
-        if len(ndarrays) == 1:
-            ndarrays = ndarrays[0]  # type: ignore[assignment]
-        self.func(index, ndarrays, self.params)  # type: ignore[arg-type]
+        if len(ndarrays) == 1 and ndarrays[0].dtype in SCRATCH_DTYPES:
+            array = ndarrays[0]
+            scratch = array[indices.start:indices.stop].astype(np.float32)
+            processed = self._run(indices, scratch, indices.start)
+            array[processed.start:processed.stop] = scratch[:len(processed)]
+        else:
+            processed = self._run(indices, ndarrays[0] if len(ndarrays) == 1 else ndarrays, 0)
+        return pu.TaskResult(processed, time.perf_counter() - t0)
+
+    def _run(self, indices: range, arrays: ndarray | list[ndarray], offset: int) -> range:
+        """
+        Calls the function for each of the indices, which are shifted by offset into the arrays.
+
+        :return: The indices that were processed before any cancellation
+        """
+        if getattr(self.func, "vectorised", False):
+            block = slice(indices.start - offset, indices.stop - offset)
+            self.func(block, arrays, self.params)  # type: ignore[arg-type]
+            return indices
+        for count, index in enumerate(indices):
+            if pm.cancel_event.is_set():
+                return indices[:count]
+            self.func(index - offset, arrays, self.params)  # type: ignore[arg-type]
+        return indices
 
 
 def run_compute_func(func: ComputeFuncType,
@@ -103,6 +159,11 @@ def run_compute_func(func: ComputeFuncType,
                      progress=None):
     if isinstance(arrays, pu.SharedArray):
         arrays = [arrays]
+    if getattr(func, "thread_safe", False):
+        # Threads share the arrays with this process, so there is no need to go through a SharedArrayProxy
+        worker_func = _Worker(func, arrays, params)
+        pu.run_compute_func_impl(worker_func, num_operations, False, progress, thread_safe=True)
+        return
     all_data_in_shared_memory, data = _check_shared_mem_and_get_data(arrays)
     worker_func = _Worker(func, data, params)
     pu.run_compute_func_impl(worker_func, num_operations, all_data_in_shared_memory, progress)
@@ -0,0 +1,119 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.data.dataset import MixedDataset
+from mantidimaging.core.parallel.accountant import SharedMemoryAccountant, MemoryBudgetExceeded
+from mantidimaging.core.parallel.utility import create_array
+
+ARRAY_BYTES = 10 * 20 * 4
+
+
+@pytest.fixture
+def test_accountant():
+    test_accountant = SharedMemoryAccountant()
+    with mock.patch('mantidimaging.core.parallel.utility.accountant', test_accountant), \
+            mock.patch('mantidimaging.core.data.imagestack.accountant', test_accountant), \
+            mock.patch('mantidimaging.core.data.dataset.accountant', test_accountant):
+        yield test_accountant
+
+
+def test_allocation_is_registered_until_freed(test_accountant):
+    shared_array = create_array((10, 20), np.float32)
+    assert test_accountant.allocated_bytes == ARRAY_BYTES
+
+    del shared_array
+
+    assert test_accountant.allocated_bytes == 0
+
+
+def test_allocation_records_creation_site(test_accountant):
+    shared_array = create_array((10, 20), np.float32)
+
+    [allocation] = test_accountant.allocations()
+
+    assert allocation.created.startswith("accountant_test.py:")
+    assert allocation.created.endswith("in test_allocation_records_creation_site")
+    del shared_array
+
+
+def test_allocation_over_budget_is_refused(test_accountant):
+    test_accountant.budget = ARRAY_BYTES
+    shared_array = create_array((10, 20), np.float32)
+
+    with pytest.raises(MemoryBudgetExceeded):
+        create_array((10, 20), np.float32)
+    assert test_accountant.allocated_bytes == ARRAY_BYTES
+    del shared_array
+
+
+def test_reservation_over_budget_is_refused(test_accountant):
+    test_accountant.budget = ARRAY_BYTES
+    shared_array = create_array((10, 20), np.float32)
+
+    with pytest.raises(MemoryBudgetExceeded), test_accountant.reserve(1):
+        pass
+    del shared_array
+
+
+def test_reservation_waits_for_memory_to_be_freed(test_accountant):
+    test_accountant.budget = ARRAY_BYTES
+    arrays = [create_array((10, 20), np.float32)]
+
+    def free_array():
+        time.sleep(0.05)
+        arrays.clear()
+
+    thread = threading.Thread(target=free_array)
+    thread.start()
+    with test_accountant.reserve(ARRAY_BYTES, timeout=5):
+        assert test_accountant.allocated_bytes == 0
+    thread.join()
+
+
+def test_allocations_are_taken_from_reservation(test_accountant):
+    test_accountant.budget = 2 * ARRAY_BYTES
+
+    with test_accountant.reserve(2 * ARRAY_BYTES):
+        arrays = [create_array((10, 20), np.float32) for _ in range(2)]
+        assert test_accountant.allocated_bytes == 2 * ARRAY_BYTES
+        with pytest.raises(MemoryBudgetExceeded):
+            create_array((10, 20), np.float32)
+    del arrays
+
+
+def test_reservation_is_held_from_other_allocations(test_accountant):
+    test_accountant.budget = ARRAY_BYTES
+    errors = []
+
+    def allocate():
+        try:
+            create_array((10, 20), np.float32)
+        except MemoryBudgetExceeded as e:
+            errors.append(e)
+
+    with test_accountant.reserve(ARRAY_BYTES):
+        thread = threading.Thread(target=allocate)
+        thread.start()
+        thread.join()
+
+    assert len(errors) == 1
+
+
+def test_usage_by_owner(test_accountant):
+    images = ImageStack(create_array((10, 20), np.float32), name="Sample")
+    dataset = MixedDataset(stacks=[images])
+    unowned_array = create_array((10, 20), np.float32)
+
+    assert test_accountant.usage_by_owner() == {"Sample": ARRAY_BYTES, "unowned": ARRAY_BYTES}
+    assert dataset.shared_memory_usage == ARRAY_BYTES
+    assert "Sample from accountant_test.py" in test_accountant.report()
+    del unowned_array
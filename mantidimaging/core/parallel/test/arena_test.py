@@ -0,0 +1,112 @@
+# Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import mmap
+import os
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel.arena import SharedMemoryArena, size_class, ArenaStats
+from mantidimaging.core.parallel.utility import _create_shared_array
+
+LARGE_FREE_MEMORY = 1024**4
+
+
+@pytest.fixture
+def test_arena():
+    test_arena = SharedMemoryArena()
+    with mock.patch('mantidimaging.core.parallel.utility.arena', test_arena), \
+            mock.patch('mantidimaging.core.parallel.arena.system_free_memory') as mock_free_memory:
+        mock_free_memory.return_value.kb.return_value = LARGE_FREE_MEMORY / 1024
+        yield test_arena
+        test_arena.clear()
+
+
+@pytest.mark.parametrize('size,expected', [
+    [1, mmap.PAGESIZE],
+    [mmap.PAGESIZE, mmap.PAGESIZE],
+    [2**20, 2**20],
+    [2**20 + 1, 1249280],
+])
+def test_size_class(size, expected):
+    assert size_class(size) == expected
+
+
+def test_size_class_is_at_most_a_fifth_larger():
+    for size in np.linspace(10**6, 10**9, 50, dtype=int):
+        assert size <= size_class(size) <= size * 1.2
+
+
+def test_empty_allocation_raises(test_arena):
+    with pytest.raises(ValueError):
+        test_arena.allocate(0)
+
+
+def test_released_segment_is_reused(test_arena):
+    shared_array = _create_shared_array((10, 20), np.float32)
+    mem_name = shared_array._shared_memory.name
+    del shared_array
+
+    reused_array = _create_shared_array((10, 20), np.float32)
+
+    assert reused_array._shared_memory.name == mem_name
+    assert test_arena.stats() == ArenaStats(hits=1, misses=1, cached_segments=0, cached_bytes=0)
+
+
+def test_reused_segment_is_zeroed(test_arena):
+    shared_array = _create_shared_array((10, 20), np.float32)
+    shared_array.array[:] = 5
+    del shared_array
+
+    reused_array = _create_shared_array((20, 10), np.float32)
+
+    np.testing.assert_equal(reused_array.array, 0)
+
+
+def test_different_size_class_is_not_reused(test_arena):
+    shared_array = _create_shared_array((100, 100), np.float32)
+    mem_name = shared_array._shared_memory.name
+    del shared_array
+
+    other_array = _create_shared_array((200, 100), np.float32)
+
+    assert other_array._shared_memory.name != mem_name
+    assert test_arena.stats().cached_segments == 1
+
+
+def test_segment_with_view_in_use_is_freed_not_reused(test_arena):
+    shared_array = _create_shared_array((10, 20), np.float32)
+    mem_name = shared_array._shared_memory.name
+    view = shared_array.array[2:4]
+    del shared_array
+
+    assert test_arena.stats().cached_segments == 0
+    assert not os.path.exists(f'{pm.MEM_DIR_LINUX}/{mem_name}')
+    del view
+
+
+def test_trim_frees_oldest_segments_first(test_arena):
+    arrays = [_create_shared_array((i + 1, 1024), np.uint8) for i in range(3)]
+    mem_names = [shared_array._shared_memory.name for shared_array in arrays]
+    while arrays:
+        del arrays[0]
+
+    test_arena.trim(free_memory=4 * mmap.PAGESIZE)
+
+    assert test_arena.stats().cached_segments == 1
+    assert [os.path.exists(f'{pm.MEM_DIR_LINUX}/{name}') for name in mem_names] == [False, False, True]
+
+
+def test_clear_frees_all_segments(test_arena):
+    shared_array = _create_shared_array((10, 20), np.float32)
+    mem_name = shared_array._shared_memory.name
+    del shared_array
+
+    test_arena.clear()
+
+    assert test_arena.stats().cached_segments == 0
+    assert not os.path.exists(f'{pm.MEM_DIR_LINUX}/{mem_name}')
@@ -2,7 +2,7 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, Mock
 
 import psutil
 from psutil import NoSuchProcess, AccessDenied
@@ -59,3 +59,15 @@ class ParallelManagerTest(unittest.TestCase):
         _mock_getmtime.return_value = psutil.Process().create_time() - 3600
 
         self.assertEqual(files_to_remove, pm.find_memory_from_previous_process_linux())
+
+    @patch('mantidimaging.core.parallel.manager.time.monotonic', return_value=12.0)
+    def test_report_warm_up_counts_each_worker_once(self, _):
+        with patch('mantidimaging.core.parallel.manager.perf_logger', Mock()) as mock_perf_logger:
+            pm._report_warm_up(10.0, [(1, 100 * 1024**2), (2, 300 * 1024**2), (1, 100 * 1024**2)])
+            mock_perf_logger.info.assert_called_once_with(
+                "Process pool warmed up in 2.0, 2 workers reported using 200.0 MB each")
+
+    def test_warm_up_worker_reports_own_process(self):
+        pid, rss = pm._warm_up_worker(0)
+        self.assertEqual(psutil.Process().pid, pid)
+        self.assertGreater(rss, 0)
@@ -4,8 +4,10 @@ from __future__ import annotations
 import unittest
 from unittest import mock
 
+import numpy as np
+
 from mantidimaging.core.parallel import shared as ps
-from mantidimaging.core.parallel.utility import SharedArrayProxy
+from mantidimaging.core.parallel.utility import SharedArray, SharedArrayProxy
 
 
 class SharedTest(unittest.TestCase):
@@ -31,6 +33,90 @@ class SharedTest(unittest.TestCase):
         self.assertTrue(len(data) == 5)
         self.assertTrue(isinstance(data[0], mock.Mock))
 
+    def test_worker_calls_func_for_each_index_in_range(self):
+        calls = []
+
+        def record_index(index, array, params):
+            calls.append((index, array, params))
+
+        array = SharedArray(np.zeros((5, 2, 2)), None)
+        worker = ps._Worker(record_index, [array], {"a": 1})
+
+        worker(range(1, 4))
+
+        self.assertEqual([index for index, _, _ in calls], [1, 2, 3])
+        self.assertIs(calls[0][1], array.array)
+        self.assertEqual(calls[0][2], {"a": 1})
+
+    def test_worker_calls_vectorised_func_once_with_slice(self):
+
+        @ps.vectorised
+        def add_one(index, array, params):
+            array[index] += 1
+
+        array = SharedArray(np.zeros((5, 2, 2)), None)
+        worker = ps._Worker(add_one, [array], {})
+
+        worker(range(1, 4))
+
+        np.testing.assert_equal(array.array[:, 0, 0], [0, 1, 1, 1, 0])
+
+    def test_worker_processes_float16_array_in_float32(self):
+        dtypes = []
+
+        def add_third(index, array, params):
+            dtypes.append(array.dtype)
+            array[index] += 1 / 3
+
+        array = SharedArray(np.zeros((5, 2, 2), dtype=np.float16), None)
+        worker = ps._Worker(add_third, [array], {})
+
+        worker(range(1, 4))
+
+        self.assertEqual(dtypes, [np.float32] * 3)
+        self.assertEqual(array.array.dtype, np.float16)
+        np.testing.assert_equal(array.array[:, 0, 0], np.array([0, 1 / 3, 1 / 3, 1 / 3, 0], dtype=np.float16))
+
+    def test_worker_passes_vectorised_func_slice_of_float32_copy(self):
+
+        @ps.vectorised
+        def record_slice(index, array, params):
+            self.assertEqual(index, slice(0, 3))
+            self.assertEqual(array.shape, (3, 2, 2))
+            array[index] = 2
+
+        array = SharedArray(np.zeros((5, 2, 2), dtype=np.float16), None)
+        worker = ps._Worker(record_slice, [array], {})
+
+        worker(range(1, 4))
+
+        np.testing.assert_equal(array.array[:, 0, 0], [0, 2, 2, 2, 0])
+
+    @mock.patch('mantidimaging.core.parallel.shared.pm.cancel_event')
+    def test_worker_does_not_call_func_when_cancelled(self, mock_cancel_event):
+        mock_cancel_event.is_set.return_value = True
+        mock_func = mock.Mock()
+        worker = ps._Worker(mock_func, [SharedArray(np.zeros((5, 2, 2)), None)], {})
+
+        result = worker(range(1, 4))
+
+        mock_func.assert_not_called()
+        self.assertEqual(len(result.processed), 0)
+
+    @mock.patch('mantidimaging.core.parallel.shared.pu.run_compute_func_impl')
+    def test_run_compute_func_passes_arrays_directly_when_thread_safe(self, mock_run_compute_func_impl):
+
+        @ps.thread_safe
+        def add_one(index, array, params):
+            array[index] += 1
+
+        array = mock.Mock(spec=SharedArray)
+        ps.run_compute_func(add_one, 5, array, {})
+
+        worker_func = mock_run_compute_func_impl.call_args.args[0]
+        self.assertEqual(worker_func.arrays, [array])
+        self.assertTrue(mock_run_compute_func_impl.call_args.kwargs["thread_safe"])
+
     def _create_array_list(self, num_arrays, has_shared_mem):
         array_list = []
         for _ in range(num_arrays):
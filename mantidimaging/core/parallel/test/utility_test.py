@@ -2,6 +2,10 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
+import pickle
+import time
+
 import numpy as np
 from unittest import mock
 
@@ -10,7 +14,20 @@ import numpy.testing as npt
 
 from mantidimaging.test_helpers import unit_test_helper as th
 from mantidimaging.core.parallel.utility import _create_shared_array, execute_impl, multiprocessing_necessary,\
-    copy_into_shared_memory
+    copy_into_shared_memory, calculate_chunksize, split_into_ranges, run_compute_func_impl, SharedMemoryRegistry,\
+    threading_necessary, TaskResult, OperationCancelled, _IndexLoop, create_memmap_array, create_array,\
+    MemmapSharedArray
+from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel.arena import arena
+from mantidimaging.core.utility.progress_reporting import Progress
+
+
+def _fake_imap(func, iterable, **kwargs):
+    return [func(task) for task in iterable]
+
+
+def _lazy_imap(func, iterable, **kwargs):
+    return (func(task) for task in iterable)
 
 
 @pytest.mark.parametrize(
@@ -37,10 +54,132 @@ def test_execute_impl_seq():
 def test_execute_impl_par(mock_pool):
     mock_partial = mock.Mock()
     mock_progress = mock.Mock()
-    mock_pool.imap.return_value = range(15)
+    mock_pool.imap.side_effect = _fake_imap
     execute_impl(15, mock_partial, True, mock_progress, "Test")
-    mock_pool.imap.assert_called_once()
-    assert mock_progress.update.call_count == 15
+    assert mock_partial.call_args_list == [mock.call(i) for i in range(15)]
+    assert sum(call.args[0] for call in mock_progress.update.call_args_list) == 15
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.cores', 2)
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+def test_run_compute_func_impl_par_sends_ranges(mock_pool):
+    mock_progress = mock.Mock()
+    mock_pool.imap.side_effect = _fake_imap
+    processed = []
+
+    def worker_func(indices: range) -> TaskResult:
+        processed.extend(indices)
+        return TaskResult(indices, 1e-6)
+
+    run_compute_func_impl(worker_func, 100, True, mock_progress, "Test")
+
+    assert processed == list(range(100))
+    # a probe task for each core, then batches sized from the measured time
+    probe_tasks, batched_tasks = (call.args[1] for call in mock_pool.imap.call_args_list)
+    assert probe_tasks == [range(0, 1), range(1, 2)]
+    assert all(len(task) == 12 for task in batched_tasks[:-1])
+    assert sum(call.args[0] for call in mock_progress.update.call_args_list) == 100
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.cores', 2)
+@mock.patch('mantidimaging.core.parallel.utility.pm.get_thread_pool')
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+def test_run_compute_func_impl_thread_safe_uses_thread_pool(mock_pool, mock_get_thread_pool):
+    mock_progress = mock.Mock()
+    mock_get_thread_pool.return_value.map.side_effect = _fake_imap
+    processed = []
+
+    def worker_func(indices: range) -> TaskResult:
+        processed.extend(indices)
+        return TaskResult(indices, 1e-6)
+
+    run_compute_func_impl(worker_func, 100, False, mock_progress, "Test", thread_safe=True)
+
+    assert processed == list(range(100))
+    mock_pool.imap.assert_not_called()
+    assert sum(call.args[0] for call in mock_progress.update.call_args_list) == 100
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.cores', 2)
+@mock.patch('mantidimaging.core.parallel.utility.pm.pool')
+def test_run_compute_func_impl_par_cancel_stops_remaining_slices(mock_pool):
+    mock_pool.imap.side_effect = _lazy_imap
+    progress = Progress(num_steps=100)
+    processed = []
+
+    def process_index(index: int) -> None:
+        processed.append(index)
+        if len(processed) == 30:
+            progress.cancel()
+
+    with pytest.raises(OperationCancelled) as cancelled:
+        run_compute_func_impl(_IndexLoop(process_index), 100, True, progress, "Test")
+
+    assert 30 <= len(processed) < 100
+    assert cancelled.value.modified_slices == processed
+    assert not pm.cancel_event.is_set()
+
+
+def test_execute_impl_seq_cancel_reports_modified_slices():
+    progress = Progress(num_steps=5)
+
+    def process_index(index: int) -> None:
+        if index == 2:
+            progress.cancel()
+
+    with pytest.raises(OperationCancelled) as cancelled:
+        execute_impl(5, process_index, False, progress, "Test")
+
+    assert cancelled.value.modified_slices == [0, 1, 2]
+
+
+def test_index_loop_stops_when_cancelled():
+    calls = []
+    try:
+        pm.cancel_event.set()
+        result = _IndexLoop(calls.append)(range(3, 6))
+    finally:
+        pm.cancel_event.clear()
+    assert calls == []
+    assert result.processed == range(3, 3)
+
+
+@pytest.mark.parametrize(
+    'cores,shape,should_be_threaded',
+    (
+        [1, 100, False],  # a single core should return False
+        [4, 10, False],  # shapes <= 10 should return False
+        [4, 11, True]))
+def test_correctly_chooses_threaded(cores: int, shape: int, should_be_threaded: bool):
+    with mock.patch('mantidimaging.core.parallel.utility.pm.cores', cores):
+        assert threading_necessary(shape) is should_be_threaded
+
+
+def test_run_compute_func_impl_seq():
+    mock_worker = mock.Mock()
+    mock_progress = mock.Mock()
+    run_compute_func_impl(mock_worker, 3, False, mock_progress, "Test")
+    assert mock_worker.call_args_list == [mock.call(range(i, i + 1)) for i in range(3)]
+    assert mock_progress.update.call_count == 3
+
+
+@pytest.mark.parametrize(
+    'cores,num_operations,time_per_operation,expected',
+    (
+        [8, 1000, None, 1],  # no timing information
+        [8, 1000, 1.0, 1],  # slow slices are sent one at a time
+        [8, 4000, 1e-5, 125],  # fast slices limited to keep tasks per core
+        [8, 100000, 1e-4, 500],  # fast slices batched to the target task time
+        [8, 10, 1e-6, 1],
+        [8, 0, 1e-6, 1],
+    ))
+def test_calculate_chunksize(cores, num_operations, time_per_operation, expected):
+    assert calculate_chunksize(cores, num_operations, time_per_operation) == expected
+
+
+def test_split_into_ranges():
+    assert split_into_ranges(2, 12, 4) == [range(2, 6), range(6, 10), range(10, 12)]
+    assert split_into_ranges(0, 0, 4) == []
 
 
 @pytest.mark.parametrize('dtype,expected_dtype', [
@@ -91,6 +230,136 @@ def test_looking_up_shared_array_from_proxy():
     assert shared_array._shared_memory.name == proxy._shared_array._shared_memory.name
 
 
+def test_registry_reuses_attached_segment():
+    shared_array = _create_shared_array((5, 5), np.float32)
+    registry = SharedMemoryRegistry()
+    mem_name = shared_array._shared_memory.name
+
+    mem = registry.attach(mem_name)
+
+    assert registry.attach(mem_name) is mem
+    assert len(registry) == 1
+    registry.clear()
+
+
+def test_registry_evicts_unlinked_segment():
+    shared_array = _create_shared_array((5, 5), np.float32)
+    other_array = _create_shared_array((5, 5), np.float32)
+    registry = SharedMemoryRegistry()
+    mem_name = shared_array._shared_memory.name
+    registry.attach(mem_name)
+
+    del shared_array
+    # The arena keeps released segments for reuse until it is cleared
+    arena.clear()
+    registry.attach(other_array._shared_memory.name)
+
+    assert mem_name not in registry
+    assert len(registry) == 1
+    registry.clear()
+
+
+def test_idle_registry_evicts_unlinked_segment():
+    shared_array = _create_shared_array((5, 5), np.float32)
+    registry = SharedMemoryRegistry()
+    mem_name = shared_array._shared_memory.name
+    registry.attach(mem_name)
+
+    registry.start_eviction(interval=0.01)
+    try:
+        del shared_array
+        arena.clear()
+        for _ in range(100):
+            if mem_name not in registry:
+                break
+            time.sleep(0.01)
+    finally:
+        registry.stop_eviction()
+
+    assert mem_name not in registry
+    assert len(registry) == 0
+    registry.clear()
+
+
+def test_registry_closes_least_recently_used():
+    shared_arrays = [_create_shared_array((5, 5), np.float32) for _ in range(3)]
+    names = [sa._shared_memory.name for sa in shared_arrays]
+    registry = SharedMemoryRegistry(max_segments=2)
+
+    registry.attach(names[0])
+    registry.attach(names[1])
+    registry.attach(names[0])
+    registry.attach(names[2])
+
+    assert names[0] in registry
+    assert names[1] not in registry
+    assert names[2] in registry
+    registry.clear()
+
+
+@mock.patch('mantidimaging.core.parallel.utility._use_attached_segments', return_value=True)
+@mock.patch('mantidimaging.core.parallel.utility.attached_segments', new_callable=SharedMemoryRegistry)
+def test_proxies_in_worker_share_attached_segment(registry, _):
+    shared_array = _create_shared_array((5, 5, 5), np.float32)
+    shared_array.array[:] = th.gen_img_numpy_rand((5, 5, 5))
+
+    first_proxy = shared_array.array_proxy
+    second_proxy = shared_array.array_proxy
+
+    npt.assert_equal(first_proxy.array, shared_array.array)
+    npt.assert_equal(second_proxy.array, shared_array.array)
+    assert len(registry) == 1
+    assert not first_proxy._shared_array.has_shared_memory
+    del first_proxy, second_proxy
+    registry.clear()
+
+
+def test_memmap_array_is_shared_through_proxy(tmp_path):
+    shared_array = create_memmap_array((5, 5, 5), np.float32, directory=str(tmp_path))
+    assert shared_array.has_shared_memory
+
+    # Proxies are pickled when sent to worker processes
+    proxy = pickle.loads(pickle.dumps(shared_array.array_proxy))
+    proxy.array[2] = 3
+    proxy.array.flush()
+
+    npt.assert_equal(shared_array.array[2], 3)
+    npt.assert_equal(shared_array.array[1], 0)
+
+
+def test_memmap_file_removed_on_delete(tmp_path):
+    shared_array = create_memmap_array((5, 5), np.float32, directory=str(tmp_path))
+    path = shared_array.path
+    proxy = shared_array.array_proxy
+    npt.assert_equal(proxy.array, 0)
+    assert os.path.exists(path)
+
+    del proxy
+    assert os.path.exists(path)
+    del shared_array
+    assert not os.path.exists(path)
+
+
+def test_create_memmap_array_needs_scratch_dir():
+    with pytest.raises(ValueError):
+        create_memmap_array((5, 5), np.float32)
+
+
+@mock.patch('mantidimaging.core.parallel.utility.enough_memory', return_value=False)
+def test_create_array_uses_scratch_dir_when_out_of_memory(_, tmp_path):
+    with mock.patch('mantidimaging.core.parallel.manager.scratch_dir', str(tmp_path)):
+        shared_array = create_array((5, 5), np.float32)
+
+    assert isinstance(shared_array, MemmapSharedArray)
+    assert os.path.dirname(shared_array.path) == str(tmp_path)
+
+
+@mock.patch('mantidimaging.core.parallel.utility.enough_memory', return_value=False)
+def test_create_array_raises_when_out_of_memory_without_scratch_dir(_):
+    with pytest.raises(RuntimeError):
+        create_array((5, 5), np.float32)
+
+
 if __name__ == "__main__":
     import pytest
 
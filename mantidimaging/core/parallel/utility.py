@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 import os
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
 from logging import getLogger
-from multiprocessing import shared_memory
-from typing import TYPE_CHECKING
+from multiprocessing import parent_process, shared_memory
+from typing import NamedTuple, TYPE_CHECKING
 from collections.abc import Callable
 
 import numpy as np
@@ -14,14 +19,50 @@ from mantidimaging.core.utility.memory_usage import system_free_memory
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.utility.size_calculator import full_size_KB, full_size_bytes
 from mantidimaging.core.parallel import manager as pm
+from mantidimaging.core.parallel.accountant import accountant
+from mantidimaging.core.parallel.arena import arena
 
 if TYPE_CHECKING:
     from functools import partial
     import numpy.typing as npt
+    from collections.abc import Iterable, Iterator
     from multiprocessing.shared_memory import SharedMemory
 
+    ImapType = Callable[[Callable[[range], "TaskResult"], Iterable[range]], Iterator["TaskResult"]]
+
 LOG = getLogger(__name__)
 
+# Slices are batched so that each task sent to the pool takes at least about this long
+TARGET_TASK_SECONDS = 0.05
+# The minimum number of tasks each core should receive, to balance the load when slices take different times
+MIN_TASKS_PER_CORE = 4
+# The most shared memory segments that a worker process keeps attached between tasks
+MAX_ATTACHED_SEGMENTS = 32
+# How often a worker process checks for attached segments that the parent has unlinked, in seconds
+EVICTION_INTERVAL = 1.0
+
+
+class TaskResult(NamedTuple):
+    """
+    The slices that a task processed, and how long it took. If the operation is cancelled, processed can stop before
+    the end of the range that the task was given.
+    """
+    processed: range
+    duration: float
+
+
+class OperationCancelled(RuntimeError):
+    """
+    Raised when an operation is cancelled part way through.
+
+    modified_slices holds the indices that were passed to the compute function. The partial result is kept in the
+    array, so these are the slices that were changed.
+    """
+
+    def __init__(self, modified_slices: list[int]):
+        super().__init__('Task has been cancelled')
+        self.modified_slices = modified_slices
+
 
 def enough_memory(shape, dtype):
     return full_size_KB(shape=shape, dtype=dtype) < system_free_memory().kb()
@@ -31,15 +72,27 @@ def create_array(shape: tuple[int, ...], dtype: npt.DTypeLike = np.float32) -> S
     """
     Create an array in shared memory
 
+    The array is registered with the accountant, which raises MemoryBudgetExceeded if it would go over the budget.
+    If there is not enough memory and pm.scratch_dir is set, an array backed by a file in the scratch directory is
+    created instead.
+
     :param shape: Shape of the array
     :param dtype: Dtype of the array
     :return: The created SharedArray
     """
     if not enough_memory(shape, dtype):
+        # Segments kept for reuse are not counted as free memory
+        arena.clear()
+    if not enough_memory(shape, dtype):
+        if pm.scratch_dir is not None:
+            LOG.info(f"Not enough memory for shape={shape}, dtype={dtype}, using a memory mapped file instead")
+            return create_memmap_array(shape, dtype)
         raise RuntimeError(
             "The machine does not have enough physical memory available to allocate space for this data.")
 
-    return _create_shared_array(shape, dtype)
+    shared_array = _create_shared_array(shape, dtype)
+    accountant.register(shared_array, full_size_bytes(shape, dtype))
+    return shared_array
 
 
 def _create_shared_array(shape: tuple[int, ...], dtype: npt.DTypeLike = np.float32) -> SharedArray:
@@ -47,11 +100,40 @@ def _create_shared_array(shape: tuple[int, ...], dtype: npt.DTypeLike = np.float
 
     LOG.info(f'Requested shared array with shape={shape}, size={size}, dtype={dtype}')
 
-    name = pm.generate_mi_shared_mem_name()
-    mem = shared_memory.SharedMemory(name=name, create=True, size=size)
+    mem = arena.allocate(size)
     return _read_array_from_shared_memory(shape, dtype, mem, True)
 
 
+def create_memmap_array(shape: tuple[int, ...],
+                        dtype: npt.DTypeLike = np.float32,
+                        directory: str | None = None) -> MemmapSharedArray:
+    """
+    Create an array backed by a memory mapped file, for stacks that are larger than the memory.
+
+    Pages of the file are read in when they are used and written back by the OS when the memory is needed elsewhere,
+    so operations stream through the stack in the contiguous slabs that the tasks are made of. Worker processes open
+    the same file by its path.
+
+    :param shape: Shape of the array
+    :param dtype: Dtype of the array
+    :param directory: Directory to create the file in, pm.scratch_dir if not given. This should be on a local disk.
+    :return: The created MemmapSharedArray
+    """
+    directory = directory if directory is not None else pm.scratch_dir
+    if directory is None:
+        raise ValueError("No scratch directory has been set for memory mapped arrays")
+    size = full_size_bytes(shape, dtype)
+    if size <= 0:
+        raise ValueError("'size' must be a positive number different from zero")
+    if shutil.disk_usage(directory).free < size:
+        raise RuntimeError(f"The scratch directory {directory} does not have enough free space for this data.")
+
+    path = os.path.join(directory, f"{pm.generate_mi_shared_mem_name()}.dat")
+    LOG.info(f'Requested memory mapped array with shape={shape}, size={size}, dtype={dtype} in {path}')
+    array = np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+    return MemmapSharedArray(array, path)
+
+
 def _read_array_from_shared_memory(shape: tuple[int, ...], dtype: npt.DTypeLike, mem: SharedMemory,
                                    free_mem_on_delete: bool) -> SharedArray:
     array: np.ndarray = np.ndarray(shape, dtype=dtype, buffer=mem.buf)
@@ -64,24 +146,32 @@ def copy_into_shared_memory(array: np.ndarray) -> SharedArray:
     return shared_array
 
 
-def calculate_chunksize(cores):
+def calculate_chunksize(cores: int, num_operations: int, time_per_operation: float | None = None) -> int:
+    """
+    Calculate how many consecutive slices are sent to a worker in one task.
+
+    Each task sent to the pool costs a pickle and an IPC round trip, which can be larger than the work itself for small
+    slices. The chunk is sized so that each task takes roughly TARGET_TASK_SECONDS, while keeping at least
+    MIN_TASKS_PER_CORE tasks per core so that the load stays balanced. For large slices this gives a chunksize of 1,
+    which performance tests showed to be the best choice for e.g. (50,512,512) stacks.
+
+    :param cores: Number of processes in the pool
+    :param num_operations: Number of slices still to be processed
+    :param time_per_operation: Measured time in seconds to process a single slice. If not known a chunksize of 1 is used
+    :return: The number of slices in each task
     """
-    TODO possible proper calculation of chunksize, although best performance has been with 1
-    From performance tests, the chunksize doesn't seem to make much of a
-    difference, but having larger chunks usually led to slower performance:
+    if not time_per_operation or num_operations <= 0:
+        return 1
+    max_chunksize = max(1, num_operations // (cores * MIN_TASKS_PER_CORE))
+    chunksize = int(TARGET_TASK_SECONDS / time_per_operation)
+    return max(1, min(chunksize, max_chunksize))
+
 
-    Shape: (50,512,512)
-    1 chunk 3.06s
-    2 chunks 3.05s
-    3 chunks 3.07s
-    4 chunks 3.06s
-    5 chunks 3.16s
-    6 chunks 3.06s
-    7 chunks 3.058s
-    8 chunks 3.25s
-    9 chunks 3.45s
+def split_into_ranges(start: int, stop: int, chunksize: int) -> list[range]:
+    """
+    Split the indices from start to stop into contiguous ranges of at most chunksize
     """
-    return 1
+    return [range(i, min(i + chunksize, stop)) for i in range(start, stop, chunksize)]
 
 
 def multiprocessing_necessary(shape: int, is_shared_data: bool) -> bool:
@@ -103,47 +193,143 @@ def multiprocessing_necessary(shape: int, is_shared_data: bool) -> bool:
     return True
 
 
+def threading_necessary(shape: int) -> bool:
+    if pm.cores <= 1:
+        LOG.info("Only 1 core available")
+        return False
+    elif shape <= 10:
+        LOG.info("Shape under 10")
+        return False
+
+    LOG.info("Threading required")
+    return True
+
+
 def execute_impl(img_num: int, partial_func: partial, is_shared_data: bool, progress: Progress, msg: str):
     task_name = f"{msg}"
     progress = Progress.ensure_instance(progress, num_steps=img_num, task_name=task_name)
-    indices_list = range(img_num)
     if multiprocessing_necessary(img_num, is_shared_data) and pm.pool:
         LOG.info(f"Running async on {pm.cores} cores")
-        # Using _ in the for _ enumerate is slightly faster, because the tuple from enumerate isn't unpacked,
-        # and thus some time is saved
-        # Using imap here seems to be the best choice:
-        # - imap_unordered gives the images back in random order
-        # - map and map_async do not improve speed performance
-        for _ in pm.pool.imap(partial_func, indices_list, chunksize=calculate_chunksize(pm.cores)):
-            progress.update(1, msg)
+        _run_in_pool(_IndexLoop(partial_func), img_num, progress, msg)
     else:
         LOG.info("Running synchronously on 1 core")
-        for ind in indices_list:
+        for ind in range(img_num):
             partial_func(ind)
-            progress.update(1, msg)
+            if not _update_progress(progress, 1, msg):
+                raise OperationCancelled(list(range(ind + 1)))
     progress.mark_complete()
 
 
-def run_compute_func_impl(worker_func: Callable[[int], None],
+def run_compute_func_impl(worker_func: Callable[[range], TaskResult],
                           num_operations: int,
                           is_shared_data: bool,
                           progress=None,
-                          msg: str = ""):
+                          msg: str = "",
+                          thread_safe: bool = False):
+    """
+    Run worker_func over all the slices, in parallel if possible.
+
+    :param worker_func: Callable that processes a range of slice indices and returns the time it took
+    :param num_operations: Number of slices to process
+    :param is_shared_data: Whether all the data is in shared memory
+    :param progress: Progress instance to use for progress reporting (optional)
+    :param msg: Message to be shown on the progress bar
+    :param thread_safe: Whether worker_func can be run on the thread pool instead of the process pool
+    """
     task_name = f"{msg}"
     progress = Progress.ensure_instance(progress, num_steps=num_operations, task_name=task_name)
-    indices_list = range(num_operations)
-    if multiprocessing_necessary(num_operations, is_shared_data) and pm.pool:
+    if thread_safe and threading_necessary(num_operations):
+        LOG.info(f"Running on {pm.cores} threads")
+        _run_in_pool(worker_func, num_operations, progress, msg, pm.get_thread_pool().map)
+    elif multiprocessing_necessary(num_operations, is_shared_data) and pm.pool:
         LOG.info(f"Running async on {pm.cores} cores")
-        for _ in pm.pool.imap(worker_func, indices_list, chunksize=calculate_chunksize(pm.cores)):
-            progress.update(1, msg)
+        _run_in_pool(worker_func, num_operations, progress, msg)
     else:
         LOG.info("Running synchronously on 1 core")
-        for ind in indices_list:
-            worker_func(ind)
-            progress.update(1, msg)
+        for ind in range(num_operations):
+            worker_func(range(ind, ind + 1))
+            if not _update_progress(progress, 1, msg):
+                raise OperationCancelled(list(range(ind + 1)))
     progress.mark_complete()
 
 
+def _run_in_pool(range_func: Callable[[range], TaskResult],
+                 num_operations: int,
+                 progress: Progress,
+                 msg: str,
+                 imap: ImapType | None = None) -> None:
+    """
+    Schedule range_func over all slices on the process pool, or with the given imap.
+
+    A first round of single slice tasks, one per core, measures how long a slice takes to process. The remaining
+    slices are then sent as contiguous ranges, sized with calculate_chunksize.
+
+    If the progress is cancelled, the tasks are told to stop through pm.cancel_event. The results of all the tasks
+    are still waited for, so that nothing is left running in the pool, then OperationCancelled is raised.
+    """
+    if imap is None:
+        assert pm.pool is not None
+        imap = pm.pool.imap
+    try:
+        probe_count = min(pm.cores, num_operations)
+        results = _run_ranges_in_pool(range_func, split_into_ranges(0, probe_count, 1), progress, msg, imap)
+        if not pm.cancel_event.is_set():
+            # The minimum is used as the first task on each worker can include one off setup costs
+            time_per_operation = min((result.duration for result in results), default=None)
+
+            chunksize = calculate_chunksize(pm.cores, num_operations - probe_count, time_per_operation)
+            LOG.info(f"Measured {time_per_operation}s per slice, using a chunksize of {chunksize}")
+            results += _run_ranges_in_pool(range_func, split_into_ranges(probe_count, num_operations, chunksize),
+                                           progress, msg, imap)
+
+        if pm.cancel_event.is_set():
+            LOG.info("Operation cancelled")
+            raise OperationCancelled([index for result in results for index in result.processed])
+    finally:
+        pm.cancel_event.clear()
+
+
+def _run_ranges_in_pool(range_func: Callable[[range], TaskResult], ranges: list[range], progress: Progress, msg: str,
+                        imap: ImapType) -> list[TaskResult]:
+    results = []
+    for result in imap(range_func, ranges):
+        results.append(result)
+        if not pm.cancel_event.is_set() and not _update_progress(progress, len(result.processed), msg):
+            # Tasks check the event between slices, so the tasks that are still queued return without doing any work
+            pm.cancel_event.set()
+    return results
+
+
+def _update_progress(progress: Progress, steps: int, msg: str) -> bool:
+    """
+    Update the progress, returning False if the operation has been cancelled.
+    """
+    try:
+        progress.update(steps, msg)
+    except RuntimeError:
+        if not progress.should_cancel:
+            raise
+        return False
+    return True
+
+
+class _IndexLoop:
+    """
+    Calls a function taking a single index for each index in a range. Stops early if the operation is cancelled.
+    """
+
+    def __init__(self, func: Callable[[int], None]):
+        self.func = func
+
+    def __call__(self, indices: range) -> TaskResult:
+        t0 = time.perf_counter()
+        for count, index in enumerate(indices):
+            if pm.cancel_event.is_set():
+                return TaskResult(indices[:count], time.perf_counter() - t0)
+            self.func(index)
+        return TaskResult(indices, time.perf_counter() - t0)
+
+
 class SharedArray:
 
     def __init__(self, array: np.ndarray, shared_memory: SharedMemory | None, free_mem_on_del: bool = True):
@@ -152,7 +338,13 @@ class SharedArray:
         self._free_mem_on_del = free_mem_on_del
 
     def __del__(self):
+        accountant.unregister(self)
         if self.has_shared_memory:
+            if self._free_mem_on_del:
+                # The array is dropped first, so that the arena can tell if any views of the memory are still in use
+                del self.array
+                if arena.release(self._shared_memory):
+                    return
             self._shared_memory.close()
             if self._free_mem_on_del:
                 try:
@@ -171,6 +363,38 @@ class SharedArray:
         return SharedArrayProxy(mem_name=mem_name, shape=self.array.shape, dtype=self.array.dtype)
 
 
+class MemmapSharedArray(SharedArray):
+    """
+    A SharedArray backed by a memory mapped file instead of a shared memory segment.
+
+    The array can be used like any other, and worker processes attach to it through a MemmapArrayProxy. The file is
+    deleted when the MemmapSharedArray is.
+    """
+
+    def __init__(self, array: np.memmap, path: str, free_mem_on_del: bool = True):
+        super().__init__(array, None, free_mem_on_del)
+        self.path = path
+
+    def __del__(self):
+        if self._free_mem_on_del:
+            del self.array
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # On Windows the file can not be removed while views of the array are still in use
+                LOG.warning(f"Could not remove memory mapped file {self.path}: {e}")
+
+    @property
+    def has_shared_memory(self) -> bool:
+        return True
+
+    @property
+    def array_proxy(self) -> SharedArrayProxy:
+        return MemmapArrayProxy(self.path, self.array.shape, self.array.dtype)
+
+
 class SharedArrayProxy:
 
     def __init__(self, mem_name: str | None, shape: tuple[int, ...], dtype: npt.DTypeLike):
@@ -182,6 +406,133 @@ class SharedArrayProxy:
     @property
     def array(self) -> np.ndarray:
         if self._shared_array is None:
-            mem = shared_memory.SharedMemory(name=self._mem_name)
-            self._shared_array = _read_array_from_shared_memory(self._shape, self._dtype, mem, False)
+            if _use_attached_segments() and self._mem_name is not None:
+                # The segment stays open in the registry, so the SharedArray must not close it when deleted
+                mem = attached_segments.attach(self._mem_name)
+                self._shared_array = SharedArray(np.ndarray(self._shape, dtype=self._dtype, buffer=mem.buf), None)
+            else:
+                mem = shared_memory.SharedMemory(name=self._mem_name)
+                self._shared_array = _read_array_from_shared_memory(self._shape, self._dtype, mem, False)
+        return self._shared_array.array
+
+
+class MemmapArrayProxy(SharedArrayProxy):
+
+    def __init__(self, path: str, shape: tuple[int, ...], dtype: npt.DTypeLike):
+        super().__init__(None, shape, dtype)
+        self._path = path
+
+    @property
+    def array(self) -> np.ndarray:
+        if self._shared_array is None:
+            array = np.memmap(self._path, dtype=self._dtype, mode='r+', shape=self._shape)
+            self._shared_array = MemmapSharedArray(array, self._path, free_mem_on_del=False)
         return self._shared_array.array
+
+
+class SharedMemoryRegistry:
+    """
+    Keeps shared memory segments attached in a worker process between tasks, keyed by segment name.
+
+    Opening a segment maps it into the process, which is a fixed cost for every task that uses a SharedArrayProxy.
+    Segments are evicted once the parent process has unlinked them, so that the memory can be released, and the least
+    recently used segment is closed when more than max_segments are attached. Eviction happens on each attach, and
+    periodically in the background once start_eviction has been called, so that an idle worker does not keep freed
+    segments mapped.
+    """
+
+    def __init__(self, max_segments: int = MAX_ATTACHED_SEGMENTS):
+        self.max_segments = max_segments
+        self._segments: OrderedDict[str, SharedMemory] = OrderedDict()
+        # Segments that could not be closed yet because arrays from an earlier task still use them
+        self._to_close: list[SharedMemory] = []
+        self._lock = threading.Lock()
+        self._stop_eviction = threading.Event()
+
+    def __contains__(self, mem_name: str) -> bool:
+        return mem_name in self._segments
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def attach(self, mem_name: str) -> SharedMemory:
+        with self._lock:
+            self._evict_unlinked()
+            if mem_name in self._segments:
+                self._segments.move_to_end(mem_name)
+                return self._segments[mem_name]
+
+            mem = shared_memory.SharedMemory(name=mem_name)
+            self._segments[mem_name] = mem
+            while len(self._segments) > self.max_segments:
+                _, oldest = self._segments.popitem(last=False)
+                self._close(oldest)
+            return mem
+
+    def evict_unlinked(self) -> None:
+        with self._lock:
+            self._evict_unlinked()
+
+    def start_eviction(self, interval: float = EVICTION_INTERVAL) -> None:
+        """
+        Evict unlinked segments every interval seconds from a daemon thread, until stop_eviction is called.
+        """
+        self._stop_eviction.clear()
+        threading.Thread(target=self._evict_periodically,
+                         args=(interval, ),
+                         daemon=True,
+                         name="mantidimaging_segment_eviction").start()
+
+    def stop_eviction(self) -> None:
+        self._stop_eviction.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            while self._segments:
+                self._close(self._segments.popitem()[1])
+
+    def _evict_periodically(self, interval: float) -> None:
+        while not self._stop_eviction.wait(interval):
+            self.evict_unlinked()
+
+    def _evict_unlinked(self) -> None:
+        for mem_name in [name for name in self._segments if not _segment_exists(name)]:
+            self._to_close.append(self._segments.pop(mem_name))
+        # Also retry segments whose arrays were still in use when they were evicted
+        self._close_pending()
+
+    def _close(self, mem: SharedMemory) -> None:
+        self._to_close.append(mem)
+        self._close_pending()
+
+    def _close_pending(self) -> None:
+        still_open = []
+        for pending in self._to_close:
+            try:
+                pending.close()
+            except BufferError:
+                still_open.append(pending)
+        self._to_close = still_open
+
+
+attached_segments = SharedMemoryRegistry()
+
+
+def _use_attached_segments() -> bool:
+    """
+    Segments are only kept attached in worker processes, and only on Linux where it can be seen when the parent has
+    unlinked a segment. On Windows the memory would not be freed while a worker still has it open.
+    """
+    return parent_process() is not None and sys.platform == 'linux'
+
+
+def start_segment_eviction() -> None:
+    """
+    Called when a worker process starts, so that it releases segments the parent has unlinked while it is idle.
+    """
+    if _use_attached_segments():
+        attached_segments.start_eviction()
+
+
+def _segment_exists(mem_name: str) -> bool:
+    return os.path.exists(f'{pm.MEM_DIR_LINUX}/{mem_name}')
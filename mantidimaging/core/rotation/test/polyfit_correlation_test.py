@@ -39,7 +39,7 @@ class PolyfitCorrelationTest(unittest.TestCase):
         images.proj180deg = ImageStack(np.fliplr(images.data))
         mock_progress = mock.create_autospec(Progress)
         res_cor, res_tilt = find_center(images, mock_progress)
-        assert mock_progress.update.call_count == 11
+        assert sum(call.args[0] for call in mock_progress.update.call_args_list) == 11
         assert res_cor.value == 5.0, f"Found {res_cor.value}"
         assert res_tilt.value == 0.0, f"Found {res_tilt.value}"
 
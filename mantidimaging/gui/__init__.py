@@ -1,5 +1,8 @@
 # Copyright (C) 2024 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
+"""
+The windows are not imported here, so that operations can import the gui
+utility modules without building the whole GUI, e.g. in the parallel worker
+processes. Use mantidimaging.gui.gui.execute to start the GUI.
+"""
 from __future__ import annotations
-
-from .gui import execute  # noqa: F401  # noqa:F821
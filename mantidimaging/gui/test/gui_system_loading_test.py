@@ -191,9 +191,8 @@ class TestGuiSystemLoading(GuiSystemBase):
         ((20, 30, 1), 10),
     ])
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.view.ImageLoadDialog.select_file")
-    @mock.patch("mantidimaging.core.io.loader.loader._imread")
-    def test_load_with_start_stop_inc(self, start_stop_inc, expected_count, mocked_imread, mocked_select_file):
-        mocked_imread.return_value = numpy.zeros([128, 128])  # Don't need to actually load the files
+    @mock.patch("mantidimaging.core.io.loader.loader._imread_into")  # Don't need to actually load the files
+    def test_load_with_start_stop_inc(self, start_stop_inc, expected_count, _mocked_imread_into, mocked_select_file):
         mocked_select_file.return_value = LOAD_SAMPLE
         self.assertEqual(len(self.main_window.presenter.get_active_stack_visualisers()), 0)
 
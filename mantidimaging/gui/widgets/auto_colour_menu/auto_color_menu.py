@@ -3,13 +3,13 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+import numpy as np
 from PyQt5.QtWidgets import QAction
 
 from mantidimaging.gui.widgets.palette_changer.view import PaletteChangerView
 
 if TYPE_CHECKING:
     from pyqtgraph import HistogramLUTItem
-    import numpy as np
     from PyQt5.QtWidgets import QWidget
 
 DEFAULT_MENU_POSITION = 12
@@ -62,7 +62,7 @@ class AutoColorMenu:
         """
         change_colour_palette = PaletteChangerView(parent=self.auto_color_parent,
                                                    main_hist=self.histogram,
-                                                   image=self.image_data,
+                                                   image=np.asarray(self.image_data),
                                                    other_hists=self.other_histograms,
                                                    recon_mode=self.auto_color_recon_mode)
         change_colour_palette.show()
@@ -3,10 +3,12 @@
 from __future__ import annotations
 from unittest import mock
 
+import h5py
 import numpy as np
 import unittest
 
-from mantidimaging.gui.widgets.mi_image_view.view import MIImageView
+from mantidimaging.core.io.loader.nexus_loader import LazyNexusImages
+from mantidimaging.gui.widgets.mi_image_view.view import MIImageView, LAZY_LEVELS_SAMPLES
 from mantidimaging.test_helpers import start_qapplication
 
 
@@ -46,6 +48,19 @@ class MIImageViewTest(unittest.TestCase):
         self.view.setImage(image)
         self.view.set_roi.assert_not_called()
 
+    def test_set_lazy_image_reads_only_sampled_images(self):
+        data = np.arange(20 * 4 * 6, dtype=np.float32).reshape((20, 4, 6))
+        with h5py.File("lazy", "w", driver="core", backing_store=False) as nexus_file:
+            dataset = nexus_file.create_dataset("data", data=data)
+            images = LazyNexusImages(dataset, np.arange(20), np.float32)
+
+            with mock.patch.object(dataset, "read_direct", wraps=dataset.read_direct) as read_direct:
+                self.view.setImage(images)
+
+            self.assertEqual(read_direct.call_count, LAZY_LEVELS_SAMPLES)
+            self.assertEqual((self.view.levelMin, self.view.levelMax), (data.min(), data.max()))
+            np.testing.assert_array_equal(self.view.imageItem.image, data[0])
+
     def test_set_roi(self):
         image = np.zeros((1, 10, 5))
         self.view.setImage(image)
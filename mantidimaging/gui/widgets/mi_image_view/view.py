@@ -7,6 +7,7 @@ from time import sleep
 from typing import TYPE_CHECKING
 from collections.abc import Callable
 
+import numpy as np
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QPushButton, QSizePolicy
 from pyqtgraph import ROI, ImageItem, ImageView, ViewBox
@@ -21,7 +22,7 @@ from mantidimaging.gui.widgets.bad_data_overlay.bad_data_overlay import BadDataO
 
 if TYPE_CHECKING:
     from pyqtgraph import HistogramLUTItem
-    import numpy as np
+    from mantidimaging.core.io.loader.nexus_loader import LazyNexusImages
     from mantidimaging.core.utility.data_containers import ProjectionAngles
 
 
@@ -35,6 +36,10 @@ class UnrotateablePlotROI(ROI):
         self.addScaleHandle([1, 1], [0, 0])
 
 
+# Number of images sampled for the levels of stacks that are read from a file as they are viewed
+LAZY_LEVELS_SAMPLES = 5
+
+
 def clip(value, lower, upper):
     return lower if value < lower else upper if value > upper else value
 
@@ -148,7 +153,7 @@ class MIImageView(ImageView, BadDataOverlay, AutoColorMenu):
         self._angles = angles
         self._update_message(self._last_mouse_hover_location)
 
-    def setImage(self, image: np.ndarray, *args, **kwargs):
+    def setImage(self, image: np.ndarray | LazyNexusImages, *args, **kwargs):
         dimensions_changed = self.image_data is None or self.image_data.shape != image.shape
         if image.ndim == 3:
             # For a 3 dimensional image, we need to specify which axes we are providing and their indices in the
@@ -162,6 +167,15 @@ class MIImageView(ImageView, BadDataOverlay, AutoColorMenu):
             self.set_roi(self.default_roi())
         self.angles = None
 
+    def quickMinMax(self, data):
+        """
+        Estimates the levels of a lazily read stack from a few of its images, rather than reading the whole stack.
+        """
+        if not isinstance(data, np.ndarray) and data.ndim == 3:
+            samples = np.linspace(0, data.shape[0] - 1, min(data.shape[0], LAZY_LEVELS_SAMPLES)).astype(int)
+            data = data[np.unique(samples)]
+        return super().quickMinMax(data)
+
     def toggle_jumping_frame(self, images_to_jump_by=None):
         if not self.shifting_through_images and images_to_jump_by is not None:
             self.shifting_through_images = True
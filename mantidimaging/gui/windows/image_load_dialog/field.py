@@ -3,8 +3,6 @@
 from __future__ import annotations
 from pathlib import Path
 
-import numpy as np
-
 from PyQt5.QtWidgets import QTreeWidgetItem, QWidget, QSpinBox, QTreeWidget, QHBoxLayout, QLabel, QCheckBox, QPushButton
 
 from mantidimaging.core.utility import size_calculator
@@ -175,18 +173,18 @@ class Field:
             else:
                 self._increment_spinbox.setValue(1)
 
-    def _update_expected_mem_usage(self, shape: tuple[int, int]) -> tuple[int, float]:
+    def _update_expected_mem_usage(self, shape: tuple[int, int], dtype: str) -> tuple[int, float]:
         num_images = size_calculator.number_of_images_from_indices(self._start.value(), self._stop.value(),
                                                                    self._increment.value())
 
-        single_mem = size_calculator.full_size_MB(shape, dtype=np.float32)
+        single_mem = size_calculator.full_size_MB(shape, dtype=dtype)
 
         exp_mem = round(single_mem * num_images, 2)
         return num_images, exp_mem
 
-    def update_shape(self, shape: int | tuple[int, int]) -> None:
+    def update_shape(self, shape: int | tuple[int, int], dtype: str = "float32") -> None:
         if isinstance(shape, int):
             self._shape = f"{str(shape)} images"
         else:
-            num_images, exp_mem = self._update_expected_mem_usage(shape)
+            num_images, exp_mem = self._update_expected_mem_usage(shape, dtype)
             self._shape = f"{num_images} images x {shape[0]} x {shape[1]}, {exp_mem}MB"
@@ -8,8 +8,10 @@ from typing import TYPE_CHECKING
 
 from mantidimaging.core.io.filenames import FilenameGroup
 from mantidimaging.core.io.loader import load_log
-from mantidimaging.core.io.loader.loader import LoadingParameters, ImageParameters, read_image_dimensions
+from mantidimaging.core.io.loader.loader import LoadingParameters, ImageParameters, count_images, \
+    loaded_image_shape, read_image_dimensions
 from mantidimaging.core.utility.data_containers import FILE_TYPES, log_for_file_type
+from mantidimaging.core.utility.sensible_roi import SensibleROI
 from mantidimaging.gui.windows.image_load_dialog.field import Field
 
 if TYPE_CHECKING:
@@ -27,6 +29,7 @@ class LoadPresenter:
         self.image_format = ''
         self.single_mem = 0
         self.dtype = '32'
+        self.sample_shape: tuple[int, int] | None = None
 
     def do_update_field(self, field: Field) -> None:
         """
@@ -60,9 +63,9 @@ class LoadPresenter:
         self.update_field_with_filegroup(FILE_TYPES.SAMPLE, sample)
 
         sample_field.widget.setExpanded(True)
-        sample_shape = read_image_dimensions(Path(selected_file))
-        self.view.sample.update_indices(len(sample.all_indexes))
-        self.view.sample.update_shape(sample_shape)
+        self.sample_shape = read_image_dimensions(Path(selected_file))
+        self.view.sample.update_indices(count_images(sample))
+        self.update_sample_shape()
         self.view.enable_preview_all_buttons()
         self.view.ok_button.setEnabled(True)
 
@@ -72,6 +75,34 @@ class LoadPresenter:
                 if related_group:
                     self.update_field_with_filegroup(file_info, related_group)
 
+    def update_sample_shape(self) -> None:
+        """
+        Show the shape of the sample images after they are cropped and binned, or of the images in the files if the
+        crop or binning are not valid.
+        """
+        if self.sample_shape is None:
+            return
+        try:
+            shape = loaded_image_shape(self.sample_shape, self.get_roi(), self.view.binning.value())
+        except ValueError:
+            shape = self.sample_shape
+        self.view.sample.update_shape(shape, self.view.pixel_bit_depth.currentText())
+
+    def get_roi(self) -> SensibleROI | None:
+        """
+        The region to crop the images to as they are loaded, or None to load the whole images.
+        """
+        text = self.view.roi.text().strip().strip("[]")
+        if not text:
+            return None
+        try:
+            values = [int(value) for value in text.split(",")]
+        except ValueError as exc:
+            raise ValueError(f"The crop ROI is invalid, it should be left, top, right, bottom: {text}") from exc
+        if len(values) != 4:
+            raise ValueError(f"The crop ROI is invalid, it should be left, top, right, bottom: {text}")
+        return SensibleROI.from_list(values)
+
     def update_field_with_filegroup(self, file_info: FILE_TYPES, file_group: FilenameGroup):
         file_group.find_all_files()
         file_list = list(file_group.all_files())
@@ -99,6 +130,9 @@ class LoadPresenter:
             raise RuntimeError("No sample selected")
 
         loading_param = LoadingParameters()
+        # Every stack is cropped and binned in the same way, so that they can be used together
+        roi = self.get_roi()
+        binning = self.view.binning.value()
         for file_type in FILE_TYPES:
             if file_type.mode == "log":
                 continue
@@ -107,7 +141,7 @@ class LoadPresenter:
                 continue
             file_group = FilenameGroup.from_file(field.path)
             file_group.find_all_files()
-            image_param = ImageParameters(file_group)
+            image_param = ImageParameters(file_group, roi=roi, binning=binning)
 
             if file_type in log_for_file_type:
                 log_field = self.view.fields[log_for_file_type[file_type].fname]
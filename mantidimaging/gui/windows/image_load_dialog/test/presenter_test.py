@@ -6,11 +6,14 @@ import unittest
 from pathlib import Path
 from unittest import mock
 
+from parameterized import parameterized
+
 from mantidimaging.core.io.filenames import FilenameGroup
 from mantidimaging.core.io.instrument_log import InstrumentLog
 from mantidimaging.gui.windows.image_load_dialog.field import Field
 from mantidimaging.gui.windows.image_load_dialog.presenter import LoadPresenter
 from mantidimaging.core.utility.data_containers import FILE_TYPES, Indices
+from mantidimaging.core.utility.sensible_roi import SensibleROI
 
 
 class ImageLoadDialogPresenterTest(unittest.TestCase):
@@ -22,6 +25,9 @@ class ImageLoadDialogPresenterTest(unittest.TestCase):
         self.fields = {ft.fname: mock.create_autospec(Field) for ft in FILE_TYPES}
         self.v = mock.MagicMock(fields=self.fields)
         self.v.sample = self.fields["Sample"]
+        self.v.roi.text.return_value = ""
+        self.v.binning.value.return_value = 1
+        self.v.pixel_bit_depth.currentText.return_value = "float32"
         self.p = LoadPresenter(self.v)
 
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.LoadPresenter.do_update_flat_or_dark")
@@ -76,28 +82,32 @@ class ImageLoadDialogPresenterTest(unittest.TestCase):
         self.fields["Dark Before"].set_images.assert_called_once_with(file_list)
 
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.FilenameGroup")
+    @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.count_images")
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.read_image_dimensions")
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.LoadPresenter.update_field_with_filegroup")
-    def test_do_update_sample_no_related(self, mock_update_field, mock_read_image_dimensions, mock_filename_group):
+    def test_do_update_sample_no_related(self, mock_update_field, mock_read_image_dimensions, mock_count_images,
+                                         mock_filename_group):
         selected_file = "/a/b/img_000.tif"
         mock_read_image_dimensions.return_value = [10, 11]
+        mock_count_images.return_value = 4
         mock_sample_fg = mock.create_autospec(FilenameGroup)
         mock_filename_group.from_file.return_value = mock_sample_fg
-        mock_sample_fg.all_indexes = [0, 1, 2, 3]
         mock_sample_fg.find_related.return_value = None
 
         self.p.do_update_sample(selected_file)
 
         mock_update_field.assert_called_once_with(FILE_TYPES.SAMPLE, mock_sample_fg)
+        mock_count_images.assert_called_once_with(mock_sample_fg)
         self.fields["Sample"].update_indices.assert_called_once_with(4)
-        self.fields["Sample"].update_shape.assert_called_once_with([10, 11])
+        self.fields["Sample"].update_shape.assert_called_once_with((10, 11), "float32")
         self.v.ok_button.setEnabled.assert_called_once_with(True)
 
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.FilenameGroup")
+    @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.count_images")
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.read_image_dimensions")
     @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.LoadPresenter.update_field_with_filegroup")
     def test_do_update_sample_related_flat_before(self, mock_update_field, mock_read_image_dimensions,
-                                                  mock_filename_group):
+                                                  mock_count_images, mock_filename_group):
         selected_file = "/a/b/img_000.tif"
         mock_read_image_dimensions.return_value = [10, 11]
         mock_sample_fg = mock.create_autospec(FilenameGroup)
@@ -267,3 +277,45 @@ class ImageLoadDialogPresenterTest(unittest.TestCase):
         self.assertNotIn(FILE_TYPES.SAMPLE_LOG, lp.image_stacks.keys())
         self.assertNotIn(FILE_TYPES.FLAT_BEFORE_LOG, lp.image_stacks.keys())
         self.assertNotIn(FILE_TYPES.FLAT_AFTER_LOG, lp.image_stacks.keys())
+        self.assertIsNone(lp_sample.roi)
+        self.assertEqual(lp_sample.binning, 1)
+
+    @mock.patch("mantidimaging.gui.windows.image_load_dialog.presenter.FilenameGroup")
+    def test_get_parameters_crops_and_bins_every_stack(self, _):
+        type(self.fields["Sample"]).path = mock.PropertyMock(return_value=Path("/sample/tomo/tomo_0001.tiff"))
+        self.fields["Flat Before"].use.isChecked.return_value = True
+        type(self.fields["Flat Before"]).path = mock.PropertyMock(
+            return_value=Path("/sample/flat_before/flat_before_0001.tiff"))
+        self.v.roi.text.return_value = "2, 4, 50, 60"
+        self.v.binning.value.return_value = 4
+
+        lp = self.p.get_parameters()
+
+        for file_type in [FILE_TYPES.SAMPLE, FILE_TYPES.FLAT_BEFORE]:
+            self.assertEqual(lp.image_stacks[file_type].roi, SensibleROI(2, 4, 50, 60))
+            self.assertEqual(lp.image_stacks[file_type].binning, 4)
+
+    @parameterized.expand([("empty", "", None), ("list", "1, 2, 3, 4", SensibleROI(1, 2, 3, 4)),
+                           ("brackets", "[0,0,10,20]", SensibleROI(0, 0, 10, 20))])
+    def test_get_roi(self, _, text, expected):
+        self.v.roi.text.return_value = text
+
+        self.assertEqual(self.p.get_roi(), expected)
+
+    @parameterized.expand([("too_few", "1, 2, 3"), ("not_numbers", "a, b, c, d")])
+    def test_get_roi_invalid_raises(self, _, text):
+        self.v.roi.text.return_value = text
+
+        with self.assertRaisesRegex(ValueError, "The crop ROI is invalid"):
+            self.p.get_roi()
+
+    @parameterized.expand([("whole", "", 1, (10, 12)), ("binned", "", 4, (2, 3)), ("cropped", "2, 1, 10, 9", 2, (4, 4)),
+                           ("invalid", "0, 0, 20, 20", 1, (10, 12))])
+    def test_update_sample_shape(self, _, roi_text, binning, expected):
+        self.p.sample_shape = (10, 12)
+        self.v.roi.text.return_value = roi_text
+        self.v.binning.value.return_value = binning
+
+        self.p.update_sample_shape()
+
+        self.fields["Sample"].update_shape.assert_called_once_with(expected, "float32")
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 
 from PyQt5.QtWidgets import QComboBox, QCheckBox, QTreeWidget, QTreeWidgetItem, QPushButton, QSizePolicy, \
-    QHeaderView, QSpinBox, QFileDialog, QDialogButtonBox, QWidget
+    QHeaderView, QSpinBox, QFileDialog, QDialogButtonBox, QWidget, QLineEdit
 
 from mantidimaging.core.io.loader.loader import DEFAULT_PIXEL_SIZE, DEFAULT_IS_SINOGRAM, DEFAULT_PIXEL_DEPTH, \
     LoadingParameters
@@ -20,6 +20,8 @@ class ImageLoadDialog(BaseDialogView):
     images_are_sinograms: QCheckBox
 
     pixelSize: QSpinBox
+    roi: QLineEdit
+    binning: QSpinBox
 
     step_preview: QPushButton
     step_all: QPushButton
@@ -45,6 +47,9 @@ class ImageLoadDialog(BaseDialogView):
 
         self.step_all.clicked.connect(self._set_all_step)
         self.step_preview.clicked.connect(self._set_preview_step)
+        self.roi.editingFinished.connect(self.presenter.update_sample_shape)
+        self.binning.valueChanged.connect(self.presenter.update_sample_shape)
+        self.pixel_bit_depth.currentTextChanged.connect(self.presenter.update_sample_shape)
         # if accepted load the stack
         self.accepted.connect(self.parent_view.execute_image_file_load)
         self.ok_button = self.buttonBox.button(QDialogButtonBox.Ok)
@@ -58,9 +63,6 @@ class ImageLoadDialog(BaseDialogView):
         self.pixelSize.setValue(DEFAULT_PIXEL_SIZE)
         self.pixel_bit_depth.setCurrentText(DEFAULT_PIXEL_DEPTH)
 
-        self.pixel_bit_depth.hide()
-        self.label_pixel_bit_depth.hide()
-
     def create_file_input(self, position: int, file_info: FILE_TYPES) -> Field:
         section: QTreeWidgetItem = self.tree.topLevelItem(position)
 
@@ -14,6 +14,8 @@ from mantidimaging.gui.utility import select_directory
 if TYPE_CHECKING:
     from mantidimaging.gui.windows.main.presenter import StackId
 
+MULTI_PAGE_FORMATS = ['tif', 'tiff']
+
 
 def sort_by_tomo_and_recon(stack_id: StackId):
     if "Recon" in stack_id.name:
@@ -40,6 +42,8 @@ class ImageSaveDialog(BaseDialogView):
 
         # set the default to tiff
         self.formats.setCurrentIndex(formats.index(DEFAULT_IO_FILE_FORMAT))
+        # only TIFF files can hold several images
+        self.formats.currentTextChanged.connect(lambda text: self.multiPage.setEnabled(text in MULTI_PAGE_FORMATS))
 
         if stack_list:  # we will just show an empty drop down if no stacks
             # Sort stacknames using Recon and Tomo as preference
@@ -77,3 +81,6 @@ class ImageSaveDialog(BaseDialogView):
 
     def pixel_depth(self) -> str:
         return str(self.pixelDepth.currentText())
+
+    def multi_page(self) -> bool:
+        return self.multiPage.isEnabled() and self.multiPage.isChecked()
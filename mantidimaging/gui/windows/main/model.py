@@ -41,10 +41,12 @@ class MainWindowModel:
         def load(im_param):
             return loader.load_stack_from_image_params(im_param, progress, dtype=parameters.dtype)
 
-        sample = load(parameters.image_stacks[FILE_TYPES.SAMPLE])
+        sample_params = parameters.image_stacks[FILE_TYPES.SAMPLE]
+        sample = load(sample_params)
         ds = StrictDataset(sample)
         sample._is_sinograms = parameters.sinograms
-        sample.pixel_size = parameters.pixel_size
+        # Binned pixels cover several pixels of the detector
+        sample.pixel_size = parameters.pixel_size * sample_params.binning
 
         for file_type in [
                 FILE_TYPES.FLAT_BEFORE,
@@ -68,7 +70,15 @@ class MainWindowModel:
         self.datasets[sd.id] = sd
         return sd
 
-    def do_images_saving(self, images_id, output_dir, name_prefix, image_format, overwrite, pixel_depth, progress):
+    def do_images_saving(self,
+                         images_id,
+                         output_dir,
+                         name_prefix,
+                         image_format,
+                         overwrite,
+                         pixel_depth,
+                         progress,
+                         multi_page=False):
         images = self.get_images_by_uuid(images_id)
         if images is None:
             self.raise_error_when_images_not_found(images_id)
@@ -78,13 +88,19 @@ class MainWindowModel:
                                      overwrite_all=overwrite,
                                      out_format=image_format,
                                      pixel_depth=pixel_depth,
-                                     progress=progress)
+                                     progress=progress,
+                                     multi_page=multi_page)
         images.filenames = filenames
         return True
 
-    def do_nexus_saving(self, dataset_id: uuid.UUID, path: str, sample_name: str, save_as_float: bool) -> bool | None:
+    def do_nexus_saving(self,
+                        dataset_id: uuid.UUID,
+                        path: str,
+                        sample_name: str,
+                        save_as_float: bool,
+                        compression: str = "none") -> bool | None:
         if dataset_id in self.datasets and isinstance(self.datasets[dataset_id], StrictDataset):
-            saver.nexus_save(self.datasets[dataset_id], path, sample_name, save_as_float)  # type: ignore
+            saver.nexus_save(self.datasets[dataset_id], path, sample_name, save_as_float, compression)  # type: ignore
             return True
         else:
             raise RuntimeError(f"Failed to get StrictDataset with ID {dataset_id}")
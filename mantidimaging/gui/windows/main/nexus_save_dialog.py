@@ -4,9 +4,10 @@ from __future__ import annotations
 import os
 import uuid
 
-from PyQt5.QtWidgets import QDialogButtonBox, QFileDialog, QRadioButton
+from PyQt5.QtWidgets import QComboBox, QDialogButtonBox, QFileDialog, QRadioButton
 
 from mantidimaging.core.data.dataset import StrictDataset
+from mantidimaging.core.io.saver import NEXUS_COMPRESSION
 from mantidimaging.gui.mvp_base import BaseDialogView
 
 NXS_EXT = ".nxs"
@@ -17,6 +18,7 @@ class NexusSaveDialog(BaseDialogView):
     selected_dataset: uuid.UUID | None
     floatRadioButton: QRadioButton
     intRadioButton: QRadioButton
+    compressionComboBox: QComboBox
 
     def __init__(self, parent, dataset_list: list[StrictDataset]):
         super().__init__(parent, 'gui/ui/nexus_save_dialog.ui')
@@ -26,6 +28,7 @@ class NexusSaveDialog(BaseDialogView):
         self.savePath.textChanged.connect(self.enable_save)
         self.savePath.editingFinished.connect(self._check_extension)
         self.sampleNameLineEdit.textChanged.connect(self.enable_save)
+        self.compressionComboBox.addItems(list(NEXUS_COMPRESSION))
 
         self.dataset_uuids: list[uuid.UUID] = []
         self._create_dataset_lists(dataset_list)
@@ -68,3 +71,7 @@ class NexusSaveDialog(BaseDialogView):
     @property
     def save_as_float(self) -> bool:
         return self.floatRadioButton.isChecked()
+
+    @property
+    def compression(self) -> str:
+        return self.compressionComboBox.currentText()
@@ -131,7 +131,11 @@ class MainWindowPresenter(BasePresenter):
 
     def load_image_files(self) -> None:
         assert self.view.image_load_dialog is not None
-        par = self.view.image_load_dialog.get_parameters()
+        try:
+            par = self.view.image_load_dialog.get_parameters()
+        except ValueError as error:
+            self.view.show_error_dialog(str(error))
+            return
 
         start_async_task_view(self.view, self.model.do_load_dataset, self._on_dataset_load_done, {'parameters': par})
 
@@ -151,7 +155,8 @@ class MainWindowPresenter(BasePresenter):
                                   'dataset_id': dataset_id,
                                   'path': self.view.nexus_save_dialog.save_path(),
                                   'sample_name': self.view.nexus_save_dialog.sample_name(),
-                                  'save_as_float': self.view.nexus_save_dialog.save_as_float
+                                  'save_as_float': self.view.nexus_save_dialog.save_as_float,
+                                  'compression': self.view.nexus_save_dialog.compression
                               },
                               busy=True)
 
@@ -388,7 +393,8 @@ class MainWindowPresenter(BasePresenter):
             'name_prefix': self.view.image_save_dialog.name_prefix(),
             'image_format': self.view.image_save_dialog.image_format(),
             'overwrite': self.view.image_save_dialog.overwrite(),
-            'pixel_depth': self.view.image_save_dialog.pixel_depth()
+            'pixel_depth': self.view.image_save_dialog.pixel_depth(),
+            'multi_page': self.view.image_save_dialog.multi_page()
         }
         start_async_task_view(self.view, self.model.do_images_saving, self._on_save_done, kwargs)
 
@@ -43,3 +43,14 @@ class SaveDialogQtTest(unittest.TestCase):
         self.assertEqual(mwsd.stack_uuids[0], stack_list[4].id)
         # the Tomo stack is 2nd choice
         self.assertEqual(mwsd.stack_uuids[1], stack_list[3].id)
+
+    def test_multi_page_only_for_tiff(self):
+        mwsd = ImageSaveDialog(None, [])
+        mwsd.multiPage.setChecked(True)
+        self.assertTrue(mwsd.multi_page())
+
+        mwsd.formats.setCurrentText("fits")
+        self.assertFalse(mwsd.multi_page())
+
+        mwsd.formats.setCurrentText("tiff")
+        self.assertTrue(mwsd.multi_page())
@@ -72,7 +72,9 @@ class MainWindowModelTest(unittest.TestCase):
                                           progress=progress_mock,
                                           dtype=lp.dtype,
                                           indices=None,
-                                          log_file=log_file_mock)
+                                          log_file=log_file_mock,
+                                          roi=None,
+                                          binning=1)
 
     @mock.patch('mantidimaging.core.io.loader.loader.load')
     def test_do_load_stack_sample_indicies(self, load_mock: mock.Mock):
@@ -93,7 +95,9 @@ class MainWindowModelTest(unittest.TestCase):
                                           progress=progress_mock,
                                           dtype=lp.dtype,
                                           indices=indices,
-                                          log_file=None)
+                                          log_file=None,
+                                          roi=None,
+                                          binning=1)
 
     @mock.patch('mantidimaging.gui.windows.main.model.loader.load_stack_from_image_params')
     @mock.patch('mantidimaging.gui.windows.main.model.StrictDataset')
@@ -294,7 +298,8 @@ class MainWindowModelTest(unittest.TestCase):
                                           overwrite_all=overwrite,
                                           out_format=image_format,
                                           pixel_depth=pixel_depth,
-                                          progress=progress)
+                                          progress=progress,
+                                          multi_page=False)
         self.assertListEqual(images_mock.filenames, filenames)  # type: ignore
         assert result
 
@@ -525,8 +530,8 @@ class MainWindowModelTest(unittest.TestCase):
         sample_name = "sample-name"
         save_as_float = True
 
-        self.model.do_nexus_saving(sd.id, path, sample_name, save_as_float)
-        nexus_save.assert_called_once_with(sd, path, sample_name, save_as_float)
+        self.model.do_nexus_saving(sd.id, path, sample_name, save_as_float, "lzf")
+        nexus_save.assert_called_once_with(sd, path, sample_name, save_as_float, "lzf")
 
     def test_is_dataset_strict_returns_true(self):
         strict_ds = StrictDataset(generate_images())
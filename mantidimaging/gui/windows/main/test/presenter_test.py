@@ -116,6 +116,15 @@ class MainWindowPresenterTest(unittest.TestCase):
         start_async_mock.assert_called_once_with(self.view, self.presenter.model.do_load_dataset,
                                                  self.presenter._on_dataset_load_done, {'parameters': parameters_mock})
 
+    @mock.patch("mantidimaging.gui.windows.main.presenter.start_async_task_view")
+    def test_dataset_stack_invalid_parameters(self, start_async_mock: mock.Mock):
+        self.view.image_load_dialog.get_parameters.side_effect = ValueError("The crop ROI is invalid")
+
+        self.presenter.load_image_files()
+
+        self.view.show_error_dialog.assert_called_once_with("The crop ROI is invalid")
+        start_async_mock.assert_not_called()
+
     @mock.patch("mantidimaging.gui.windows.main.presenter.start_async_task_view")
     def test_load_stack(self, start_async_mock: mock.Mock):
         file_path = mock.Mock()
@@ -759,6 +768,7 @@ class MainWindowPresenterTest(unittest.TestCase):
         nexus_save_dialog_mock.sample_name.return_value = sample_name = "sample-name"
         nexus_save_dialog_mock.selected_dataset = dataset_id = "dataset-id"
         nexus_save_dialog_mock.save_as_float = save_as_float = False
+        nexus_save_dialog_mock.compression = compression = "gzip"
 
         self.presenter.notify(Notification.NEXUS_SAVE)
         start_async_mock.assert_called_once_with(self.presenter.view,
@@ -767,7 +777,8 @@ class MainWindowPresenterTest(unittest.TestCase):
                                                      'dataset_id': dataset_id,
                                                      'path': save_path,
                                                      'sample_name': sample_name,
-                                                     'save_as_float': save_as_float
+                                                     'save_as_float': save_as_float,
+                                                     'compression': compression
                                                  },
                                                  busy=True)
 
@@ -2,6 +2,7 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 import enum
+import io
 import traceback
 from enum import auto, Enum
 from logging import getLogger
@@ -13,9 +14,10 @@ from mantidimaging.core.data.reconlist import ReconList
 
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.data.dataset import StrictDataset
-from mantidimaging.core.io.utility import NEXUS_PROCESSED_DATA_PATH
-from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.io.loader.nexus_loader import LazyNexusImages, read_images
+from mantidimaging.core.io.utility import NEXUS_PROCESSED_DATA_PATH, NEXUS_PROCESSED_METADATA_PATH
 from mantidimaging.core.utility.data_containers import ProjectionAngles
+from mantidimaging.core.utility.sensible_roi import SensibleROI
 
 if TYPE_CHECKING:
     from mantidimaging.gui.windows.nexus_load_dialog.view import NexusLoadDialog  # pragma: no cover
@@ -59,19 +61,25 @@ class NexusLoadPresenter:
     def __init__(self, view: NexusLoadDialog):
         self.view = view
         self.nexus_file = None
+        self.file_path = ""
         self.tomo_entry = None
         self.data = None
+        self.data_path = ""
+        self.data_shape: tuple[int, ...] = ()
         self.tomo_path = ""
         self.image_key_dataset = None
         self.rotation_angles = None
         self.title = ""
-        self.recon_data: list[np.ndarray] = []
+        self.recon_paths: list[str] = []
+        # The metadata and operation history saved with processed data, as json
+        self.processed_metadata: str | None = None
 
-        self.sample_array: np.ndarray | None = None
-        self.dark_before_array: np.ndarray | None = None
-        self.flat_before_array: np.ndarray | None = None
-        self.flat_after_array: np.ndarray | None = None
-        self.dark_after_array: np.ndarray | None = None
+        # Indices in the data of the images of each stack. The images are only read when the dataset is created.
+        self.sample_indices: np.ndarray | None = None
+        self.dark_before_indices: np.ndarray | None = None
+        self.flat_before_indices: np.ndarray | None = None
+        self.flat_after_indices: np.ndarray | None = None
+        self.dark_after_indices: np.ndarray | None = None
 
     def notify(self, n: Notification):
         try:
@@ -87,6 +95,7 @@ class NexusLoadPresenter:
         file_path = self.view.filePathLineEdit.text()
         try:
             with h5py.File(file_path, "r") as self.nexus_file:
+                self.file_path = file_path
                 self.tomo_entry = self._look_for_nxtomo_entry()
                 if self.tomo_entry is None:
                     return
@@ -94,6 +103,8 @@ class NexusLoadPresenter:
                 self.data = self._look_for_image_data_and_update_view()
                 if self.data is None:
                     return
+                self.data_path = self.data.name
+                self.data_shape = self.data.shape
 
                 self.image_key_dataset = self._look_for_tomo_data_and_update_view(IMAGE_KEY_PATH, 0)
                 if self.image_key_dataset is None:
@@ -178,6 +189,7 @@ class NexusLoadPresenter:
 
     def _look_for_image_data_and_update_view(self) -> h5py.Dataset | None:
         position = 2
+        self.processed_metadata = None
         dataset = self._look_for_tomo_data(DATA_PATH)
         if dataset is not None:
             self.view.set_data_found(position, True, self.tomo_path + "/" + DATA_PATH, dataset.shape)
@@ -187,6 +199,8 @@ class NexusLoadPresenter:
             if NEXUS_PROCESSED_DATA_PATH in self.nexus_file:
                 dataset = self.nexus_file[NEXUS_PROCESSED_DATA_PATH]["data"]
                 self.view.set_data_found(position, True, NEXUS_PROCESSED_DATA_PATH, dataset.shape)
+                if NEXUS_PROCESSED_METADATA_PATH in self.nexus_file:
+                    self.processed_metadata = self.nexus_file[NEXUS_PROCESSED_METADATA_PATH][()].decode("utf-8")
                 return dataset
 
         self._missing_data_error(DATA_PATH)
@@ -212,14 +226,15 @@ class NexusLoadPresenter:
 
     def _look_for_recon_entries(self):
         """
-        Tries to find recon entries in the NeXus file then stores the data in a list.
+        Tries to find recon entries in the NeXus file then stores the paths of their data in a list. The recons are
+        read as they are viewed.
         """
         assert self.nexus_file is not None
         for key in self.nexus_file.keys():
             if DEFINITION in self.nexus_file[key].keys():
                 if np.array(self.nexus_file[key][DEFINITION]).tobytes().decode("utf-8") == NXTOMOPROC:
                     nexus_recon = self.nexus_file[key]
-                    self.recon_data.append(np.array(nexus_recon["data"]["data"]))
+                    self.recon_paths.append(nexus_recon["data"]["data"].name)
 
     def _look_for_tomo_data(self, entry_path: str) -> h5py.Group | h5py.Dataset | None:
         """
@@ -237,36 +252,36 @@ class NexusLoadPresenter:
         """
         Looks for the projection and dark/flat before/after images and update the information on the view.
         """
-        self.sample_array = self._get_images(ImageKeys.Projections)
-        self.view.set_images_found(0, self.sample_array.size != 0, self.sample_array.shape)
-        if self.sample_array.size == 0:
+        self.sample_indices = self._get_image_indices(ImageKeys.Projections)
+        self.view.set_images_found(0, self.sample_indices.size != 0, self._images_shape(self.sample_indices))
+        if self.sample_indices.size == 0:
             self._missing_data_error("projection images")
             self.view.disable_ok_button()
             return
-        self.view.set_projections_increment(self.sample_array.shape[0])
+        self.view.set_projections_increment(self.sample_indices.size)
+        self.view.set_rows(self.data_shape[1])
 
-        self.flat_before_array = self._get_images(ImageKeys.FlatField, True)
-        self.view.set_images_found(1, self.flat_before_array.size != 0, self.flat_before_array.shape)
+        self.flat_before_indices = self._get_image_indices(ImageKeys.FlatField, True)
+        self.view.set_images_found(1, self.flat_before_indices.size != 0, self._images_shape(self.flat_before_indices))
 
-        self.flat_after_array = self._get_images(ImageKeys.FlatField, False)
-        self.view.set_images_found(2, self.flat_after_array.size != 0, self.flat_after_array.shape)
+        self.flat_after_indices = self._get_image_indices(ImageKeys.FlatField, False)
+        self.view.set_images_found(2, self.flat_after_indices.size != 0, self._images_shape(self.flat_after_indices))
 
-        self.dark_before_array = self._get_images(ImageKeys.DarkField, True)
-        self.view.set_images_found(3, self.dark_before_array.size != 0, self.dark_before_array.shape)
+        self.dark_before_indices = self._get_image_indices(ImageKeys.DarkField, True)
+        self.view.set_images_found(3, self.dark_before_indices.size != 0, self._images_shape(self.dark_before_indices))
 
-        self.dark_after_array = self._get_images(ImageKeys.DarkField, False)
-        self.view.set_images_found(4, self.dark_after_array.size != 0, self.dark_after_array.shape)
+        self.dark_after_indices = self._get_image_indices(ImageKeys.DarkField, False)
+        self.view.set_images_found(4, self.dark_after_indices.size != 0, self._images_shape(self.dark_after_indices))
 
-    def _get_images(self, image_key_number: ImageKeys, before: bool | None = None) -> np.ndarray:
+    def _get_image_indices(self, image_key_number: ImageKeys, before: bool | None = None) -> np.ndarray:
         """
-        Retrieve images from the data based on an image key number.
+        Find the indices in the data of the images with an image key number.
         :param image_key_number: The image key number.
         :param before: True if the function should return before images, False if the function should return after
                        images. Ignored when getting projection images.
-        :return: The set of images that correspond with a given image key.
+        :return: The increasing indices of the images that correspond with a given image key.
         """
         assert self.image_key_dataset is not None
-        assert self.data is not None
         if image_key_number is ImageKeys.Projections:
             indices = self.image_key_dataset[...] == image_key_number.value
         else:
@@ -275,8 +290,10 @@ class NexusLoadPresenter:
             else:
                 indices = self.image_key_dataset[:] == image_key_number.value
                 indices[:self.image_key_dataset.size // 2] = False
-        # Shouldn't have to use numpy.where but h5py doesn't allow indexing with bool arrays currently
-        return self.data[np.where(indices)]
+        return np.flatnonzero(indices)
+
+    def _images_shape(self, indices: np.ndarray) -> tuple[int, ...]:
+        return (indices.size, ) + self.data_shape[1:]
 
     def _find_data_title(self) -> str:
         """
@@ -290,44 +307,73 @@ class NexusLoadPresenter:
             logger.info("A valid title couldn't be found. Using 'NeXus Data' instead.")
             return "NeXus Data"
 
+    def _image_roi(self) -> SensibleROI | None:
+        """
+        The region of the images selected by the rows spin boxes.
+        :return: The region, or None if all of the rows are selected.
+        """
+        top, bottom = self.view.row_start_widget.value(), self.view.row_stop_widget.value()
+        if top == 0 and bottom == self.data_shape[1]:
+            return None
+        return SensibleROI(0, top, self.data_shape[2], bottom)
+
     def get_dataset(self) -> tuple[StrictDataset, str]:
         """
         Create a LoadingDataset and title using the arrays that have been retrieved from the NeXus file.
         :return: A tuple containing the Dataset and the data title string.
         """
-        sample_images = self._create_sample_images()
+        assert self.flat_before_indices is not None and self.flat_after_indices is not None
+        assert self.dark_before_indices is not None and self.dark_after_indices is not None
+        # The flat and dark stacks are read straight from the file into their shared arrays. The projections and
+        # recons are read as they are viewed, and each of them opens the file itself, which it closes once it is
+        # loaded by an operation or deleted. Only the selected rows of every stack are read, from the chunks that
+        # contain them.
+        roi = self._image_roi()
+        sample_images = self._create_sample_images(roi)
         sample_images.name = self.title
-        assert self.flat_before_array is not None and self.flat_after_array is not None
-        assert self.dark_before_array is not None and self.dark_after_array is not None
+        with h5py.File(self.file_path, "r") as nexus_file:
+            data = nexus_file[self.data_path]
+            flat_before = self._create_images_if_required(data, self.flat_before_indices, "Flat Before",
+                                                          ImageKeys.FlatField.value, roi)
+            flat_after = self._create_images_if_required(data, self.flat_after_indices, "Flat After",
+                                                         ImageKeys.FlatField.value, roi)
+            dark_before = self._create_images_if_required(data, self.dark_before_indices, "Dark Before",
+                                                          ImageKeys.DarkField.value, roi)
+            dark_after = self._create_images_if_required(data, self.dark_after_indices, "Dark After",
+                                                         ImageKeys.DarkField.value, roi)
         ds = StrictDataset(sample=sample_images,
-                           flat_before=self._create_images_if_required(self.flat_before_array, "Flat Before",
-                                                                       ImageKeys.FlatField.value),
-                           flat_after=self._create_images_if_required(self.flat_after_array, "Flat After",
-                                                                      ImageKeys.FlatField.value),
-                           dark_before=self._create_images_if_required(self.dark_before_array, "Dark Before",
-                                                                       ImageKeys.DarkField.value),
-                           dark_after=self._create_images_if_required(self.dark_after_array, "Dark After",
-                                                                      ImageKeys.DarkField.value),
+                           flat_before=flat_before,
+                           flat_after=flat_after,
+                           dark_before=dark_before,
+                           dark_after=dark_after,
                            name=self.title)
 
-        if self.recon_data:
-            recon_list = self._create_recon_list()
-            ds.recons = recon_list
+        if self.recon_paths:
+            ds.recons = self._create_recon_list()
 
         return ds, self.title
 
-    def _create_sample_images(self):
+    def _create_sample_images(self, roi: SensibleROI | None = None):
         """
-        Creates the sample ImageStack object.
+        Creates the sample ImageStack object, as a lazy view of the images dataset in the NeXus file.
+        :param roi: The region of the images to read, or None for the whole images.
         :return: An ImageStack object containing projections. If given, projection angles, pixel size, and 180deg are
             also set.
         """
-        assert self.sample_array is not None
+        assert self.sample_indices is not None
 
         # Create sample array and ImageStack object
-        self.sample_array = self.sample_array[self.view.start_widget.value():self.view.stop_widget.value():self.view.
-                                              step_widget.value()]
-        sample_images = self._create_images(self.sample_array, "Projections")
+        sample_indices = self.sample_indices[self.view.start_widget.value():self.view.stop_widget.value():self.view.
+                                             step_widget.value()]
+        nexus_file = h5py.File(self.file_path, "r")
+        sample_images = ImageStack(
+            LazyNexusImages(nexus_file[self.data_path],
+                            sample_indices,
+                            self.view.pixelDepthComboBox.currentText(),
+                            roi=roi,
+                            nexus_file=nexus_file), [f"Projections {self.title}"])
+        if self.processed_metadata is not None:
+            sample_images.load_metadata(io.StringIO(self.processed_metadata))
 
         # Set attributes
         sample_images.pixel_size = int(self.view.pixelSizeSpinBox.value())
@@ -338,29 +384,41 @@ class NexusLoadPresenter:
                                                    view.step_widget.value()]))
         return sample_images
 
-    def _create_images(self, data_array: np.ndarray, name: str) -> ImageStack:
+    def _create_images(self,
+                       data: h5py.Dataset,
+                       indices: np.ndarray,
+                       name: str,
+                       roi: SensibleROI | None = None) -> ImageStack:
         """
-        Use a data array to create an ImageStack object.
-        :param data_array: The images array obtained from the NeXus file.
+        Read images from the NeXus file to create an ImageStack object.
+        :param data: The images dataset in the NeXus file.
+        :param indices: The indices of the images in the dataset.
         :param name: The name of the image dataset.
+        :param roi: The region of the images to read, or None for the whole images.
         :return: An ImageStack object.
         """
-        data = pu.create_array(data_array.shape, self.view.pixelDepthComboBox.currentText())
-        data.array[:] = data_array
-        return ImageStack(data, [f"{name} {self.title}"])
-
-    def _create_images_if_required(self, data_array: np.ndarray, name: str, image_key: int) -> ImageStack | None:
+        images = read_images(data, indices, self.view.pixelDepthComboBox.currentText(), roi=roi)
+        return ImageStack(images, [f"{name} {self.title}"])
+
+    def _create_images_if_required(self,
+                                   data: h5py.Dataset,
+                                   indices: np.ndarray,
+                                   name: str,
+                                   image_key: int,
+                                   roi: SensibleROI | None = None) -> ImageStack | None:
         """
         Create the ImageStack objects if the corresponding data was found in the NeXus file, and the user checked the
         "Use?" checkbox.
-        :param data_array: The images data array.
+        :param data: The images dataset in the NeXus file.
+        :param indices: The indices of the images in the dataset.
         :param name: The name of the images.
         :param image_key: The image key index for the image type.
+        :param roi: The region of the images to read, or None for the whole images.
         :return: An ImageStack object or None.
         """
-        if data_array.size == 0 or not self.view.checkboxes[name].isChecked():
+        if indices.size == 0 or not self.view.checkboxes[name].isChecked():
             return None
-        image_stack = self._create_images(data_array, name)
+        image_stack = self._create_images(data, indices, name, roi)
         if image_stack is not None:
             projection_angles = self._read_rotation_angles(image_key, "Before" in name)
             if projection_angles is not None:
@@ -369,10 +427,17 @@ class NexusLoadPresenter:
 
     def _create_recon_list(self) -> ReconList:
         """
-        Uses the array of recon data extracted from the NeXus file to create a ReconList object.
+        Creates a ReconList object of lazy views of the recon data found in the NeXus file.
         :return: The ReconList object containing recons from the NeXus file.
         """
         recon_list = ReconList()
-        for recon_array in self.recon_data:
-            recon_list.append(ImageStack(recon_array))
+        for recon_path in self.recon_paths:
+            nexus_file = h5py.File(self.file_path, "r")
+            recon_data = nexus_file[recon_path]
+            recon_list.append(
+                ImageStack(
+                    LazyNexusImages(recon_data,
+                                    np.arange(recon_data.shape[0]),
+                                    recon_data.dtype.newbyteorder("="),
+                                    nexus_file=nexus_file)))
         return recon_list
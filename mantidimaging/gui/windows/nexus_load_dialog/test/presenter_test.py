@@ -2,14 +2,17 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import json
 import unittest
 from unittest import mock
 
 import h5py
 import numpy
 import numpy as np
+import numpy.testing as npt
 
 from mantidimaging.core.io.saver import NEXUS_PROCESSED_DATA_PATH
+from mantidimaging.core.io.utility import NEXUS_PROCESSED_METADATA_PATH
 from mantidimaging.test_helpers.unit_test_helper import generate_images, gen_img_numpy_rand
 
 from mantidimaging.core.data.dataset import StrictDataset
@@ -57,6 +60,8 @@ class NexusLoaderTest(unittest.TestCase):
         self.view.start_widget.value.return_value = 0
         self.view.stop_widget.value.return_value = 2
         self.view.step_widget.value.return_value = 1
+        self.view.row_start_widget.value.return_value = 0
+        self.view.row_stop_widget.value.return_value = 10
         self.expected_pixel_size = int(pixel_size)
 
         self.image_types = ["Projections", "Flat Before", "Flat After", "Dark Before", "Dark After"]
@@ -72,7 +77,9 @@ class NexusLoaderTest(unittest.TestCase):
 
         self.nexus_load_patcher = mock.patch("mantidimaging.gui.windows.nexus_load_dialog.presenter.h5py.File")
         self.nexus_load_mock = self.nexus_load_patcher.start()
-        self.nexus_load_mock.return_value = self.nexus
+        # The file is opened again to read the images, so closing it should not discard the in memory file
+        self.nexus_load_mock.return_value.__enter__.return_value = self.nexus
+        self.nexus_load_mock.return_value.__getitem__.side_effect = self.nexus.__getitem__
 
     def tearDown(self) -> None:
         self.nexus.close()
@@ -355,27 +362,81 @@ class NexusLoaderTest(unittest.TestCase):
         self.assertIsNone(ds.dark_after._projection_angles)
         self.assertIsNone(ds.flat_after._projection_angles)
 
-    def test_recon_entry_found_in_file(self):
+    def _create_recon_entry(self, name: str) -> np.ndarray:
         recon = generate_images()
-        recon.name = "Recon"
 
-        recon_entry = self.nexus.create_group(recon.name)
+        recon_entry = self.nexus.create_group(name)
         recon_entry.attrs["NX_class"] = numpy.bytes_("NXentry")
-        recon_entry.create_dataset("title", data=numpy.bytes_(recon.name))
+        recon_entry.create_dataset("title", data=numpy.bytes_(name))
         recon_entry.create_dataset("definition", data=numpy.bytes_("NXtomoproc"))
         data = recon_entry.create_group("data")
         data.attrs["NX_class"] = numpy.bytes_("NXdata")
         data.create_dataset("data", shape=recon.data.shape, dtype="float16")
         data["data"][:] = recon.data
+        return data["data"][:]
+
+    def test_recon_entry_found_in_file(self):
+        self._create_recon_entry("Recon")
 
         self.nexus_loader._look_for_recon_entries()
-        self.assertEqual(len(self.nexus_loader.recon_data), 1)
+        self.assertEqual(self.nexus_loader.recon_paths, ["/Recon/data/data"])
 
     def test_get_dataset_creates_recon_list(self):
-        self.nexus_loader.recon_data = [generate_images(), generate_images()]
+        recons = [self._create_recon_entry("Recon"), self._create_recon_entry("Recon_2")]
         self.nexus_loader.scan_nexus_file()
         ds, _ = self.nexus_loader.get_dataset()
         self.assertEqual(len(ds.recons), 2)
+        for recon, expected in zip(ds.recons, recons, strict=True):
+            self.assertTrue(recon.is_lazy)
+            npt.assert_array_equal(recon.projection(1), expected[1])
+            self.assertEqual(recon.dtype, np.float16)
+
+    def test_get_dataset_reads_projections_lazily(self):
+        self.nexus_loader.scan_nexus_file()
+        ds, _ = self.nexus_loader.get_dataset()
+
+        self.assertTrue(ds.sample.is_lazy)
+        self.assertFalse(ds.flat_before.is_lazy)
+        npt.assert_array_equal(ds.sample.projection(1), self.sample[1].astype(np.float32))
+        npt.assert_array_equal(ds.sample.sino(3), self.sample[:, 3].astype(np.float32))
+        self.assertTrue(ds.sample.is_lazy)
+
+        npt.assert_array_equal(ds.sample.data, self.sample.astype(np.float32))
+        self.assertFalse(ds.sample.is_lazy)
+
+    def test_lazy_projections_close_their_file_when_loaded(self):
+        self.nexus_loader.scan_nexus_file()
+        ds, _ = self.nexus_loader.get_dataset()
+        self.nexus_load_mock.return_value.close.assert_not_called()
+
+        ds.sample.load_lazy_data()
+
+        self.nexus_load_mock.return_value.close.assert_called_once()
+
+    def test_get_dataset_reads_selected_rows(self):
+        self.view.row_start_widget.value.return_value = 3
+        self.view.row_stop_widget.value.return_value = 7
+        self.nexus_loader.scan_nexus_file()
+        ds, _ = self.nexus_loader.get_dataset()
+
+        self.view.set_rows.assert_called_once_with(10)
+        npt.assert_array_equal(ds.sample.sino(1), self.sample[:, 4].astype(np.float32))
+        npt.assert_array_equal(ds.sample.data, self.sample[:, 3:7].astype(np.float32))
+        npt.assert_array_equal(ds.flat_before.data, self.flat_before[:, 3:7].astype(np.float32))
+        npt.assert_array_equal(ds.dark_after.data, self.dark_after[:, 3:7].astype(np.float32))
+
+    def test_get_dataset_restores_processed_metadata(self):
+        processed_data = self.nexus.create_group(NEXUS_PROCESSED_DATA_PATH)
+        processed_data["data"] = self.tomo_entry[DATA_PATH]
+        del self.tomo_entry[DATA_PATH]
+        metadata = {"operation_history": [{"name": "MedianFilter", "kwargs": {"size": 3}}]}
+        self.nexus.create_dataset(NEXUS_PROCESSED_METADATA_PATH, data=np.bytes_(json.dumps(metadata)))
+
+        self.nexus_loader.scan_nexus_file()
+        ds, _ = self.nexus_loader.get_dataset()
+
+        self.assertEqual(ds.sample.metadata["operation_history"], metadata["operation_history"])
+        self.assertIsNone(ds.flat_before.metadata.get("operation_history"))
 
     def test_look_for_image_data_and_update_view_with_nonprocessed_file(self):
         self.nexus_loader.tomo_entry = self.tomo_entry
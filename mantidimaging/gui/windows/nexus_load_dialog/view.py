@@ -73,6 +73,26 @@ class NexusLoadDialog(BaseDialogView):
         self.tree.setItemWidget(child, 2, self.increment_widget)
         self.tree.setItemWidget(child, 0, QLabel("Indices"))
 
+        # The rows of every stack to read, for working on a subset of the sinograms
+        self.row_start_widget = QSpinBox()
+        self.row_stop_widget = QSpinBox()
+        self.row_start_widget.setMinimum(0)
+        self.row_stop_widget.setMinimum(1)
+        self.row_stop_widget.valueChanged.connect(lambda value: self.row_start_widget.setMaximum(value - 1))
+
+        self.rows_widget = QWidget()
+        h_layout = QHBoxLayout()
+        h_layout.addWidget(QLabel("Start"))
+        h_layout.addWidget(self.row_start_widget)
+        h_layout.addWidget(QLabel("Stop"))
+        h_layout.addWidget(self.row_stop_widget)
+        self.rows_widget.setLayout(h_layout)
+        self.rows_widget.setEnabled(False)
+
+        rows_item = QTreeWidgetItem(section)
+        self.tree.setItemWidget(rows_item, 0, QLabel("Rows"))
+        self.tree.setItemWidget(rows_item, 2, self.rows_widget)
+
         self.accepted.connect(self.parent_view.execute_nexus_load)
 
         self.previewPushButton.clicked.connect(self._set_preview_step)
@@ -174,6 +194,17 @@ class NexusLoadDialog(BaseDialogView):
 
         self.increment_widget.setEnabled(True)
 
+    def set_rows(self, n_rows: int) -> None:
+        """
+        Set the properties of the rows spin boxes, and select all of the rows.
+        :param n_rows: The number of rows in the images.
+        """
+        self.row_stop_widget.setMaximum(n_rows)
+        self.row_stop_widget.setValue(n_rows)
+        self.row_start_widget.setValue(0)
+
+        self.rows_widget.setEnabled(True)
+
     def show_exception(self, msg: str, traceback) -> None:
         """
         Show an error about an exception.
@@ -8,6 +8,7 @@ from collections.abc import Callable
 
 from mantidimaging.core.operations.base_filter import FilterGroup
 from mantidimaging.core.operations.loader import load_filter_packages
+from mantidimaging.core.parallel.accountant import accountant
 from mantidimaging.gui.dialogs.async_task import start_async_task_view
 from mantidimaging.gui.mvp_base import BaseMainWindowView
 
@@ -127,7 +128,9 @@ class FiltersWindowModel:
         # Run filter
         exec_func = self.selected_filter.execute_wrapper(**input_kwarg_widgets)
         exec_func.keywords["progress"] = progress
-        exec_func(images)
+        # Refuse to start if the filter's peak memory will not fit, rather than failing part way through
+        with accountant.reserve(self.selected_filter.peak_memory(images, **exec_func.keywords)):
+            exec_func(images)
         # store the executed filter in history if it executed successfully
         images.record_operation(
             self.selected_filter.__name__,  # type: ignore
@@ -21,6 +21,7 @@ from ...utility.qt_helpers import populate_menu
 if TYPE_CHECKING:
     from mantidimaging.gui.windows.main import MainWindowView  # noqa:F401   # pragma: no cover
     import numpy as np
+    from mantidimaging.core.io.loader.nexus_loader import LazyNexusImages
 
 
 class StackVisualiserView(QDockWidget):
@@ -33,8 +34,8 @@ class StackVisualiserView(QDockWidget):
 
     def __init__(self, parent: MainWindowView, images: ImageStack):
         # enforce not showing a single image
-        assert images.data.ndim == 3, \
-            f"Data does NOT have 3 dimensions! Dimensions found: {images.data.ndim}"
+        assert images.display_data.ndim == 3, \
+            f"Data does NOT have 3 dimensions! Dimensions found: {images.display_data.ndim}"
 
         # We set the main window as the parent, the effect is the same as
         # having no parent, the window will be inside the QDockWidget. If the
@@ -97,11 +98,11 @@ class StackVisualiserView(QDockWidget):
         return self.image_view.imageItem
 
     @image.setter
-    def image(self, to_display: np.ndarray):
+    def image(self, to_display: np.ndarray | LazyNexusImages):
         self.image_view.setImage(to_display)
 
     def set_image(self, image_stack: ImageStack):
-        self.image = image_stack.data
+        self.image = image_stack.display_data
         self.image_view.angles = image_stack.real_projection_angles()
 
     @property
@@ -14,6 +14,7 @@ from PyQt5 import QtCore
 from PyQt5.QtGui import QGuiApplication
 
 import mantidimaging.core.parallel.manager as pm
+from mantidimaging.core.parallel.accountant import accountant
 
 from mantidimaging import helper as h
 from mantidimaging.core.utility.command_line_arguments import CommandLineArguments
@@ -93,11 +94,18 @@ def main() -> None:
 
     settings = QSettings()
     process_count = settings.value("multiprocessing/process_count", 8, type=int)
-
-    from mantidimaging import gui
+    # A budget of 0 means that shared memory is only limited by the memory available on the system
+    memory_budget_gb = settings.value("multiprocessing/memory_budget_gb", 0, type=float)
+    if memory_budget_gb > 0:
+        accountant.budget = int(memory_budget_gb * 1024**3)
+    scratch_dir = settings.value("multiprocessing/scratch_dir", "", type=str)
+    if scratch_dir:
+        pm.scratch_dir = scratch_dir
+
+    from mantidimaging.gui.gui import execute
     try:
         pm.create_and_start_pool(process_count)
-        gui.execute()
+        execute()
         result = q_application.exec_()
     except BaseException as e:
         if sys.platform == 'linux':
@@ -15,6 +15,8 @@ from io import StringIO
 import pyfakefs.fake_filesystem_unittest
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.io.filenames import DirectoryIndex
+from mantidimaging.core.io.instrument_log import InstrumentLog
 from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.parallel.utility import SharedArray
 from mantidimaging.core.utility.data_containers import ProjectionAngles
@@ -165,6 +167,9 @@ class FakeFSTestCase(pyfakefs.fake_filesystem_unittest.TestCase):
     def setUp(self) -> None:
         super().setUp()
         self.setUpPyfakefs()
+        # The fake filesystem does not update the modification times of directories, so indexes would be reused
+        DirectoryIndex.clear_cache()
+        InstrumentLog.clear_cache()
         if sys.platform == 'linux':
             self.fs.add_real_file("/proc/meminfo", read_only=True)
 